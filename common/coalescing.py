@@ -0,0 +1,109 @@
+import traceback
+from asyncio import (
+    CancelledError,
+    Future,
+    Lock,
+    TimeoutError,
+    ensure_future,
+    sleep,
+    wait_for,
+)
+from collections import defaultdict
+from logging import getLogger
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+logger = getLogger(__name__)
+
+
+class CoalescingBuffer:
+    """Buffers statuses of jobs and writes them in bulk.
+
+    Statuses are merged per job id (the latest one wins) and written
+    flush_interval seconds after the first buffered one, or as soon as
+    max_size jobs are buffered - then the caller of add waits for the write,
+    which keeps the buffer bounded when the receiver falls behind. Statuses of
+    a failed write are kept for the next flush.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[Dict[Hashable, List[Dict]]], Awaitable],
+        max_size: int = 1000,
+        flush_interval: float = 1.0,
+    ):
+        self._write = write
+        self._max_size = max_size
+        self._flush_interval = flush_interval
+
+        self._pending: Dict[object, Tuple[Hashable, Dict]] = {}
+        self._flush_timer: Optional[Future] = None
+        # flushes are serialized, so an older snapshot can't overwrite a newer one
+        self._flush_lock = Lock()
+
+    async def add(self, statuses: Dict[Hashable, List[Dict]]):
+        for status, jobs in statuses.items():
+            for job in jobs:
+                # the same job can't be updated twice in one write
+                self._pending.pop(job["id"], None)
+                self._pending[job["id"]] = (status, job)
+
+        if len(self._pending) >= self._max_size:
+            await self.flush()
+        elif self._pending and self._flush_timer is None:
+            self._flush_timer = ensure_future(self._flush_later())
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._pending:
+                return
+
+            pending, self._pending = self._pending, {}
+            statuses = defaultdict(list)
+
+            for status, job in pending.values():
+                statuses[status].append(job)
+
+            try:
+                await self._write(dict(statuses))
+            except CancelledError:
+                self._restore(pending)
+                raise
+            except Exception:
+                logger.error(
+                    f"Failed to write {len(pending)} job statuses, they will be "
+                    f"retried with the next flush: {traceback.format_exc()}"
+                )
+                self._restore(pending)
+                raise
+
+    async def close(self, timeout: Optional[float] = None):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        try:
+            await wait_for(self.flush(), timeout)
+        except TimeoutError:
+            logger.error(
+                f"Flushing job statuses on shutdown timed out, statuses of "
+                f"{len(self._pending)} jobs are lost."
+            )
+        except Exception:
+            # already logged by flush
+            pass
+
+    def _restore(self, pending: Dict[object, Tuple[Hashable, Dict]]):
+        # statuses reported in the meantime are newer
+        pending.update(self._pending)
+        self._pending = pending
+
+    async def _flush_later(self):
+        await sleep(self._flush_interval)
+        self._flush_timer = None
+
+        try:
+            await self.flush()
+        except Exception:
+            if self._pending and self._flush_timer is None:
+                self._flush_timer = ensure_future(self._flush_later())
@@ -9,6 +9,7 @@ from tornado import escape
 from voluptuous import Invalid
 
 from common.exceptions import (
+    OverloadedError,
     UnsupportedFormatError,
     ValidationError,
     UnavailableServiceError,
@@ -24,7 +25,6 @@ def validate_json(func: Callable):
             http_method = self.request.method.lower()
 
             data = escape.json_decode(self.request.body)
-            print(data, self.request.body_arguments)
 
             validated_data = self._schemas[http_method](data)
         except Invalid as e:
@@ -67,6 +67,10 @@ def handle_errors(func: Callable):
         except UnsupportedFormatError as e:
             self.set_status(HTTPStatus.UNSUPPORTED_MEDIA_TYPE)
             self.write({"error": str(e)})
+        except OverloadedError as e:
+            self.set_status(HTTPStatus.SERVICE_UNAVAILABLE)
+            self.set_header("Retry-After", e.retry_after)
+            self.write({"error": str(e)})
         except Exception as e:
             logger.error(
                 f"Encounctered an error when processing request - {self.__class__.__name__}.{func.__name__}: {traceback.format_exc()}"
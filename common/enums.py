@@ -7,3 +7,9 @@ class EmailResult(Enum):
     FAILURE = "failure"
     RECOVERABLE_FAILURE = "retry"
     PENDING = "pending"
+
+
+class SegmentOperation(Enum):
+    UNION = "union"
+    INTERSECTION = "intersection"
+    DIFFERENCE = "difference"
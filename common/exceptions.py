@@ -12,3 +12,13 @@ class UnavailableServiceError(Exception):
 
 class UnexpectedServiceError(Exception):
     pass
+
+
+class TemplateError(Exception):
+    pass
+
+
+class OverloadedError(Exception):
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -0,0 +1,52 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from common.exceptions import ValidationError
+
+
+class LineStream(ABC):
+    """Splits a request body arriving in chunks into lines as it arrives.
+
+    Lines are passed to _process_line one by one, the last one when the stream
+    is closed. Error raised while receiving a chunk is kept and raised by close,
+    so the rest of the body can be drained first.
+    """
+
+    def __init__(self, max_line_size: int = 65536):
+        self._max_line_size = max_line_size
+
+        self._buffer = b""
+        self._line_number = 0
+        self.error: Optional[Exception] = None
+
+    async def receive(self, data: bytes):
+        if self.error is None:
+            try:
+                await self.feed(data)
+            except Exception as e:
+                self.error = e
+
+    async def feed(self, data: bytes):
+        lines = (self._buffer + data).split(b"\n")
+        self._buffer = lines.pop()
+
+        if len(self._buffer) > self._max_line_size:
+            raise ValidationError(
+                f"Line {self._line_number + 1} exceeds {self._max_line_size} bytes"
+            )
+
+        for line in lines:
+            self._line_number += 1
+            await self._process_line(line)
+
+    async def close(self):
+        if self.error is not None:
+            raise self.error
+
+        buffer, self._buffer = self._buffer, b""
+        self._line_number += 1
+        await self._process_line(buffer)
+
+    @abstractmethod
+    async def _process_line(self, line: bytes):
+        pass
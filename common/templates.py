@@ -0,0 +1,86 @@
+from functools import lru_cache
+from string import Formatter
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from common.exceptions import TemplateError
+
+AVAILABLE_FIELDS = frozenset(
+    {"user_id", "name", "id", "first_name", "last_name", "email"}
+)
+
+_CONVERSIONS = {"s": str, "r": repr, "a": ascii}
+
+Segment = Tuple[str, Optional[str], Optional[Callable]]
+
+
+class CompiledTemplate:
+    """Template parsed once into literal and field segments."""
+
+    __slots__ = ("_segments", "fields")
+
+    def __init__(self, segments: List[Segment]):
+        self._segments = tuple(segments)
+        self.fields = frozenset(
+            field for _, field, _ in self._segments if field is not None
+        )
+
+    def render(self, data: Dict) -> str:
+        parts = []
+
+        for literal, field, render_field in self._segments:
+            parts.append(literal)
+            if field is not None:
+                parts.append(render_field(data[field]))
+
+        return "".join(parts)
+
+
+@lru_cache(maxsize=256)
+def compile_template(
+    template: str, available_fields: FrozenSet[str] = AVAILABLE_FIELDS
+) -> CompiledTemplate:
+    """Compile str.format-like template, raising TemplateError for invalid ones."""
+    try:
+        parsed = list(Formatter().parse(template))
+    except ValueError as e:
+        raise TemplateError(f"Malformed template: {e}") from e
+
+    unsupported = set(
+        field
+        for _, field, _, _ in parsed
+        if field is not None and field not in available_fields
+    )
+    if unsupported:
+        raise TemplateError(
+            f"Used unsupported params: {', '.join(sorted(unsupported))}"
+        )
+
+    return CompiledTemplate(
+        [
+            (
+                literal,
+                field,
+                None if field is None else _create_field_renderer(conversion, spec),
+            )
+            for literal, field, spec, conversion in parsed
+        ]
+    )
+
+
+def _create_field_renderer(conversion: Optional[str], format_spec: str) -> Callable:
+    if conversion is not None and conversion not in _CONVERSIONS:
+        raise TemplateError(f"Unsupported conversion: !{conversion}")
+    if "{" in format_spec:
+        raise TemplateError(f"Nested fields are not supported: {format_spec}")
+
+    convert = _CONVERSIONS.get(conversion)
+
+    if convert is None and not format_spec:
+        return str
+
+    def render_field(value) -> str:
+        if convert is not None:
+            value = convert(value)
+        return format(value, format_spec)
+
+    return render_field
@@ -1,7 +1,10 @@
 import os
-from asyncio import get_event_loop
+import traceback
+from asyncio import ensure_future, get_event_loop, sleep
 from json import load
-from typing import Dict
+from logging import getLogger
+from socket import gethostname
+from typing import Dict, List
 
 from aiohttp import ClientSession, ClientTimeout, TCPConnector
 from aioredis import create_redis_pool
@@ -10,19 +13,28 @@ from tornado.web import Application
 from email_client.controllers.email import EmailHandler
 from email_client.controllers.settings import SettingsHandler
 from email_client.integrations.email.flyps import FlypsGatewayClient
+from email_client.integrations.email.limiter import AdaptiveConcurrencyLimiter
+from email_client.integrations.email.throttle import DomainThrottler
 from email_client.integrations.web.client import WebClient
+from email_client.integrations.web.coalescing import CoalescingWebClient
+from email_client.queue.abstract import AbstractJobQueue
+from email_client.queue.redis import RedisRetryScheduler, RedisStreamJobQueue
 from email_client.services.email.abstract import AbstractSendEmailService
+from email_client.services.email.retry import RetryPoller
 from email_client.services.email.service import SendEmailService
+from email_client.services.email.worker import SendEmailWorker
 from email_client.services.settings.abstract import AbstractSettingsService
 from email_client.services.settings.service import SettingsService
 from email_client.settings.redis import SimpleRedisSettingsStorage
 
+logger = getLogger(__name__)
+
 
 async def initialize_redis_pool(redis_config: Dict):
     redis_pool = await create_redis_pool(
         redis_config["host"],
         minsize=redis_config.get("min_size", 5),
-        maxsize=redis_config.get("min_size", 10),
+        maxsize=redis_config.get("max_size", 10),
         loop=get_event_loop(),
         timeout=5,
     )
@@ -40,20 +52,111 @@ def initialize_email_gateway_session(email_session_config: Dict) -> ClientSessio
     )
 
 
+async def listen_for_settings_changes(settings_storage: SimpleRedisSettingsStorage):
+    while True:
+        try:
+            await settings_storage.listen_for_changes()
+        except Exception:
+            logger.error(
+                f"Settings changes subscription failed: {traceback.format_exc()}"
+            )
+        await sleep(1)
+
+
+async def initialize_job_queue(redis, config: Dict) -> AbstractJobQueue:
+    job_queue = RedisStreamJobQueue(redis, config["email"]["batch_size"])
+    await job_queue.initialize()
+    return job_queue
+
+
+def start_queue_workers(
+    job_queue: AbstractJobQueue,
+    email_service: AbstractSendEmailService,
+    queue_config: Dict,
+) -> List[SendEmailWorker]:
+    consumer = queue_config.get("consumer", gethostname())
+    workers = [
+        SendEmailWorker(
+            job_queue,
+            email_service,
+            f"{consumer}-{i}",
+            queue_config.get("read_count", 1),
+            queue_config.get("read_timeout", 5000),
+            queue_config.get("claim_idle_time", 60000),
+            queue_config.get("max_deliveries", 5),
+        )
+        for i in range(queue_config.get("workers", 1))
+    ]
+
+    for worker in workers:
+        ensure_future(worker.run())
+
+    return workers
+
+
+def start_retry_poller(
+    retry_scheduler: RedisRetryScheduler,
+    email_service: AbstractSendEmailService,
+    retry_config: Dict,
+) -> RetryPoller:
+    poller = RetryPoller(
+        retry_scheduler,
+        email_service,
+        retry_config.get("poll_count", 100),
+        retry_config.get("poll_interval", 1),
+    )
+    ensure_future(poller.run())
+    return poller
+
+
 async def initialize_services(config: Dict):
     redis = await initialize_redis_pool(config["redis"])
     web_session = initialize_web_session(config["sessions"]["web"])
     email_session = initialize_email_gateway_session(config["sessions"]["email"])
 
-    web_client = WebClient(
-        config["web"]["url"],
-        web_session,
-        config["web"]["retry_count"],
-        config["web"]["retry_backoff"],
+    web_client = CoalescingWebClient(
+        WebClient(
+            config["web"]["url"],
+            web_session,
+            config["web"]["retry_count"],
+            config["web"]["retry_backoff"],
+        ),
+        config["web"].get("report_max_size", 1000),
+        config["web"].get("report_interval", 1),
+    )
+    concurrency_config = config["email"].get("concurrency", {})
+    throttling_config = config["email"].get("throttling", {})
+    email_client = FlypsGatewayClient(
+        config["email"]["url"],
+        email_session,
+        AdaptiveConcurrencyLimiter(
+            concurrency_config.get("initial_limit", 10),
+            concurrency_config.get("min_limit", 1),
+            concurrency_config.get(
+                "max_limit", config["sessions"]["email"]["max_connections"]
+            ),
+        ),
+        DomainThrottler(
+            throttling_config.get("domains"), throttling_config.get("default")
+        ),
     )
-    email_client = FlypsGatewayClient(config["email"]["url"], email_session)
 
     settings_storage = SimpleRedisSettingsStorage(redis)
+    ensure_future(listen_for_settings_changes(settings_storage))
+
+    queue_config = config.get("queue", {})
+    job_queue = None
+
+    if queue_config.get("enabled"):
+        job_queue = await initialize_job_queue(redis, config)
+
+    retry_config = config.get("retry", {})
+    retry_scheduler = None
+
+    if retry_config.get("enabled"):
+        retry_scheduler = RedisRetryScheduler(
+            redis, processing_timeout=retry_config.get("processing_timeout", 60)
+        )
 
     email_service = SendEmailService(
         web_client,
@@ -62,10 +165,27 @@ async def initialize_services(config: Dict):
         config["email"]["batch_size"],
         config["email"]["retry_count"],
         config["email"]["retry_backoff"],
+        config["email"].get("max_in_flight", 10),
+        job_queue,
+        retry_scheduler,
     )
     settings_service = SettingsService(settings_storage)
 
-    return email_service, settings_service
+    workers = []
+
+    if job_queue:
+        workers = start_queue_workers(job_queue, email_service, queue_config)
+
+    if retry_scheduler:
+        workers.append(start_retry_poller(retry_scheduler, email_service, retry_config))
+
+    async def shutdown():
+        for worker in workers:
+            worker.stop()
+
+        await web_client.close()
+
+    return email_service, settings_service, shutdown
 
 
 def make_app(
@@ -89,8 +209,8 @@ async def init_app():
     with open(app_config_file) as config_file:
         app_config = load(config_file)
 
-    email_service, settings_service = await initialize_services(app_config)
+    email_service, settings_service, shutdown = await initialize_services(app_config)
 
     app = make_app(settings_service, email_service)
 
-    return app, app_config
+    return app, app_config, shutdown
@@ -1,21 +1,61 @@
-from asyncio import ensure_future
 from http import HTTPStatus
+from typing import List, Optional
 
-from tornado.web import RequestHandler
+from tornado.web import RequestHandler, stream_request_body
 
 from common.decorators import handle_errors, validate_json
+from email_client.controllers.stream import NDJSONJobStream
 from email_client.schemas import job_request_schema
 from email_client.services.email.abstract import AbstractSendEmailService
 
 
+@stream_request_body
 class EmailHandler(RequestHandler):
     _schemas = {"post": job_request_schema}
 
-    def initialize(self, email_service: AbstractSendEmailService):
+    stream_content_type = "application/x-ndjson"
+    max_stream_body_size = 2 ** 30
+
+    def initialize(
+        self, email_service: AbstractSendEmailService, stream_chunk_size: int = 1000
+    ):
         self.service = email_service
+        self._stream_chunk_size = stream_chunk_size
+
+        self._stream: Optional[NDJSONJobStream] = None
+        self._body: List[bytes] = []
+
+    def prepare(self):
+        content_type = self.request.headers.get("Content-Type", "")
+
+        if content_type.split(";")[0].strip() == self.stream_content_type:
+            self._stream = NDJSONJobStream(self.service, self._stream_chunk_size)
+            self.request.connection.set_max_body_size(self.max_stream_body_size)
+
+    async def data_received(self, chunk: bytes):
+        if self._stream is None:
+            self._body.append(chunk)
+        else:
+            # rest of the body is drained after an error, close raises it
+            await self._stream.receive(chunk)
 
     @handle_errors
+    async def post(self):
+        if self._stream is None:
+            self.request.body = b"".join(self._body)
+            await self._post_json()
+            return
+
+        try:
+            await self._stream.close()
+        finally:
+            # jobs dispatched before an invalid line are sent anyway
+            self.set_header("X-Accepted-Jobs", self._stream.accepted)
+
+        self.set_status(HTTPStatus.ACCEPTED)
+        self.write({"accepted": self._stream.accepted})
+
     @validate_json
-    async def post(self, data):
-        ensure_future(self.service.send_emails(**data))
+    async def _post_json(self, data):
+        await self.service.dispatch_sending_emails(**data)
         self.set_status(HTTPStatus.ACCEPTED)
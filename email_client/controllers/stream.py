@@ -0,0 +1,72 @@
+from json import JSONDecodeError, loads
+from typing import Dict, List, Optional
+
+from voluptuous import Invalid
+
+from common.exceptions import UnsupportedFormatError, ValidationError
+from common.stream import LineStream
+from email_client.schemas import job_schema, job_stream_header_schema
+from email_client.services.email.abstract import AbstractSendEmailService
+
+
+class NDJSONJobStream(LineStream):
+    """Validates and dispatches jobs from newline delimited JSON as it arrives.
+
+    First line holds the template and the subject, every next one a single
+    job. Jobs are dispatched in chunks of chunk_size, so chunks accepted
+    before an invalid line are sent anyway.
+    """
+
+    def __init__(
+        self,
+        email_service: AbstractSendEmailService,
+        chunk_size: int = 1000,
+        max_line_size: int = 65536,
+    ):
+        super().__init__(max_line_size)
+        self._email_service = email_service
+        self._chunk_size = chunk_size
+
+        self._header: Optional[Dict] = None
+        self._jobs: List[Dict] = []
+        self.accepted = 0
+
+    async def close(self):
+        await super().close()
+
+        if self._header is None:
+            raise ValidationError("Missing template and subject line")
+
+        await self._flush()
+
+        if not self.accepted:
+            raise ValidationError("No jobs in request")
+
+    async def _process_line(self, line: bytes):
+        if not line.strip():
+            return
+
+        try:
+            data = loads(line)
+
+            if self._header is None:
+                self._header = job_stream_header_schema(data)
+            else:
+                self._jobs.append(job_schema(data))
+        except Invalid as e:
+            raise ValidationError(f"Line {self._line_number}: {e.error_message}")
+        except (JSONDecodeError, UnicodeDecodeError) as e:
+            raise UnsupportedFormatError(f"Line {self._line_number}: {e!r}")
+
+        if len(self._jobs) >= self._chunk_size:
+            await self._flush()
+
+    async def _flush(self):
+        if not self._jobs:
+            return
+
+        jobs, self._jobs = self._jobs, []
+        await self._email_service.dispatch_sending_emails(
+            jobs, self._header["template"], self._header["subject"]
+        )
+        self.accepted += len(jobs)
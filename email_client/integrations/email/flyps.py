@@ -1,22 +1,36 @@
 import traceback
-from asyncio import gather
+from asyncio import TimeoutError as AsyncTimeoutError, gather
 from collections import defaultdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from logging import getLogger
 from typing import List, Dict, Optional, Tuple
 
 from aiohttp import ClientSession, BasicAuth
 
 from common.enums import EmailResult
+from common.exceptions import TemplateError
+from common.templates import compile_template
 from email_client.integrations.email.abstract import AbstractEmailGatewayClient
+from email_client.integrations.email.limiter import AdaptiveConcurrencyLimiter
+from email_client.integrations.email.throttle import DomainThrottler
 
 
 logger = getLogger(__name__)
 
 
 class FlypsGatewayClient(AbstractEmailGatewayClient):
-    def __init__(self, gateway_url: str, session: ClientSession):
+    def __init__(
+        self,
+        gateway_url: str,
+        session: ClientSession,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        throttler: Optional[DomainThrottler] = None,
+    ):
         self._gateway_url = gateway_url
         self._session = session
+        self._limiter = limiter or AdaptiveConcurrencyLimiter()
+        self._throttler = throttler or DomainThrottler()
 
     async def send_emails(
         self,
@@ -27,6 +41,21 @@ class FlypsGatewayClient(AbstractEmailGatewayClient):
         email_from: Dict[str, str],
         headers: Optional[Dict] = None,
     ) -> Tuple[Dict, List[Dict]]:
+        try:
+            compile_template(template)
+        except TemplateError:
+            logger.error(
+                f"Invalid template, failing whole batch: {traceback.format_exc()}"
+            )
+            return (
+                {
+                    EmailResult.FAILURE: [
+                        {"id": job["id"], "message_id": ""} for job in jobs
+                    ]
+                },
+                [],
+            )
+
         results = await gather(
             *[
                 self._send_email(
@@ -64,6 +93,21 @@ class FlypsGatewayClient(AbstractEmailGatewayClient):
         except (ValueError, TypeError):
             return EmailResult.AUTH_FAILURE, None
 
+        try:
+            text = self.render_template(job, template)
+        except (KeyError, ValueError, TypeError):
+            # missing field or a value not matching its format spec
+            logger.error(
+                f"Invalid template data for job {job['id']}: {traceback.format_exc()}"
+            )
+            return EmailResult.FAILURE, None
+
+        overloaded = False
+        retry_after = None
+        # throttled jobs wait before taking a slot, so other domains keep flowing
+        await self._throttler.acquire(job["email"])
+        token = await self._limiter.acquire()
+
         try:
             response = await self._session.post(
                 self._gateway_url,
@@ -74,7 +118,7 @@ class FlypsGatewayClient(AbstractEmailGatewayClient):
                         "email": job["email"],
                     },
                     "subject": subject,
-                    "text": self.render_template(job, template),
+                    "text": text,
                     "headers": headers,
                 },
                 auth=auth,
@@ -86,7 +130,13 @@ class FlypsGatewayClient(AbstractEmailGatewayClient):
                 return EmailResult.AUTH_FAILURE, None
             elif response.status == 400:
                 return EmailResult.FAILURE, None
-        except (TimeoutError, ConnectionError):
+            elif response.status == 429 or response.status >= 500:
+                overloaded = True
+                retry_after = self._parse_retry_after(
+                    response.headers.get("Retry-After")
+                )
+        except (TimeoutError, AsyncTimeoutError, ConnectionError):
+            overloaded = True
             logger.warning(
                 f"Error with connection when trying to send job {job['id']}: "
                 f"{traceback.format_exc()}"
@@ -96,7 +146,25 @@ class FlypsGatewayClient(AbstractEmailGatewayClient):
                 f"Unexpected error when trying to send job {job['id']}: "
                 f"{traceback.format_exc()}"
             )
+        finally:
+            self._limiter.release(token, overloaded, retry_after)
         return EmailResult.RECOVERABLE_FAILURE, None
 
     def render_template(self, job: Dict, template: str):
-        return template.format(**job)
+        return compile_template(template).render(job)
+
+    @staticmethod
+    def _parse_retry_after(value) -> Optional[float]:
+        if not isinstance(value, str):
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
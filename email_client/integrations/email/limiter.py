@@ -0,0 +1,115 @@
+from asyncio import CancelledError, Future, get_event_loop, sleep
+from collections import deque
+from time import monotonic
+from typing import Deque, Optional, Tuple
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limiter of concurrent requests to the email gateway.
+
+    Limit grows by one after a full window of requests finished with latency
+    close to the lowest observed one, and is multiplied by decrease_factor
+    (at most once per window) when the gateway signals overload. Retry-After
+    delays block all new requests until they pass.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 1.5,
+    ):
+        self._limit = float(initial_limit)
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._decrease_factor = decrease_factor
+        self._latency_tolerance = latency_tolerance
+
+        self._in_flight = 0
+        self._waiters: Deque[Future] = deque()
+        self._epoch = 0
+        self._window_successes = 0
+        self._min_latency: Optional[float] = None
+        self._blocked_until = 0.0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self) -> Tuple[int, float]:
+        delay = self._blocked_until - monotonic()
+        while delay > 0:
+            await sleep(delay)
+            delay = self._blocked_until - monotonic()
+
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+        else:
+            waiter = get_event_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                # slot is handed over by release
+                await waiter
+            except CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._in_flight -= 1
+                    self._wake_waiters()
+                raise
+
+        return self._epoch, monotonic()
+
+    def release(
+        self,
+        token: Tuple[int, float],
+        overloaded: bool = False,
+        retry_after: Optional[float] = None,
+    ):
+        epoch, started = token
+        self._in_flight -= 1
+
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, monotonic() + retry_after)
+
+        if overloaded:
+            self._on_overload(epoch)
+        else:
+            self._on_success(monotonic() - started)
+
+        self._wake_waiters()
+
+    def _on_overload(self, epoch: int):
+        # requests started before last decrease already saw the overload
+        if epoch != self._epoch:
+            return
+
+        self._limit = max(self._min_limit, self._limit * self._decrease_factor)
+        self._epoch += 1
+        self._window_successes = 0
+        # latency baseline is learned again after the gateway got overloaded
+        self._min_latency = None
+
+    def _on_success(self, latency: float):
+        if self._min_latency is None or latency < self._min_latency:
+            self._min_latency = latency
+
+        if latency > self._min_latency * self._latency_tolerance:
+            return
+
+        self._window_successes += 1
+
+        if self._window_successes >= self.limit:
+            self._limit = min(self._max_limit, self._limit + 1)
+            self._window_successes = 0
+
+    def _wake_waiters(self):
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
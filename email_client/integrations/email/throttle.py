@@ -0,0 +1,58 @@
+from asyncio import sleep
+from time import monotonic
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = monotonic()
+
+    async def acquire(self):
+        now = monotonic()
+        self._tokens = min(
+            self._burst, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+        # token is reserved up front, so waiting senders are served in order
+        self._tokens -= 1
+
+        if self._tokens < 0:
+            await sleep(-self._tokens / self._rate)
+
+
+class DomainThrottler:
+    """Rate limits sending per recipient domain with token buckets.
+
+    Domains without their own limit use the default one (each domain gets
+    a separate bucket) or are not throttled at all when there is no default.
+    """
+
+    def __init__(
+        self,
+        domain_limits: Optional[Dict[str, Dict]] = None,
+        default_limit: Optional[Dict] = None,
+    ):
+        self._buckets = {
+            domain.lower(): TokenBucket(limit["rate"], limit["burst"])
+            for domain, limit in (domain_limits or {}).items()
+        }
+        self._default_limit = default_limit
+
+    async def acquire(self, email: str):
+        domain = self.get_domain(email)
+        bucket = self._buckets.get(domain)
+
+        if bucket is None and self._default_limit:
+            bucket = self._buckets[domain] = TokenBucket(
+                self._default_limit["rate"], self._default_limit["burst"]
+            )
+
+        if bucket is not None:
+            await bucket.acquire()
+
+    @staticmethod
+    def get_domain(email: str) -> str:
+        return email.rpartition("@")[2].lower()
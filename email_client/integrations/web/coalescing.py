@@ -0,0 +1,32 @@
+from typing import Dict, List
+
+from common.coalescing import CoalescingBuffer
+from common.enums import EmailResult
+from email_client.integrations.web.abstract import AbstractWebClient
+
+
+class CoalescingWebClient(AbstractWebClient):
+    """Buffers job statuses and reports them to web in bulk.
+
+    Buffer is flushed when it reaches max_size jobs or flush_interval seconds
+    after the first buffered status, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        web_client: AbstractWebClient,
+        max_size: int = 1000,
+        flush_interval: float = 1.0,
+    ):
+        self._buffer = CoalescingBuffer(
+            web_client.report_job_status, max_size, flush_interval
+        )
+
+    async def report_job_status(self, statuses: Dict[EmailResult, List[Dict]]):
+        await self._buffer.add(statuses)
+
+    async def flush(self):
+        await self._buffer.flush()
+
+    async def close(self):
+        await self._buffer.close()
@@ -0,0 +1,59 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple
+
+
+class AbstractJobQueue(ABC):
+    @abstractmethod
+    async def initialize(self):
+        pass
+
+    @abstractmethod
+    async def enqueue(
+        self, jobs: List[Dict], template: str, subject: str, retry_attempt: int = 0
+    ):
+        pass
+
+    @abstractmethod
+    async def consume(
+        self, consumer: str, count: int, timeout: int
+    ) -> List[Tuple[str, Dict]]:
+        pass
+
+    @abstractmethod
+    async def claim_stale(
+        self, consumer: str, min_idle_time: int, count: int
+    ) -> List[Tuple[str, Dict, int]]:
+        pass
+
+    @abstractmethod
+    async def renew(self, consumer: str, *entry_ids: str):
+        pass
+
+    @abstractmethod
+    async def acknowledge(self, *entry_ids: str):
+        pass
+
+    @abstractmethod
+    async def dead_letter(self, entry_id: str, entry: Dict):
+        pass
+
+
+class AbstractRetryScheduler(ABC):
+    @abstractmethod
+    async def schedule(
+        self,
+        jobs: List[Dict],
+        template: str,
+        subject: str,
+        retry_attempt: int,
+        delay: float,
+    ):
+        pass
+
+    @abstractmethod
+    async def pop_due(self, count: int) -> List[Tuple[str, Dict]]:
+        pass
+
+    @abstractmethod
+    async def acknowledge(self, *entry_ids: str):
+        pass
@@ -0,0 +1,198 @@
+from json import dumps, loads
+from time import time
+from typing import Dict, List, Tuple
+from uuid import uuid4
+
+from aioredis import Redis, ReplyError
+
+from email_client.queue.abstract import AbstractJobQueue, AbstractRetryScheduler
+
+
+class RedisStreamJobQueue(AbstractJobQueue):
+    base_key = "email_client/queue"
+
+    def __init__(
+        self,
+        connection: Redis,
+        batch_size: int = 20,
+        stream: str = "jobs",
+        group: str = "email_client",
+    ):
+        self._connection = connection
+        self._batch_size = batch_size
+        self._stream = f"{self.base_key}/{stream}"
+        self._dead_letter_stream = f"{self._stream}/dead"
+        self._group = group
+
+    async def initialize(self):
+        try:
+            await self._connection.execute(
+                b"XGROUP", b"CREATE", self._stream, self._group, "0", b"MKSTREAM"
+            )
+        except ReplyError as e:
+            # group already created by another process
+            if not str(e).startswith("BUSYGROUP"):
+                raise
+
+    async def enqueue(
+        self, jobs: List[Dict], template: str, subject: str, retry_attempt: int = 0
+    ):
+        pipeline = self._connection.pipeline()
+
+        for i in range(0, len(jobs), self._batch_size):
+            pipeline.xadd(
+                self._stream,
+                {
+                    "payload": dumps(
+                        {
+                            "jobs": jobs[i : i + self._batch_size],
+                            "template": template,
+                            "subject": subject,
+                            "retry_attempt": retry_attempt,
+                        }
+                    )
+                },
+            )
+
+        await pipeline.execute()
+
+    async def consume(
+        self, consumer: str, count: int, timeout: int
+    ) -> List[Tuple[str, Dict]]:
+        entries = await self._connection.xread_group(
+            self._group,
+            consumer,
+            [self._stream],
+            timeout=timeout,
+            count=count,
+            latest_ids=[">"],
+        )
+        return [self._parse_entry(entry_id, fields) for _, entry_id, fields in entries]
+
+    async def claim_stale(
+        self, consumer: str, min_idle_time: int, count: int
+    ) -> List[Tuple[str, Dict, int]]:
+        pending = await self._connection.xpending(
+            self._stream, self._group, "-", "+", count
+        )
+        deliveries = {
+            entry_id: delivery_count
+            for entry_id, _, idle_time, delivery_count in pending
+            if idle_time >= min_idle_time
+        }
+
+        if not deliveries:
+            return []
+
+        entries = await self._connection.xclaim(
+            self._stream, self._group, consumer, min_idle_time, *deliveries
+        )
+        return [
+            (*self._parse_entry(entry_id, fields), deliveries[entry_id])
+            for entry_id, fields in entries
+            if fields
+        ]
+
+    async def renew(self, consumer: str, *entry_ids: str):
+        # claiming own entries again only resets their idle time
+        if entry_ids:
+            await self._connection.execute(
+                b"XCLAIM", self._stream, self._group, consumer, 0, *entry_ids, b"JUSTID"
+            )
+
+    async def acknowledge(self, *entry_ids: str):
+        if entry_ids:
+            await self._connection.xack(self._stream, self._group, *entry_ids)
+
+    async def dead_letter(self, entry_id: str, entry: Dict):
+        transaction = self._connection.multi_exec()
+        transaction.xadd(
+            self._dead_letter_stream, {"entry_id": entry_id, "payload": dumps(entry)}
+        )
+        transaction.xack(self._stream, self._group, entry_id)
+        await transaction.execute()
+
+    def _parse_entry(self, entry_id: bytes, fields: Dict) -> Tuple[str, Dict]:
+        return entry_id.decode("utf8"), loads(fields[b"payload"])
+
+
+class RedisRetryScheduler(AbstractRetryScheduler):
+    """Keeps jobs waiting for retry in a sorted set scored by their due time.
+
+    Popped entries are moved to a processing set scored by the time they have
+    to be acknowledged by. Entries not acknowledged in processing_timeout
+    seconds (their dispatch failed or the poller died) are popped again.
+    """
+
+    base_key = "email_client/retry"
+
+    # moving due entries in one script guarantees that concurrent pollers
+    # never get the same entry
+    pop_due_script = """
+local count = tonumber(ARGV[2])
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, count)
+if #due > 0 then
+    redis.call('ZREM', KEYS[1], unpack(due))
+end
+if #due < count then
+    local expired = redis.call(
+        'ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1], 'LIMIT', 0, count - #due
+    )
+    for _, entry in ipairs(expired) do
+        table.insert(due, entry)
+    end
+end
+for _, entry in ipairs(due) do
+    redis.call('ZADD', KEYS[2], ARGV[3], entry)
+end
+return due
+"""
+
+    def __init__(
+        self, connection: Redis, key: str = "jobs", processing_timeout: float = 60
+    ):
+        self._connection = connection
+        self._key = f"{self.base_key}/{key}"
+        self._processing_key = f"{self._key}/processing"
+        self._processing_timeout = processing_timeout
+
+    async def schedule(
+        self,
+        jobs: List[Dict],
+        template: str,
+        subject: str,
+        retry_attempt: int,
+        delay: float,
+    ):
+        entry = dumps(
+            {
+                # sorted set members are unique, identical retries must not merge
+                "id": uuid4().hex,
+                "jobs": jobs,
+                "template": template,
+                "subject": subject,
+                "retry_attempt": retry_attempt,
+            }
+        )
+        await self._connection.zadd(self._key, time() + delay, entry)
+
+    async def pop_due(self, count: int) -> List[Tuple[str, Dict]]:
+        now = time()
+        due = await self._connection.eval(
+            self.pop_due_script,
+            keys=[self._key, self._processing_key],
+            args=[now, count, now + self._processing_timeout],
+        )
+        entries = []
+
+        for member in due:
+            entry = loads(member)
+            del entry["id"]
+            # whole member identifies the entry in the processing set
+            entries.append((member.decode("utf8"), entry))
+
+        return entries
+
+    async def acknowledge(self, *entry_ids: str):
+        if entry_ids:
+            await self._connection.zrem(self._processing_key, *entry_ids)
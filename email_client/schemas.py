@@ -19,3 +19,5 @@ settings_schema = Schema(
         "headers": dict,
     }
 )
+
+job_stream_header_schema = Schema({"template": str, "subject": str}, required=True)
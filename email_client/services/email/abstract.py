@@ -4,17 +4,19 @@ from typing import Dict, List, Generator, Tuple, Optional
 
 class AbstractSendEmailService(ABC):
     @abstractmethod
-    def dispatch_sending_emails(self, jobs: List[Dict], template: str, subject: str):
+    async def dispatch_sending_emails(
+        self, jobs: List[Dict], template: str, subject: str, retry_attempt: int = 0
+    ):
         pass
 
     @abstractmethod
-    def send_emails(
+    async def send_emails(
         self, jobs: List[Dict], subject: str, template: str, retry_attempt: int = 0
     ):
         pass
 
     @abstractmethod
-    def send_email_batch(
+    async def send_email_batch(
         self,
         jobs_batch: List[Dict],
         template: str,
@@ -31,6 +33,10 @@ class AbstractSendEmailService(ABC):
     ) -> Generator[List, None, None]:
         pass
 
+    @abstractmethod
+    async def fail_jobs(self, jobs: List[Dict]):
+        pass
+
     @abstractmethod
     async def manage_retry(
         self, jobs: List[Dict], template: str, subject: str, retry_attempt: int
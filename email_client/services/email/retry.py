@@ -0,0 +1,64 @@
+import traceback
+from asyncio import sleep
+from logging import getLogger
+
+from email_client.queue.abstract import AbstractRetryScheduler
+from email_client.services.email.abstract import AbstractSendEmailService
+
+
+logger = getLogger(__name__)
+
+
+class RetryPoller:
+    def __init__(
+        self,
+        retry_scheduler: AbstractRetryScheduler,
+        email_service: AbstractSendEmailService,
+        poll_count: int = 100,
+        poll_interval: float = 1,
+    ):
+        self._retry_scheduler = retry_scheduler
+        self._email_service = email_service
+
+        self._poll_count = poll_count
+        self._poll_interval = poll_interval
+
+        self._running = False
+
+    async def run(self):
+        self._running = True
+
+        while self._running:
+            # backlog of due retries is drained without waiting
+            if await self.process_due() < self._poll_count:
+                await sleep(self._poll_interval)
+
+    def stop(self):
+        self._running = False
+
+    async def process_due(self) -> int:
+        try:
+            entries = await self._retry_scheduler.pop_due(self._poll_count)
+        except Exception:
+            logger.error(
+                f"Unexpected error when reading due retries: {traceback.format_exc()}"
+            )
+            return 0
+
+        for entry_id, entry in entries:
+            try:
+                await self._email_service.dispatch_sending_emails(
+                    entry["jobs"],
+                    entry["template"],
+                    entry["subject"],
+                    entry["retry_attempt"],
+                )
+                await self._retry_scheduler.acknowledge(entry_id)
+            except Exception:
+                # entries not acknowledged are popped again after a timeout
+                logger.error(
+                    f"Unexpected error when dispatching retry of jobs "
+                    f"{[job['id'] for job in entry['jobs']]}: {traceback.format_exc()}"
+                )
+
+        return len(entries)
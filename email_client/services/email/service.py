@@ -1,13 +1,24 @@
-from asyncio import ensure_future, gather, sleep
+import traceback
+from asyncio import Queue, ensure_future, gather, sleep
+from collections import defaultdict
+from itertools import chain, zip_longest
+from logging import getLogger
+from math import ceil
+from random import uniform
 from typing import List, Dict, Generator, Optional, Tuple
 
 from common.enums import EmailResult
 from email_client.integrations.email.abstract import AbstractEmailGatewayClient
+from email_client.integrations.email.throttle import DomainThrottler
 from email_client.integrations.web.abstract import AbstractWebClient
+from email_client.queue.abstract import AbstractJobQueue, AbstractRetryScheduler
 from email_client.services.email.abstract import AbstractSendEmailService
 from email_client.settings.abstract import AbstractSettingsStorage
 
 
+logger = getLogger(__name__)
+
+
 class SendEmailService(AbstractSendEmailService):
     def __init__(
         self,
@@ -17,17 +28,28 @@ class SendEmailService(AbstractSendEmailService):
         batch_size: int = 20,
         retry_count: int = 3,
         retry_backoff: int = 3,
+        max_in_flight: int = 10,
+        job_queue: Optional[AbstractJobQueue] = None,
+        retry_scheduler: Optional[AbstractRetryScheduler] = None,
     ):
         self._web_client = web_client
         self._email_client = email_client
         self._settings_storage = settings_storage
+        self._job_queue = job_queue
+        self._retry_scheduler = retry_scheduler
 
         self._batch_size = batch_size
         self._retry_count = retry_count
         self._retry_backoff = retry_backoff
+        self._max_in_flight = max_in_flight
 
-    def dispatch_sending_emails(self, jobs: List[Dict], template: str, subject: str):
-        ensure_future(self.send_emails(jobs, template, subject))
+    async def dispatch_sending_emails(
+        self, jobs: List[Dict], template: str, subject: str, retry_attempt: int = 0
+    ):
+        if self._job_queue:
+            await self._job_queue.enqueue(jobs, template, subject, retry_attempt)
+        else:
+            ensure_future(self.send_emails(jobs, template, subject, retry_attempt))
 
     async def send_emails(
         self, jobs: List[Dict], template: str, subject: str, retry_attempt: int = 0
@@ -36,37 +58,91 @@ class SendEmailService(AbstractSendEmailService):
             await self._settings_storage.get_gateway_credentials_headers_and_from()
         )
         to_retry = []
+        batches = Queue(self._max_in_flight)
+        workers_count = min(self._max_in_flight, ceil(len(jobs) / self._batch_size))
 
-        batches = [
-            self.send_email_batch(batch, template, subject, auth, headers, email_from)
-            for batch in self._split_to_batches(jobs, self._batch_size)
-        ]
-
-        results = await gather(*batches)
-
-        for retry in results:
-            to_retry.extend(retry)
+        await gather(
+            self._produce_batches(batches, jobs, workers_count),
+            *[
+                self._consume_batches(
+                    batches, to_retry, template, subject, auth, headers, email_from
+                )
+                for _ in range(workers_count)
+            ],
+        )
 
-        if to_retry:
+        if to_retry and self._retry_scheduler:
+            # retry has to be stored before queue entry gets acknowledged
+            await self.manage_retry(to_retry, template, subject, retry_attempt + 1)
+        elif to_retry:
             ensure_future(
                 self.manage_retry(to_retry, template, subject, retry_attempt + 1)
             )
 
+    async def _produce_batches(self, batches: Queue, jobs: List[Dict], workers: int):
+        for batch in self._split_to_batches(
+            self._interleave_domains(jobs), self._batch_size
+        ):
+            await batches.put(batch)
+
+        for _ in range(workers):
+            await batches.put(None)
+
+    async def _consume_batches(
+        self,
+        batches: Queue,
+        to_retry: List[Dict],
+        template: str,
+        subject: str,
+        auth: Tuple[str, str],
+        headers: Optional[Dict],
+        email_from: Dict[str, str],
+    ):
+        batch = await batches.get()
+
+        while batch is not None:
+            try:
+                to_retry.extend(
+                    await self.send_email_batch(
+                        batch, template, subject, auth, headers, email_from
+                    )
+                )
+            except Exception:
+                # consumer has to keep going, otherwise the producer would wait
+                # for it forever
+                logger.error(
+                    f"Unexpected error when sending batch of {len(batch)} jobs, "
+                    f"they will be retried: {traceback.format_exc()}"
+                )
+                to_retry.extend(batch)
+            batch = await batches.get()
+
     async def manage_retry(
         self, jobs: List[Dict], template: str, subject: str, retry_attempt: int
     ):
         if retry_attempt > self._retry_count:
-            await self._web_client.report_job_status(
-                {
-                    EmailResult.FAILURE: [
-                        {"id": job["id"], "message_id": ""} for job in jobs
-                    ]
-                }
+            await self.fail_jobs(jobs)
+        elif self._retry_scheduler:
+            await self._retry_scheduler.schedule(
+                jobs,
+                template,
+                subject,
+                retry_attempt,
+                self._get_retry_delay(retry_attempt),
             )
         else:
-            await sleep(self._retry_backoff ** retry_attempt)
+            await sleep(self._get_retry_delay(retry_attempt))
             await self.send_emails(jobs, template, subject, retry_attempt)
 
+    async def fail_jobs(self, jobs: List[Dict]):
+        await self._web_client.report_job_status(
+            {EmailResult.FAILURE: [{"id": job["id"], "message_id": ""} for job in jobs]}
+        )
+
+    def _get_retry_delay(self, retry_attempt: int) -> float:
+        # full jitter spreads retries of batches failed at the same time
+        return uniform(0, self._retry_backoff ** retry_attempt)
+
     async def send_email_batch(
         self,
         jobs_batch: List[Dict],
@@ -84,6 +160,24 @@ class SendEmailService(AbstractSendEmailService):
 
         return failed
 
+    def _interleave_domains(self, jobs: List[Dict]) -> List[Dict]:
+        # spreading recipients of one domain over all batches keeps a throttled
+        # domain from holding up whole batches of the other ones; domains are
+        # told apart the same way the throttler does
+        by_domain = defaultdict(list)
+
+        for job in jobs:
+            by_domain[DomainThrottler.get_domain(job["email"])].append(job)
+
+        if len(by_domain) < 2:
+            return jobs
+
+        return [
+            job
+            for job in chain.from_iterable(zip_longest(*by_domain.values()))
+            if job is not None
+        ]
+
     def _split_to_batches(
         self, to_split: List, batch_size: int
     ) -> Generator[List, None, None]:
@@ -0,0 +1,129 @@
+import traceback
+from asyncio import ensure_future, sleep
+from logging import getLogger
+from typing import Dict, List, Set, Tuple
+
+from email_client.queue.abstract import AbstractJobQueue
+from email_client.services.email.abstract import AbstractSendEmailService
+
+
+logger = getLogger(__name__)
+
+
+class SendEmailWorker:
+    """Sends batches consumed from the job queue, claiming stale ones first.
+
+    Entries idle for claim_idle_time ms are claimed by other workers, so the
+    entries being processed are renewed every third of that time. Entries
+    delivered max_deliveries times without being acknowledged are not sent
+    again, their jobs are reported as failed and the entries are moved to the
+    dead letter stream.
+    """
+
+    def __init__(
+        self,
+        job_queue: AbstractJobQueue,
+        email_service: AbstractSendEmailService,
+        consumer: str,
+        read_count: int = 1,
+        read_timeout: int = 5000,
+        claim_idle_time: int = 60000,
+        max_deliveries: int = 5,
+    ):
+        self._job_queue = job_queue
+        self._email_service = email_service
+        self._consumer = consumer
+
+        self._read_count = read_count
+        self._read_timeout = read_timeout
+        self._claim_idle_time = claim_idle_time
+        self._max_deliveries = max_deliveries
+
+        self._running = False
+
+    async def run(self):
+        self._running = True
+
+        while self._running:
+            await self.process_entries()
+
+    def stop(self):
+        self._running = False
+
+    async def process_entries(self):
+        try:
+            # entries left unacknowledged by dead consumers take precedence
+            stale = await self._job_queue.claim_stale(
+                self._consumer, self._claim_idle_time, self._read_count
+            )
+            entries = [
+                (entry_id, entry)
+                for entry_id, entry, deliveries in stale
+                if deliveries < self._max_deliveries
+            ]
+            await self._dead_letter(
+                [
+                    (entry_id, entry)
+                    for entry_id, entry, deliveries in stale
+                    if deliveries >= self._max_deliveries
+                ]
+            )
+
+            if not stale:
+                entries = await self._job_queue.consume(
+                    self._consumer, self._read_count, self._read_timeout
+                )
+        except Exception:
+            logger.error(
+                f"Unexpected error when reading job queue ({self._consumer}): "
+                f"{traceback.format_exc()}"
+            )
+            await sleep(self._read_timeout / 1000)
+            return
+
+        if not entries:
+            return
+
+        pending = {entry_id for entry_id, _ in entries}
+        renewal = ensure_future(self._renew(pending))
+
+        try:
+            for entry_id, entry in entries:
+                try:
+                    await self._email_service.send_emails(
+                        entry["jobs"],
+                        entry["template"],
+                        entry["subject"],
+                        entry["retry_attempt"],
+                    )
+                    await self._job_queue.acknowledge(entry_id)
+                except Exception:
+                    logger.error(
+                        f"Unexpected error when processing queue entry {entry_id}, "
+                        f"it will be claimed again: {traceback.format_exc()}"
+                    )
+                finally:
+                    pending.discard(entry_id)
+        finally:
+            renewal.cancel()
+
+    async def _dead_letter(self, entries: List[Tuple[str, Dict]]):
+        for entry_id, entry in entries:
+            logger.error(
+                f"Queue entry {entry_id} was delivered {self._max_deliveries} times "
+                f"without success, moving it to the dead letter stream"
+            )
+            await self._email_service.fail_jobs(entry["jobs"])
+            await self._job_queue.dead_letter(entry_id, entry)
+
+    async def _renew(self, entry_ids: Set[str]):
+        while True:
+            await sleep(self._claim_idle_time / 3000)
+
+            try:
+                await self._job_queue.renew(self._consumer, *sorted(entry_ids))
+            except Exception:
+                logger.error(
+                    f"Unexpected error when renewing queue entries {entry_ids}: "
+                    f"{traceback.format_exc()}"
+                )
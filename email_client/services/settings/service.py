@@ -16,9 +16,12 @@ class SettingsService(AbstractSettingsService):
 
     async def update_email_credentials(self, user: str, password: str):
         await self._storage.save_gateway_credentials(user, password)
+        await self._storage.notify_settings_changed()
 
     async def update_custom_headers(self, headers: Dict):
         await self._storage.save_custom_headers(headers)
+        await self._storage.notify_settings_changed()
 
     async def update_email_from(self, name: str, email: str):
         await self._storage.save_email_from(name, email)
+        await self._storage.notify_settings_changed()
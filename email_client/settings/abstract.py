@@ -32,3 +32,7 @@ class AbstractSettingsStorage(ABC):
         self
     ) -> Tuple[Tuple[str, str], Dict, Dict[str, str]]:
         pass
+
+    @abstractmethod
+    async def notify_settings_changed(self):
+        pass
@@ -1,6 +1,6 @@
 from asyncio import gather
 from itertools import chain
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Optional
 
 from aioredis import Redis
 
@@ -13,6 +13,10 @@ class SimpleRedisSettingsStorage(AbstractSettingsStorage):
     def __init__(self, connection: Redis):
         self._connection = connection
 
+        self._snapshot: Optional[Tuple[Tuple[str, str], Dict, Dict[str, str]]] = None
+        self._version = 0
+        self._listening = False
+
     def get_key(self, key: str):
         return f"{self.base_key}/{key}"
 
@@ -60,7 +64,11 @@ class SimpleRedisSettingsStorage(AbstractSettingsStorage):
     async def get_gateway_credentials_headers_and_from(
         self
     ) -> Tuple[Tuple[str, str], Dict, Dict[str, str]]:
-        return tuple(
+        if self._listening and self._snapshot is not None:
+            return self._snapshot
+
+        version = self._version
+        snapshot = tuple(
             await gather(
                 *[
                     self.get_gateway_credentials(),
@@ -69,3 +77,34 @@ class SimpleRedisSettingsStorage(AbstractSettingsStorage):
                 ]
             )
         )
+
+        # snapshot is cached only if no change was announced while reading it
+        if self._listening and version == self._version:
+            self._snapshot = snapshot
+
+        return snapshot
+
+    async def notify_settings_changed(self):
+        self._invalidate()
+        await self._connection.publish(self.get_key("invalidate"), self._version)
+
+    async def listen_for_changes(self):
+        """Keep settings snapshot cached until other process announces change.
+
+        Returns when the subscription is closed, caching is disabled then.
+        """
+        channel, = await self._connection.subscribe(self.get_key("invalidate"))
+        self._invalidate()
+        self._listening = True
+
+        try:
+            while await channel.wait_message():
+                await channel.get()
+                self._invalidate()
+        finally:
+            self._listening = False
+            self._invalidate()
+
+    def _invalidate(self):
+        self._version += 1
+        self._snapshot = None
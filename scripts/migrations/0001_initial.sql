@@ -1,5 +1,4 @@
-DROP TABLE IF EXISTS contact CASCADE;
-CREATE TABLE contact (
+CREATE TABLE IF NOT EXISTS contact (
   id serial PRIMARY KEY,
   name VARCHAR(64) NOT NULL,
   email VARCHAR(128) NOT NULL UNIQUE,
@@ -7,14 +6,12 @@ CREATE TABLE contact (
   last_name VARCHAR(64) DEFAULT ''
 );
 
-DROP TABLE IF EXISTS segment CASCADE;
-CREATE TABLE segment (
+CREATE TABLE IF NOT EXISTS segment (
   id serial PRIMARY KEY,
   name VARCHAR(64) NOT NULL UNIQUE
 );
 
-DROP TABLE IF EXISTS segment_contact CASCADE;
-CREATE TABLE segment_contact (
+CREATE TABLE IF NOT EXISTS segment_contact (
   contact_id serial NOT NULL,
   segment_id serial NOT NULL,
   PRIMARY KEY (segment_id, contact_id),
@@ -26,15 +23,13 @@ CREATE TABLE segment_contact (
     ON UPDATE NO ACTION ON DELETE CASCADE
 );
 
-DROP TABLE IF EXISTS email_template CASCADE;
-CREATE TABLE email_template (
+CREATE TABLE IF NOT EXISTS email_template (
   id serial PRIMARY KEY,
   name VARCHAR(128) NOT NULL,
   template TEXT NOT NULL
 );
 
-DROP TABLE IF EXISTS email_request CASCADE;
-CREATE TABLE email_request (
+CREATE TABLE IF NOT EXISTS email_request (
   id serial PRIMARY KEY,
   name VARCHAR(128) NOT NULL,
   template_id serial NOT NULL,
@@ -47,8 +42,7 @@ CREATE TABLE email_request (
     ON UPDATE NO ACTION ON DELETE CASCADE
 );
 
-DROP TABLE IF EXISTS job CASCADE;
-CREATE TABLE job (
+CREATE TABLE IF NOT EXISTS job (
   id serial PRIMARY KEY,
   request_id serial NOT NULL,
   status VARCHAR(16) NOT NULL,
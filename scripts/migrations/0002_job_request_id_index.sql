@@ -0,0 +1,4 @@
+-- migration: no-transaction
+-- index left invalid by an interrupted build is built again
+DROP INDEX CONCURRENTLY IF EXISTS job_request_id_idx;
+CREATE INDEX CONCURRENTLY job_request_id_idx ON job (request_id);
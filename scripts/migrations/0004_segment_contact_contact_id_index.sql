@@ -0,0 +1,4 @@
+-- migration: no-transaction
+-- index left invalid by an interrupted build is built again
+DROP INDEX CONCURRENTLY IF EXISTS segment_contact_contact_id_idx;
+CREATE INDEX CONCURRENTLY segment_contact_contact_id_idx ON segment_contact (contact_id);
@@ -0,0 +1,72 @@
+-- row counts read by list pages, kept up to date by triggers instead of
+-- running count(*) over whole tables; segment_contact is counted per segment
+CREATE TABLE IF NOT EXISTS row_counter (
+  table_name VARCHAR(64) NOT NULL,
+  key INTEGER NOT NULL DEFAULT 0,
+  count BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (table_name, key)
+);
+
+CREATE OR REPLACE FUNCTION count_rows() RETURNS trigger AS $$
+DECLARE
+  counter_key INTEGER := 0;
+  delta INTEGER := 1;
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    delta := -1;
+  END IF;
+
+  IF TG_TABLE_NAME = 'segment_contact' THEN
+    IF TG_OP = 'DELETE' THEN
+      counter_key := OLD.segment_id;
+    ELSE
+      counter_key := NEW.segment_id;
+    END IF;
+  END IF;
+
+  INSERT INTO row_counter (table_name, key, count)
+  VALUES (TG_TABLE_NAME, counter_key, delta)
+  ON CONFLICT (table_name, key)
+  DO UPDATE SET count = row_counter.count + excluded.count;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS contact_count ON contact;
+CREATE TRIGGER contact_count AFTER INSERT OR DELETE ON contact
+  FOR EACH ROW EXECUTE PROCEDURE count_rows();
+
+DROP TRIGGER IF EXISTS segment_count ON segment;
+CREATE TRIGGER segment_count AFTER INSERT OR DELETE ON segment
+  FOR EACH ROW EXECUTE PROCEDURE count_rows();
+
+DROP TRIGGER IF EXISTS segment_contact_count ON segment_contact;
+CREATE TRIGGER segment_contact_count AFTER INSERT OR DELETE ON segment_contact
+  FOR EACH ROW EXECUTE PROCEDURE count_rows();
+
+-- counters of deleted segments are useless
+CREATE OR REPLACE FUNCTION drop_segment_counter() RETURNS trigger AS $$
+BEGIN
+  DELETE FROM row_counter
+  WHERE table_name = 'segment_contact' AND key = OLD.id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS segment_drop_counter ON segment;
+CREATE TRIGGER segment_drop_counter AFTER DELETE ON segment
+  FOR EACH ROW EXECUTE PROCEDURE drop_segment_counter();
+
+-- counts of rows inserted before the triggers existed
+LOCK TABLE contact, segment, segment_contact IN SHARE ROW EXCLUSIVE MODE;
+
+DELETE FROM row_counter;
+
+INSERT INTO row_counter (table_name, key, count)
+SELECT 'contact', 0, count(*) FROM contact
+UNION ALL
+SELECT 'segment', 0, count(*) FROM segment
+UNION ALL
+SELECT 'segment_contact', segment_id, count(*)
+FROM segment_contact GROUP BY segment_id;
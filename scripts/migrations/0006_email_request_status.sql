@@ -0,0 +1,32 @@
+-- number of jobs of each campaign per status, kept by the job repository when
+-- jobs are created and statuses are reported
+CREATE TABLE IF NOT EXISTS email_request_status (
+  request_id INTEGER NOT NULL,
+  status VARCHAR(16) NOT NULL,
+  count BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (request_id, status),
+  CONSTRAINT email_request_status_request_fk FOREIGN KEY (request_id)
+    REFERENCES email_request (id) MATCH SIMPLE
+    ON UPDATE NO ACTION ON DELETE CASCADE
+);
+
+-- jobs are deleted only together with their contacts or campaigns, summary of
+-- a deleted campaign is gone already
+CREATE OR REPLACE FUNCTION uncount_job() RETURNS trigger AS $$
+BEGIN
+  UPDATE email_request_status SET count = count - 1
+  WHERE request_id = OLD.request_id AND status = OLD.status;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS job_uncount ON job;
+CREATE TRIGGER job_uncount AFTER DELETE ON job
+  FOR EACH ROW EXECUTE PROCEDURE uncount_job();
+
+LOCK TABLE job IN SHARE ROW EXCLUSIVE MODE;
+
+DELETE FROM email_request_status;
+
+INSERT INTO email_request_status (request_id, status, count)
+SELECT request_id, status, count(*) FROM job GROUP BY request_id, status;
@@ -0,0 +1,9 @@
+-- migration: no-transaction
+-- campaign jobs are listed ordered by id, optionally filtered by status
+DROP INDEX CONCURRENTLY IF EXISTS job_request_id_status_idx;
+CREATE INDEX CONCURRENTLY job_request_id_status_idx
+  ON job (request_id, status, id);
+DROP INDEX CONCURRENTLY IF EXISTS job_request_id_id_idx;
+CREATE INDEX CONCURRENTLY job_request_id_id_idx ON job (request_id, id);
+-- prefix of the indexes above
+DROP INDEX CONCURRENTLY IF EXISTS job_request_id_idx;
@@ -0,0 +1,3 @@
+-- segments with a rule are evaluated against contact when a campaign is
+-- created, segment_contact rows are kept only for static segments
+ALTER TABLE segment ADD COLUMN IF NOT EXISTS rule JSONB;
@@ -0,0 +1,6 @@
+-- migration: no-transaction
+-- rules match contacts by email domain, expression has to stay in sync with
+-- web/repositories/sqlalchemy/rules.py
+DROP INDEX CONCURRENTLY IF EXISTS contact_email_domain_idx;
+CREATE INDEX CONCURRENTLY contact_email_domain_idx
+  ON contact (lower(split_part(email, '@', 2)));
@@ -0,0 +1,10 @@
+-- campaigns are sent to contacts of segment_id and include_segment_ids which
+-- are in none of exclude_segment_ids and didn't receive exclude_template_id
+ALTER TABLE email_request
+  ADD COLUMN IF NOT EXISTS include_segment_ids INTEGER[] NOT NULL DEFAULT '{}',
+  ADD COLUMN IF NOT EXISTS exclude_segment_ids INTEGER[] NOT NULL DEFAULT '{}',
+  ADD COLUMN IF NOT EXISTS exclude_template_id INTEGER,
+  DROP CONSTRAINT IF EXISTS email_request_exclude_template_fk,
+  ADD CONSTRAINT email_request_exclude_template_fk
+    FOREIGN KEY (exclude_template_id) REFERENCES email_template (id) MATCH SIMPLE
+    ON UPDATE NO ACTION ON DELETE SET NULL;
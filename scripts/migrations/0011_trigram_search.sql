@@ -0,0 +1,13 @@
+-- migration: no-transaction
+-- contacts and segments are searched by similarity and substring, both served
+-- by trigram indexes; pg_trgm is shipped with the Postgres contrib package
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+DROP INDEX CONCURRENTLY IF EXISTS contact_name_trgm_idx;
+CREATE INDEX CONCURRENTLY contact_name_trgm_idx
+  ON contact USING gin (name gin_trgm_ops);
+DROP INDEX CONCURRENTLY IF EXISTS contact_email_trgm_idx;
+CREATE INDEX CONCURRENTLY contact_email_trgm_idx
+  ON contact USING gin (email gin_trgm_ops);
+DROP INDEX CONCURRENTLY IF EXISTS segment_name_trgm_idx;
+CREATE INDEX CONCURRENTLY segment_name_trgm_idx
+  ON segment USING gin (name gin_trgm_ops);
@@ -0,0 +1,89 @@
+-- counters are updated once per statement with the rows it changed grouped by
+-- key, so bulk inserts and deletes don't update a counter row for every row;
+-- transition tables need Postgres 10
+DROP TRIGGER IF EXISTS contact_count ON contact;
+DROP TRIGGER IF EXISTS segment_count ON segment;
+DROP TRIGGER IF EXISTS segment_contact_count ON segment_contact;
+DROP TRIGGER IF EXISTS segment_drop_counter ON segment;
+DROP FUNCTION IF EXISTS count_rows();
+
+CREATE OR REPLACE FUNCTION count_table_rows() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO row_counter (table_name, key, count)
+    SELECT TG_TABLE_NAME, 0, count(*) FROM new_rows HAVING count(*) > 0
+    ON CONFLICT (table_name, key)
+    DO UPDATE SET count = row_counter.count + excluded.count;
+  ELSE
+    INSERT INTO row_counter (table_name, key, count)
+    SELECT TG_TABLE_NAME, 0, -count(*) FROM old_rows HAVING count(*) > 0
+    ON CONFLICT (table_name, key)
+    DO UPDATE SET count = row_counter.count + excluded.count;
+  END IF;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- segment_contact is counted per segment, counters are locked in segment_id
+-- order so concurrent statements can't deadlock
+CREATE OR REPLACE FUNCTION count_segment_contacts() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO row_counter (table_name, key, count)
+    SELECT TG_TABLE_NAME, segment_id, count(*) FROM new_rows
+    GROUP BY segment_id ORDER BY segment_id
+    ON CONFLICT (table_name, key)
+    DO UPDATE SET count = row_counter.count + excluded.count;
+  ELSE
+    INSERT INTO row_counter (table_name, key, count)
+    SELECT TG_TABLE_NAME, segment_id, -count(*) FROM old_rows
+    GROUP BY segment_id ORDER BY segment_id
+    ON CONFLICT (table_name, key)
+    DO UPDATE SET count = row_counter.count + excluded.count;
+  END IF;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- counters of deleted segments are useless
+CREATE OR REPLACE FUNCTION drop_segment_counters() RETURNS trigger AS $$
+BEGIN
+  DELETE FROM row_counter
+  WHERE table_name = 'segment_contact' AND key IN (SELECT id FROM old_rows);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP FUNCTION IF EXISTS drop_segment_counter();
+
+-- a trigger with transition tables can handle a single event only
+CREATE TRIGGER contact_insert_count AFTER INSERT ON contact
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE count_table_rows();
+
+CREATE TRIGGER contact_delete_count AFTER DELETE ON contact
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE count_table_rows();
+
+CREATE TRIGGER segment_insert_count AFTER INSERT ON segment
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE count_table_rows();
+
+CREATE TRIGGER segment_delete_count AFTER DELETE ON segment
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE count_table_rows();
+
+CREATE TRIGGER segment_contact_insert_count AFTER INSERT ON segment_contact
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE count_segment_contacts();
+
+CREATE TRIGGER segment_contact_delete_count AFTER DELETE ON segment_contact
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE count_segment_contacts();
+
+-- fires after the cascaded deletes of memberships have been counted
+CREATE TRIGGER segment_drop_counters AFTER DELETE ON segment
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE PROCEDURE drop_segment_counters();
@@ -0,0 +1,120 @@
+from asyncio import sleep
+
+from asynctest import TestCase, CoroutineMock, patch, MagicMock
+
+from common.coalescing import CoalescingBuffer
+
+
+class CoalescingBufferTestCase(TestCase):
+    def setUp(self):
+        self.write = CoroutineMock()
+
+    async def test_flush_on_size(self):
+        buffer = CoalescingBuffer(self.write, 3, 60)
+
+        await buffer.add(
+            {
+                "success": [{"id": 1, "message_id": "a1"}],
+                "recoverable_failure": [{"id": 2, "message_id": ""}],
+            }
+        )
+        self.write.assert_not_awaited()
+
+        await buffer.add({"failure": [{"id": 3, "message_id": ""}]})
+
+        self.write.assert_awaited_once_with(
+            {
+                "success": [{"id": 1, "message_id": "a1"}],
+                "recoverable_failure": [{"id": 2, "message_id": ""}],
+                "failure": [{"id": 3, "message_id": ""}],
+            }
+        )
+        await buffer.close()
+
+    async def test_flush_on_interval(self):
+        buffer = CoalescingBuffer(self.write, 100, 0.01)
+
+        await buffer.add({"success": [{"id": 1, "message_id": "a1"}]})
+        await buffer.add({"success": [{"id": 2, "message_id": "a2"}]})
+        self.write.assert_not_awaited()
+
+        await sleep(0.05)
+
+        self.write.assert_awaited_once_with(
+            {"success": [{"id": 1, "message_id": "a1"}, {"id": 2, "message_id": "a2"}]}
+        )
+
+    async def test_latest_status_wins(self):
+        buffer = CoalescingBuffer(self.write, 100, 60)
+
+        await buffer.add({"recoverable_failure": [{"id": 1, "message_id": ""}]})
+        await buffer.add({"success": [{"id": 1, "message_id": "a1"}]})
+        await buffer.close()
+
+        self.write.assert_awaited_once_with(
+            {"success": [{"id": 1, "message_id": "a1"}]}
+        )
+
+    @patch("common.coalescing.logger")
+    async def test_failed_flush_keeps_statuses(self, logger_mock: MagicMock):
+        buffer = CoalescingBuffer(self.write, 100, 60)
+        self.write.side_effect = [ConnectionError(), None]
+
+        await buffer.add({"success": [{"id": 1, "message_id": "a1"}]})
+        with self.assertRaises(ConnectionError):
+            await buffer.flush()
+        await buffer.add({"failure": [{"id": 2, "message_id": ""}]})
+        await buffer.close()
+
+        logger_mock.error.assert_called_once()
+        self.write.assert_awaited_with(
+            {
+                "success": [{"id": 1, "message_id": "a1"}],
+                "failure": [{"id": 2, "message_id": ""}],
+            }
+        )
+
+    @patch("common.coalescing.logger")
+    async def test_timer_retries_failed_flush(self, logger_mock: MagicMock):
+        self.write.side_effect = [ConnectionError(), None]
+        buffer = CoalescingBuffer(self.write, 100, 0.01)
+
+        await buffer.add({"success": [{"id": 1}]})
+        # failure is logged with a traceback, which can take a while
+        for _ in range(100):
+            if self.write.await_count == 2:
+                break
+            await sleep(0.01)
+
+        self.assertEqual(2, self.write.await_count)
+        self.write.assert_awaited_with({"success": [{"id": 1}]})
+        logger_mock.error.assert_called_once()
+        await buffer.close()
+
+    async def test_close_flushes(self):
+        buffer = CoalescingBuffer(self.write, 100, 60)
+
+        await buffer.add({"failure": [{"id": 1, "message_id": ""}]})
+        await buffer.close()
+
+        self.write.assert_awaited_once_with({"failure": [{"id": 1, "message_id": ""}]})
+
+    @patch("common.coalescing.logger")
+    async def test_close_bounded(self, logger_mock: MagicMock):
+        async def slow_write(statuses):
+            await sleep(1)
+
+        self.write.side_effect = slow_write
+        buffer = CoalescingBuffer(self.write, 100, 60)
+
+        await buffer.add({"success": [{"id": 1, "message_id": "a1"}]})
+        await buffer.close(0.01)
+
+        logger_mock.error.assert_called_once()
+
+    async def test_close_nothing_pending(self):
+        buffer = CoalescingBuffer(self.write, 100, 60)
+
+        await buffer.close()
+
+        self.write.assert_not_awaited()
@@ -2,7 +2,7 @@ from asynctest import TestCase, Mock, CoroutineMock
 from voluptuous import Coerce, Email, Schema
 
 from common.decorators import validate_json, handle_errors
-from common.exceptions import ValidationError, UnsupportedFormatError
+from common.exceptions import OverloadedError, ValidationError, UnsupportedFormatError
 
 
 class TestValidateDecoratorTestCase(TestCase):
@@ -94,6 +94,15 @@ class TestHandleErrorsDecoratorTestCase(TestCase):
         self.handler_mock.set_status.assert_called_once_with(415)
         self.handler_mock.write.assert_called_once_with({"error": "Expected JSON"})
 
+    async def test_overloaded(self):
+        self.dummy_coro.side_effect = OverloadedError("Try later", 3)
+
+        await handle_errors(self.dummy_coro)(self.handler_mock)
+
+        self.handler_mock.set_status.assert_called_once_with(503)
+        self.handler_mock.set_header.assert_called_once_with("Retry-After", 3)
+        self.handler_mock.write.assert_called_once_with({"error": "Try later"})
+
     async def test_server_error(self):
         self.dummy_coro.side_effect = ValueError("It didn't work")
 
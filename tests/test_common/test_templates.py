@@ -0,0 +1,48 @@
+from unittest import TestCase
+
+from common.exceptions import TemplateError
+from common.templates import compile_template
+
+
+class CompileTemplateTestCase(TestCase):
+    def test_render(self):
+        template = compile_template("Hey {name}! We'll send spam to {email}.")
+
+        self.assertEqual(
+            template.render({"name": "Guy", "email": "guy@co.co", "id": 12}),
+            "Hey Guy! We'll send spam to guy@co.co.",
+        )
+        self.assertEqual(template.fields, frozenset({"name", "email"}))
+
+    def test_render_matches_format(self):
+        template = "{{escaped}} {id:>5} {name!r} {first_name}{last_name}"
+        job = {"id": 12, "name": "Guy", "first_name": "Jan", "last_name": "Nowak"}
+
+        self.assertEqual(compile_template(template).render(job), template.format(**job))
+
+    def test_no_fields(self):
+        self.assertEqual(compile_template("Hello!").render({}), "Hello!")
+
+    def test_cached(self):
+        self.assertIs(compile_template("Hi {name}!"), compile_template("Hi {name}!"))
+
+    def test_unsupported_params(self):
+        with self.assertRaises(TemplateError) as exc_dec:
+            compile_template("Hey {name}! {12ds} {}")
+
+        self.assertEqual(exc_dec.exception.args, ("Used unsupported params: , 12ds",))
+
+    def test_custom_available_fields(self):
+        compile_template("Hey {nickname}!", frozenset({"nickname"}))
+
+        with self.assertRaises(TemplateError):
+            compile_template("Hey {name}!", frozenset({"nickname"}))
+
+    def test_malformed(self):
+        self.assertRaises(TemplateError, compile_template, "Hey {name!")
+        self.assertRaises(TemplateError, compile_template, "Hey {name")
+        self.assertRaises(TemplateError, compile_template, "Hey {name!x}")
+        self.assertRaises(TemplateError, compile_template, "Hey {name:{id}}")
+
+    def test_missing_data(self):
+        self.assertRaises(KeyError, compile_template("Hey {name}!").render, {})
@@ -1,9 +1,11 @@
 import json
 
-from asynctest import create_autospec, patch, MagicMock
+from asynctest import create_autospec, call
 from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application
 
 from email_client.app import make_app
+from email_client.controllers.email import EmailHandler
 from email_client.services.email.abstract import AbstractSendEmailService
 from email_client.services.settings.abstract import AbstractSettingsService
 
@@ -17,8 +19,7 @@ class TestEmailHandler(AsyncHTTPTestCase):
     def get_app(self):
         return make_app(self.settings_service, self.email_service)
 
-    @patch("email_client.controllers.email.ensure_future")
-    def test_post(self, ensure_future_mock: MagicMock):
+    def test_post(self):
         response = self.fetch(
             "/api/v1/email",
             method="POST",
@@ -34,11 +35,110 @@ class TestEmailHandler(AsyncHTTPTestCase):
             ),
         )
         self.assertEqual(response.code, 202)
-        ensure_future_mock.assert_called_once_with(
-            self.email_service.send_emails.return_value
-        )
-        self.email_service.send_emails.assert_called_once_with(
+        self.email_service.dispatch_sending_emails.assert_awaited_once_with(
             jobs=[{"id": 13, "email": "guy@co.co"}, {"id": 14, "email": "other@co.co"}],
             template="Hello!",
             subject="Hi!",
         )
+
+    def test_post_invalid(self):
+        response = self.fetch(
+            "/api/v1/email",
+            method="POST",
+            body=json.dumps({"jobs": [], "template": "Hello!", "subject": "Hi!"}),
+        )
+        self.assertEqual(response.code, 400)
+        self.email_service.dispatch_sending_emails.assert_not_awaited()
+
+
+class TestEmailHandlerStream(AsyncHTTPTestCase):
+    def setUp(self):
+        self.email_service = create_autospec(AbstractSendEmailService)
+        super().setUp()
+
+    def get_app(self):
+        return Application(
+            [
+                (
+                    r"/api/v1/email",
+                    EmailHandler,
+                    {"email_service": self.email_service, "stream_chunk_size": 2},
+                )
+            ]
+        )
+
+    def post_stream(self, lines):
+        return self.fetch(
+            "/api/v1/email",
+            method="POST",
+            headers={"Content-Type": "application/x-ndjson"},
+            body="\n".join(lines),
+        )
+
+    def test_post_stream(self):
+        response = self.post_stream(
+            [json.dumps({"template": "Hello!", "subject": "Hi!"})]
+            + [json.dumps({"id": i, "email": f"guy_{i}@co.co"}) for i in range(1, 6)]
+        )
+
+        self.assertEqual(response.code, 202)
+        self.assertEqual(json.loads(response.body), {"accepted": 5})
+        self.email_service.dispatch_sending_emails.assert_has_awaits(
+            [
+                call(
+                    [
+                        {"id": 1, "email": "guy_1@co.co"},
+                        {"id": 2, "email": "guy_2@co.co"},
+                    ],
+                    "Hello!",
+                    "Hi!",
+                ),
+                call(
+                    [
+                        {"id": 3, "email": "guy_3@co.co"},
+                        {"id": 4, "email": "guy_4@co.co"},
+                    ],
+                    "Hello!",
+                    "Hi!",
+                ),
+                call([{"id": 5, "email": "guy_5@co.co"}], "Hello!", "Hi!"),
+            ]
+        )
+
+    def test_post_stream_invalid_job(self):
+        response = self.post_stream(
+            [
+                json.dumps({"template": "Hello!", "subject": "Hi!"}),
+                json.dumps({"id": 1, "email": "guy_1@co.co"}),
+                json.dumps({"id": 2, "email": "guy_2@co.co"}),
+                json.dumps({"id": 3, "email": "not an email"}),
+                json.dumps({"id": 4, "email": "guy_4@co.co"}),
+            ]
+        )
+
+        self.assertEqual(response.code, 400)
+        self.assertIn("Line 4", json.loads(response.body)["error"])
+        self.assertEqual(response.headers["X-Accepted-Jobs"], "2")
+        self.email_service.dispatch_sending_emails.assert_awaited_once()
+
+    def test_post_stream_invalid_json(self):
+        response = self.post_stream(
+            [json.dumps({"template": "Hello!", "subject": "Hi!"}), "{not json"]
+        )
+
+        self.assertEqual(response.code, 415)
+        self.email_service.dispatch_sending_emails.assert_not_awaited()
+
+    def test_post_stream_missing_header(self):
+        response = self.post_stream([])
+
+        self.assertEqual(response.code, 400)
+        self.email_service.dispatch_sending_emails.assert_not_awaited()
+
+    def test_post_stream_no_jobs(self):
+        response = self.post_stream(
+            [json.dumps({"template": "Hello!", "subject": "Hi!"})]
+        )
+
+        self.assertEqual(response.code, 400)
+        self.email_service.dispatch_sending_emails.assert_not_awaited()
@@ -70,6 +70,37 @@ class FlypsGatewayClientTestCase(TestCase):
             [call(job, template, subject, auth, email_from, headers) for job in jobs]
         )
 
+    @patch("email_client.integrations.email.flyps.logger")
+    async def test_send_emails_invalid_template(self, logger_mock: MagicMock):
+        send_email_mock = CoroutineMock()
+        client = FlypsGatewayClient("http://test.co", self.session)
+        jobs = [
+            {"id": 132, "email": "test_1@te.st", "first_name": "Janusz"},
+            {"id": 133, "email": "test_2@te.st", "first_name": "Jan"},
+        ]
+
+        with patch.object(client, "_send_email", send_email_mock):
+            results, retry = await client.send_emails(
+                jobs,
+                "Hi {nickname}!",
+                "Subject",
+                ("admin", "admin1"),
+                {"name": "Admin", "email": "admin@co.oc"},
+            )
+
+        self.assertEqual(
+            results,
+            {
+                EmailResult.FAILURE: [
+                    {"id": 132, "message_id": ""},
+                    {"id": 133, "message_id": ""},
+                ]
+            },
+        )
+        self.assertEqual(retry, [])
+        send_email_mock.assert_not_awaited()
+        logger_mock.error.assert_called_once()
+
     async def test_send_email_202(self):
         job = {"id": 14573, "name": "User", "email": "user@co.co", "subject": "Hello!"}
         template = "Hello {name}! Welcome in our subscription."
@@ -200,6 +231,110 @@ class FlypsGatewayClientTestCase(TestCase):
             auth=BasicAuth("user", "admin1", encoding="UTF-8"),
         )
 
+    async def test_send_email_429(self):
+        job = {"id": 14573, "name": "User", "email": "user@co.co"}
+        limiter = Mock(acquire=CoroutineMock(return_value=(0, 1.0)), release=Mock())
+        self.session.post.return_value = Mock(status=429, headers={"Retry-After": "7"})
+
+        client = FlypsGatewayClient("http://test.co", self.session, limiter)
+        result, message_id = await client._send_email(
+            job,
+            "Hello {name}!",
+            "Subject",
+            ("user", "admin1"),
+            {"email": "admin@co.co", "name": "Admin"},
+            {},
+        )
+
+        self.assertEqual(result, EmailResult.RECOVERABLE_FAILURE)
+        self.assertIsNone(message_id)
+        limiter.acquire.assert_awaited_once()
+        limiter.release.assert_called_once_with((0, 1.0), True, 7.0)
+
+    async def test_send_email_202_releases_limiter(self):
+        job = {"id": 14573, "name": "User", "email": "user@co.co"}
+        limiter = Mock(acquire=CoroutineMock(return_value=(0, 1.0)), release=Mock())
+        self.session.post.return_value = Mock(
+            status=202, json=CoroutineMock(return_value={"message_id": "<a1>"})
+        )
+
+        client = FlypsGatewayClient("http://test.co", self.session, limiter)
+        result, message_id = await client._send_email(
+            job,
+            "Hello {name}!",
+            "Subject",
+            ("user", "admin1"),
+            {"email": "admin@co.co", "name": "Admin"},
+            {},
+        )
+
+        self.assertEqual(result, EmailResult.SUCCESS)
+        limiter.release.assert_called_once_with((0, 1.0), False, None)
+
+    async def test_send_email_throttled_by_domain(self):
+        job = {"id": 14573, "name": "User", "email": "user@co.co"}
+        throttler = Mock(acquire=CoroutineMock())
+        self.session.post.return_value = Mock(
+            status=202, json=CoroutineMock(return_value={"message_id": "<a1>"})
+        )
+
+        client = FlypsGatewayClient("http://test.co", self.session, None, throttler)
+        result, message_id = await client._send_email(
+            job,
+            "Hello {name}!",
+            "Subject",
+            ("user", "admin1"),
+            {"email": "admin@co.co", "name": "Admin"},
+            {},
+        )
+
+        self.assertEqual(result, EmailResult.SUCCESS)
+        throttler.acquire.assert_awaited_once_with("user@co.co")
+
+    @patch("email_client.integrations.email.flyps.logger")
+    async def test_send_email_missing_template_data(self, logger_mock: MagicMock):
+        job = {"id": 14573, "email": "user@co.co"}
+
+        client = FlypsGatewayClient("http://test.co", self.session)
+        result, message_id = await client._send_email(
+            job,
+            "Hello {name}!",
+            "Subject",
+            ("user", "admin1"),
+            {"email": "admin@co.co", "name": "Admin"},
+            {},
+        )
+
+        self.assertEqual(result, EmailResult.FAILURE)
+        self.session.post.assert_not_awaited()
+        logger_mock.error.assert_called_once()
+
+    @patch("email_client.integrations.email.flyps.logger")
+    async def test_send_email_template_spec_mismatch(self, logger_mock: MagicMock):
+        job = {"id": 14573, "email": "user@co.co", "name": "Jan"}
+
+        client = FlypsGatewayClient("http://test.co", self.session)
+        result, message_id = await client._send_email(
+            job,
+            "Hello {name:d}!",
+            "Subject",
+            ("user", "admin1"),
+            {"email": "admin@co.co", "name": "Admin"},
+            {},
+        )
+
+        self.assertEqual(result, EmailResult.FAILURE)
+        self.session.post.assert_not_awaited()
+        logger_mock.error.assert_called_once()
+
+    def test_parse_retry_after(self):
+        self.assertEqual(FlypsGatewayClient._parse_retry_after("120"), 120.0)
+        self.assertEqual(
+            FlypsGatewayClient._parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0
+        )
+        self.assertIsNone(FlypsGatewayClient._parse_retry_after("soon"))
+        self.assertIsNone(FlypsGatewayClient._parse_retry_after(None))
+
     @patch("email_client.integrations.email.flyps.logger")
     async def test_send_email_timeout(self, logger_mock: MagicMock):
         job = {"id": 14573, "name": "User", "email": "user@co.co", "subject": "Hello!"}
@@ -0,0 +1,74 @@
+from asyncio import ensure_future, sleep
+from itertools import count
+
+from asynctest import TestCase, patch, CoroutineMock
+
+from email_client.integrations.email.limiter import AdaptiveConcurrencyLimiter
+
+
+class AdaptiveConcurrencyLimiterTestCase(TestCase):
+    async def test_limits_in_flight(self):
+        limiter = AdaptiveConcurrencyLimiter(2)
+
+        first = await limiter.acquire()
+        await limiter.acquire()
+        waiting = ensure_future(limiter.acquire())
+        await sleep(0)
+
+        self.assertFalse(waiting.done())
+        self.assertEqual(limiter.in_flight, 2)
+
+        limiter.release(first)
+        await sleep(0)
+
+        self.assertTrue(waiting.done())
+        self.assertEqual(limiter.in_flight, 2)
+
+    async def test_additive_increase(self):
+        limiter = AdaptiveConcurrencyLimiter(2, max_limit=3)
+
+        with patch(
+            "email_client.integrations.email.limiter.monotonic", side_effect=count()
+        ):
+            for _ in range(6):
+                limiter.release(await limiter.acquire())
+
+        self.assertEqual(limiter.limit, 3)
+
+    async def test_no_increase_when_latency_grows(self):
+        limiter = AdaptiveConcurrencyLimiter(2)
+
+        with patch(
+            "email_client.integrations.email.limiter.monotonic",
+            side_effect=[0, 0, 1, 2, 2, 7, 8, 8, 17],
+        ):
+            for _ in range(3):
+                limiter.release(await limiter.acquire())
+
+        self.assertEqual(limiter.limit, 2)
+
+    async def test_multiplicative_decrease_once_per_epoch(self):
+        limiter = AdaptiveConcurrencyLimiter(8, min_limit=3)
+
+        tokens = [await limiter.acquire() for _ in range(4)]
+        limiter.release(tokens[0], overloaded=True)
+        limiter.release(tokens[1], overloaded=True)
+
+        self.assertEqual(limiter.limit, 4)
+
+        limiter.release(await limiter.acquire(), overloaded=True)
+
+        self.assertEqual(limiter.limit, 3)
+
+    @patch("email_client.integrations.email.limiter.sleep", new_callable=CoroutineMock)
+    async def test_retry_after_blocks_new_requests(self, sleep_mock: CoroutineMock):
+        limiter = AdaptiveConcurrencyLimiter(8)
+
+        with patch(
+            "email_client.integrations.email.limiter.monotonic",
+            side_effect=[0, 1, 1, 2, 31, 31],
+        ):
+            limiter.release(await limiter.acquire(), overloaded=True, retry_after=30)
+            await limiter.acquire()
+
+        sleep_mock.assert_awaited_once_with(29)
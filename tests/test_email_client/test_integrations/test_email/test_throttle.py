@@ -0,0 +1,54 @@
+from asynctest import TestCase, patch, CoroutineMock
+
+from email_client.integrations.email.throttle import DomainThrottler, TokenBucket
+
+
+class TokenBucketTestCase(TestCase):
+    @patch("email_client.integrations.email.throttle.sleep", new_callable=CoroutineMock)
+    async def test_burst_then_rate(self, sleep_mock: CoroutineMock):
+        with patch(
+            "email_client.integrations.email.throttle.monotonic",
+            side_effect=[0, 0, 0, 0, 0.25],
+        ):
+            bucket = TokenBucket(2, 2)
+            await bucket.acquire()
+            await bucket.acquire()
+            sleep_mock.assert_not_awaited()
+
+            await bucket.acquire()
+            sleep_mock.assert_awaited_once_with(0.5)
+
+            await bucket.acquire()
+            self.assertEqual(sleep_mock.await_args_list[-1][0], (0.75,))
+
+
+class DomainThrottlerTestCase(TestCase):
+    async def test_only_limited_domains_throttled(self):
+        throttler = DomainThrottler({"Gmail.com": {"rate": 1, "burst": 1}})
+
+        with patch(
+            "email_client.integrations.email.throttle.sleep", new_callable=CoroutineMock
+        ) as sleep_mock:
+            await throttler.acquire("guy_1@gmail.com")
+            for i in range(5):
+                await throttler.acquire(f"guy_{i}@co.co")
+            sleep_mock.assert_not_awaited()
+
+            await throttler.acquire("guy_2@GMAIL.COM")
+            sleep_mock.assert_awaited_once()
+
+    async def test_default_limit_per_domain(self):
+        throttler = DomainThrottler(default_limit={"rate": 1, "burst": 1})
+
+        with patch(
+            "email_client.integrations.email.throttle.sleep", new_callable=CoroutineMock
+        ) as sleep_mock:
+            await throttler.acquire("guy_1@co.co")
+            await throttler.acquire("guy_1@example.com")
+            sleep_mock.assert_not_awaited()
+
+            await throttler.acquire("guy_2@co.co")
+            sleep_mock.assert_awaited_once()
+
+    def test_get_domain(self):
+        self.assertEqual(DomainThrottler.get_domain("Guy@Co.Co"), "co.co")
@@ -0,0 +1,43 @@
+from asynctest import TestCase, create_autospec
+
+from common.enums import EmailResult
+from email_client.integrations.web.abstract import AbstractWebClient
+from email_client.integrations.web.coalescing import CoalescingWebClient
+
+
+class CoalescingWebClientTestCase(TestCase):
+    def setUp(self):
+        self.web_client = create_autospec(AbstractWebClient)
+
+    async def test_report_job_status(self):
+        client = CoalescingWebClient(self.web_client, 100, 60)
+
+        await client.report_job_status(
+            {
+                EmailResult.SUCCESS: [{"id": 1, "message_id": "a1"}],
+                EmailResult.FAILURE: [{"id": 2, "message_id": ""}],
+            }
+        )
+        self.web_client.report_job_status.assert_not_awaited()
+
+        await client.flush()
+
+        self.web_client.report_job_status.assert_awaited_once_with(
+            {
+                EmailResult.SUCCESS: [{"id": 1, "message_id": "a1"}],
+                EmailResult.FAILURE: [{"id": 2, "message_id": ""}],
+            }
+        )
+        await client.close()
+
+    async def test_close_flushes(self):
+        client = CoalescingWebClient(self.web_client, 100, 60)
+
+        await client.report_job_status(
+            {EmailResult.FAILURE: [{"id": 1, "message_id": ""}]}
+        )
+        await client.close()
+
+        self.web_client.report_job_status.assert_awaited_once_with(
+            {EmailResult.FAILURE: [{"id": 1, "message_id": ""}]}
+        )
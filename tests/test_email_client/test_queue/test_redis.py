@@ -0,0 +1,249 @@
+import json
+from collections import OrderedDict
+
+from aioredis import ReplyError
+from asynctest import TestCase, CoroutineMock, Mock, call, patch
+
+from email_client.queue.redis import RedisRetryScheduler, RedisStreamJobQueue
+
+
+class RedisStreamJobQueueTestCase(TestCase):
+    def setUp(self):
+        self.pipeline = Mock(xadd=Mock(), execute=CoroutineMock())
+        self.redis = Mock(
+            execute=CoroutineMock(),
+            pipeline=Mock(return_value=self.pipeline),
+            xread_group=CoroutineMock(),
+            xpending=CoroutineMock(),
+            xclaim=CoroutineMock(),
+            xack=CoroutineMock(),
+        )
+        self.transaction = Mock(xadd=Mock(), xack=Mock(), execute=CoroutineMock())
+        self.redis.multi_exec = Mock(return_value=self.transaction)
+        self.queue = RedisStreamJobQueue(self.redis, 2)
+
+    async def test_initialize(self):
+        await self.queue.initialize()
+
+        self.redis.execute.assert_awaited_once_with(
+            b"XGROUP",
+            b"CREATE",
+            "email_client/queue/jobs",
+            "email_client",
+            "0",
+            b"MKSTREAM",
+        )
+
+    async def test_initialize_group_exists(self):
+        self.redis.execute.side_effect = ReplyError(
+            "BUSYGROUP Consumer Group name already exists"
+        )
+
+        await self.queue.initialize()
+
+    async def test_initialize_other_error(self):
+        self.redis.execute.side_effect = ReplyError("ERR unknown command")
+
+        with self.assertRaises(ReplyError):
+            await self.queue.initialize()
+
+    async def test_enqueue(self):
+        jobs = [{"id": i, "email": f"guy_{i}@co.co"} for i in range(1, 4)]
+
+        await self.queue.enqueue(jobs, "Hi {name}!", "Subject")
+
+        self.pipeline.xadd.assert_has_calls(
+            [
+                call(
+                    "email_client/queue/jobs",
+                    {
+                        "payload": json.dumps(
+                            {
+                                "jobs": jobs[:2],
+                                "template": "Hi {name}!",
+                                "subject": "Subject",
+                                "retry_attempt": 0,
+                            }
+                        )
+                    },
+                ),
+                call(
+                    "email_client/queue/jobs",
+                    {
+                        "payload": json.dumps(
+                            {
+                                "jobs": jobs[2:],
+                                "template": "Hi {name}!",
+                                "subject": "Subject",
+                                "retry_attempt": 0,
+                            }
+                        )
+                    },
+                ),
+            ]
+        )
+        self.pipeline.execute.assert_awaited_once()
+
+    async def test_consume(self):
+        entry = {
+            "jobs": [{"id": 1, "email": "guy_1@co.co"}],
+            "template": "Hi!",
+            "subject": "Subject",
+            "retry_attempt": 1,
+        }
+        self.redis.xread_group.return_value = [
+            (
+                b"email_client/queue/jobs",
+                b"1526985054069-0",
+                OrderedDict([(b"payload", json.dumps(entry).encode())]),
+            )
+        ]
+
+        self.assertEqual(
+            await self.queue.consume("worker-1", 1, 5000), [("1526985054069-0", entry)]
+        )
+        self.redis.xread_group.assert_awaited_once_with(
+            "email_client",
+            "worker-1",
+            ["email_client/queue/jobs"],
+            timeout=5000,
+            count=1,
+            latest_ids=[">"],
+        )
+
+    async def test_claim_stale(self):
+        entry = {
+            "jobs": [{"id": 1, "email": "guy_1@co.co"}],
+            "template": "Hi!",
+            "subject": "Subject",
+            "retry_attempt": 0,
+        }
+        self.redis.xpending.return_value = [
+            [b"1526985054069-0", b"worker-2", 120000, 3],
+            [b"1526985054070-0", b"worker-3", 100, 1],
+        ]
+        self.redis.xclaim.return_value = [
+            (b"1526985054069-0", OrderedDict([(b"payload", json.dumps(entry))]))
+        ]
+
+        self.assertEqual(
+            await self.queue.claim_stale("worker-1", 60000, 10),
+            [("1526985054069-0", entry, 3)],
+        )
+        self.redis.xpending.assert_awaited_once_with(
+            "email_client/queue/jobs", "email_client", "-", "+", 10
+        )
+        self.redis.xclaim.assert_awaited_once_with(
+            "email_client/queue/jobs",
+            "email_client",
+            "worker-1",
+            60000,
+            b"1526985054069-0",
+        )
+
+    async def test_claim_stale_nothing_pending(self):
+        self.redis.xpending.return_value = []
+
+        self.assertEqual(await self.queue.claim_stale("worker-1", 60000, 10), [])
+        self.redis.xclaim.assert_not_awaited()
+
+    async def test_renew(self):
+        await self.queue.renew("worker-1", "1526985054069-0")
+
+        self.redis.execute.assert_awaited_once_with(
+            b"XCLAIM",
+            "email_client/queue/jobs",
+            "email_client",
+            "worker-1",
+            0,
+            "1526985054069-0",
+            b"JUSTID",
+        )
+
+    async def test_acknowledge(self):
+        await self.queue.acknowledge("1526985054069-0", "1526985054070-0")
+
+        self.redis.xack.assert_awaited_once_with(
+            "email_client/queue/jobs",
+            "email_client",
+            "1526985054069-0",
+            "1526985054070-0",
+        )
+
+    async def test_dead_letter(self):
+        entry = {
+            "jobs": [{"id": 1, "email": "guy_1@co.co"}],
+            "template": "Hi!",
+            "subject": "Subject",
+            "retry_attempt": 0,
+        }
+
+        await self.queue.dead_letter("1526985054069-0", entry)
+
+        self.transaction.xadd.assert_called_once_with(
+            "email_client/queue/jobs/dead",
+            {"entry_id": "1526985054069-0", "payload": json.dumps(entry)},
+        )
+        self.transaction.xack.assert_called_once_with(
+            "email_client/queue/jobs", "email_client", "1526985054069-0"
+        )
+        self.transaction.execute.assert_awaited_once()
+
+
+class RedisRetrySchedulerTestCase(TestCase):
+    def setUp(self):
+        self.redis = Mock(
+            zadd=CoroutineMock(), zrem=CoroutineMock(), eval=CoroutineMock()
+        )
+        self.scheduler = RedisRetryScheduler(self.redis)
+
+    @patch("email_client.queue.redis.time", Mock(return_value=1000.0))
+    @patch("email_client.queue.redis.uuid4", Mock(return_value=Mock(hex="abc")))
+    async def test_schedule(self):
+        jobs = [{"id": 1, "email": "guy_1@co.co"}]
+
+        await self.scheduler.schedule(jobs, "Hi {name}!", "Subject", 2, 4.5)
+
+        self.redis.zadd.assert_awaited_once_with(
+            "email_client/retry/jobs",
+            1004.5,
+            json.dumps(
+                {
+                    "id": "abc",
+                    "jobs": jobs,
+                    "template": "Hi {name}!",
+                    "subject": "Subject",
+                    "retry_attempt": 2,
+                }
+            ),
+        )
+
+    @patch("email_client.queue.redis.time", Mock(return_value=1000.0))
+    async def test_pop_due(self):
+        entry = {
+            "jobs": [{"id": 1, "email": "guy_1@co.co"}],
+            "template": "Hi!",
+            "subject": "Subject",
+            "retry_attempt": 1,
+        }
+        member = json.dumps({"id": "abc", **entry})
+        self.redis.eval.return_value = [member.encode()]
+
+        self.assertEqual(await self.scheduler.pop_due(10), [(member, entry)])
+        self.redis.eval.assert_awaited_once_with(
+            RedisRetryScheduler.pop_due_script,
+            keys=["email_client/retry/jobs", "email_client/retry/jobs/processing"],
+            args=[1000.0, 10, 1060.0],
+        )
+
+    async def test_acknowledge(self):
+        await self.scheduler.acknowledge("entry-1", "entry-2")
+
+        self.redis.zrem.assert_awaited_once_with(
+            "email_client/retry/jobs/processing", "entry-1", "entry-2"
+        )
+
+    async def test_pop_due_nothing_due(self):
+        self.redis.eval.return_value = []
+
+        self.assertEqual(await self.scheduler.pop_due(10), [])
@@ -1,3 +1,5 @@
+from asyncio import sleep
+
 from asynctest import (
     TestCase,
     create_autospec,
@@ -11,6 +13,7 @@ from asynctest import (
 from common.enums import EmailResult
 from email_client.integrations.email.abstract import AbstractEmailGatewayClient
 from email_client.integrations.web.abstract import AbstractWebClient
+from email_client.queue.abstract import AbstractJobQueue, AbstractRetryScheduler
 from email_client.services.email.service import SendEmailService
 from email_client.settings.abstract import AbstractSettingsStorage
 
@@ -29,13 +32,13 @@ class SendEmailServiceTestCase(TestCase):
     def tearDown(self):
         self.ensure_future_patch.stop()
 
-    def test_dispatch_sending_emails(self):
+    async def test_dispatch_sending_emails(self):
         service = SendEmailService(
             self.web_client, self.email_client, self.settings_storage, 2
         )
 
         with patch.object(service, "send_emails", MagicMock()) as send_emails:
-            service.dispatch_sending_emails(
+            await service.dispatch_sending_emails(
                 [
                     {"id": i, "email": f"guy_{i}@co.co", "name": "Guy"}
                     for i in range(1, 6)
@@ -50,9 +53,39 @@ class SendEmailServiceTestCase(TestCase):
                 ],
                 "Hi {name}! Have a nice day",
                 "Subject",
+                0,
             )
             self.ensure_future_mock.assert_called_once_with(send_emails.return_value)
 
+    async def test_dispatch_sending_emails_to_queue(self):
+        job_queue = create_autospec(AbstractJobQueue)
+        service = SendEmailService(
+            self.web_client,
+            self.email_client,
+            self.settings_storage,
+            2,
+            job_queue=job_queue,
+        )
+
+        with patch.object(service, "send_emails", MagicMock()) as send_emails:
+            await service.dispatch_sending_emails(
+                [
+                    {"id": i, "email": f"guy_{i}@co.co", "name": "Guy"}
+                    for i in range(1, 6)
+                ],
+                "Hi {name}! Have a nice day",
+                "Subject",
+            )
+            send_emails.assert_not_called()
+
+        job_queue.enqueue.assert_awaited_once_with(
+            [{"id": i, "email": f"guy_{i}@co.co", "name": "Guy"} for i in range(1, 6)],
+            "Hi {name}! Have a nice day",
+            "Subject",
+            0,
+        )
+        self.ensure_future_mock.assert_not_called()
+
     async def test_send_emails_no_retry(self):
         params = (
             ("user", "pass"),
@@ -109,6 +142,79 @@ class SendEmailServiceTestCase(TestCase):
         )
         self.ensure_future_mock.assert_not_called()
 
+    async def test_send_emails_bounded_in_flight(self):
+        self.settings_storage.get_gateway_credentials_headers_and_from.return_value = (
+            ("user", "pass"),
+            {},
+            {"name": "Admin", "email": "admin@co.co"},
+        )
+        in_flight = []
+        max_in_flight = []
+
+        async def send_email_batch(batch, *args):
+            in_flight.append(batch)
+            max_in_flight.append(len(in_flight))
+            await sleep(0)
+            in_flight.remove(batch)
+            return []
+
+        service = SendEmailService(
+            self.web_client,
+            self.email_client,
+            self.settings_storage,
+            2,
+            max_in_flight=3,
+        )
+
+        with patch.object(
+            service, "send_email_batch", CoroutineMock(side_effect=send_email_batch)
+        ) as send_email_batch_mock:
+            await service.send_emails(
+                [
+                    {"id": i, "email": f"guy_{i}@co.co", "name": "Guy"}
+                    for i in range(1, 21)
+                ],
+                "Hi {name}! Have a nice day",
+                "Subject",
+            )
+
+        self.assertEqual(send_email_batch_mock.await_count, 10)
+        self.assertEqual(max(max_in_flight), 3)
+        self.ensure_future_mock.assert_not_called()
+
+    @patch("email_client.services.email.service.logger")
+    async def test_send_emails_batch_error(self, logger_mock: MagicMock):
+        self.settings_storage.get_gateway_credentials_headers_and_from.return_value = (
+            ("user", "pass"),
+            {},
+            {"name": "Admin", "email": "admin@co.co"},
+        )
+        jobs = [
+            {"id": i, "email": f"guy_{i}@co.co", "name": "Guy"} for i in range(1, 7)
+        ]
+        retry_scheduler = create_autospec(AbstractRetryScheduler)
+
+        service = SendEmailService(
+            self.web_client,
+            self.email_client,
+            self.settings_storage,
+            2,
+            max_in_flight=1,
+            retry_scheduler=retry_scheduler,
+        )
+
+        with patch.object(
+            service,
+            "send_email_batch",
+            CoroutineMock(side_effect=[ConnectionError(), [jobs[2]], []]),
+        ), patch.object(service, "manage_retry", CoroutineMock()) as retry_mock:
+            await service.send_emails(jobs, "Hi {name}!", "Subject")
+
+        retry_mock.assert_awaited_once_with(
+            [jobs[0], jobs[1], jobs[2]], "Hi {name}!", "Subject", 1
+        )
+        logger_mock.error.assert_called_once()
+
     async def test_send_emails_with_retry(self):
         params = (
             ("user", "pass"),
@@ -186,8 +292,9 @@ class SendEmailServiceTestCase(TestCase):
         )
         self.ensure_future_mock.assert_called_once_with(manage_retry_mock.return_value)
 
+    @patch("email_client.services.email.service.uniform", return_value=5.5)
     @patch("email_client.services.email.service.sleep", new_callable=CoroutineMock)
-    async def test_manage_retry(self, sleep_mock: CoroutineMock):
+    async def test_manage_retry(self, sleep_mock: CoroutineMock, uniform_mock: Mock):
         send_emails_mock = CoroutineMock()
 
         service = SendEmailService(
@@ -205,7 +312,8 @@ class SendEmailServiceTestCase(TestCase):
                 3,
             )
 
-        sleep_mock.assert_awaited_once_with(8)
+        uniform_mock.assert_called_once_with(0, 8)
+        sleep_mock.assert_awaited_once_with(5.5)
         send_emails_mock.assert_awaited_once_with(
             [
                 {"id": 3, "email": "guy_3@co.co", "name": "Guy"},
@@ -216,6 +324,73 @@ class SendEmailServiceTestCase(TestCase):
             3,
         )
 
+    @patch("email_client.services.email.service.uniform", return_value=5.5)
+    @patch("email_client.services.email.service.sleep", new_callable=CoroutineMock)
+    async def test_manage_retry_scheduled(
+        self, sleep_mock: CoroutineMock, uniform_mock: Mock
+    ):
+        retry_scheduler = create_autospec(AbstractRetryScheduler)
+        send_emails_mock = CoroutineMock()
+
+        service = SendEmailService(
+            self.web_client,
+            self.email_client,
+            self.settings_storage,
+            10,
+            3,
+            2,
+            retry_scheduler=retry_scheduler,
+        )
+
+        with patch.object(service, "send_emails", send_emails_mock):
+            await service.manage_retry(
+                [{"id": 3, "email": "guy_3@co.co", "name": "Guy"}],
+                "Hi {name}! Have a nice day",
+                "Subject",
+                2,
+            )
+
+        uniform_mock.assert_called_once_with(0, 4)
+        retry_scheduler.schedule.assert_awaited_once_with(
+            [{"id": 3, "email": "guy_3@co.co", "name": "Guy"}],
+            "Hi {name}! Have a nice day",
+            "Subject",
+            2,
+            5.5,
+        )
+        sleep_mock.assert_not_awaited()
+        send_emails_mock.assert_not_awaited()
+
+    async def test_send_emails_with_scheduled_retry(self):
+        self.settings_storage.get_gateway_credentials_headers_and_from.return_value = (
+            ("user", "pass"),
+            None,
+            {"name": "Admin", "email": "admin@co.co"},
+        )
+        manage_retry_mock = CoroutineMock()
+
+        service = SendEmailService(
+            self.web_client,
+            self.email_client,
+            self.settings_storage,
+            2,
+            retry_scheduler=create_autospec(AbstractRetryScheduler),
+        )
+
+        with patch.object(
+            service,
+            "send_email_batch",
+            CoroutineMock(return_value=[{"id": 1, "email": "guy_1@co.co"}]),
+        ), patch.object(service, "manage_retry", manage_retry_mock):
+            await service.send_emails(
+                [{"id": 1, "email": "guy_1@co.co"}], "Hi!", "Hello!", 1
+            )
+
+        manage_retry_mock.assert_awaited_once_with(
+            [{"id": 1, "email": "guy_1@co.co"}], "Hi!", "Hello!", 2
+        )
+        self.ensure_future_mock.assert_not_called()
+
     @patch("email_client.services.email.service.sleep", new_callable=CoroutineMock)
     async def test_manage_retry_limit_reached(self, sleep_mock: CoroutineMock):
         send_emails_mock = CoroutineMock()
@@ -246,6 +421,23 @@ class SendEmailServiceTestCase(TestCase):
             }
         )
 
+    def test_interleave_domains(self):
+        service = SendEmailService(
+            self.web_client, self.email_client, self.settings_storage
+        )
+        jobs = [
+            {"id": 1, "email": "guy_1@gmail.com"},
+            {"id": 2, "email": "guy_2@gmail.com"},
+            {"id": 3, "email": "guy_3@gmail.com"},
+            {"id": 4, "email": "guy_4@co.co"},
+            {"id": 5, "email": "guy_5@Outlook.com"},
+            {"id": 6, "email": "guy_6@co.co"},
+        ]
+
+        self.assertEqual(
+            [job["id"] for job in service._interleave_domains(jobs)], [1, 4, 5, 2, 6, 3]
+        )
+
     async def test_send_email_batch(self):
         self.email_client.send_emails.return_value = (
             {EmailResult.AUTH_FAILURE: [1], EmailResult.SUCCESS: [2, 3]},
@@ -0,0 +1,68 @@
+from asynctest import TestCase, create_autospec, patch, MagicMock
+
+from email_client.queue.abstract import AbstractRetryScheduler
+from email_client.services.email.abstract import AbstractSendEmailService
+from email_client.services.email.retry import RetryPoller
+
+
+class RetryPollerTestCase(TestCase):
+    def setUp(self):
+        self.retry_scheduler = create_autospec(AbstractRetryScheduler)
+        self.email_service = create_autospec(AbstractSendEmailService)
+        self.poller = RetryPoller(self.retry_scheduler, self.email_service, 2, 0.5)
+        self.entries = [
+            (
+                f"entry-{i}",
+                {
+                    "jobs": [{"id": i, "email": f"guy_{i}@co.co", "name": "Guy"}],
+                    "template": "Hi {name}!",
+                    "subject": "Subject",
+                    "retry_attempt": i,
+                },
+            )
+            for i in range(1, 3)
+        ]
+
+    async def test_process_due(self):
+        self.retry_scheduler.pop_due.return_value = self.entries
+
+        self.assertEqual(await self.poller.process_due(), 2)
+
+        self.retry_scheduler.pop_due.assert_awaited_once_with(2)
+        self.email_service.dispatch_sending_emails.assert_any_await(
+            [{"id": 1, "email": "guy_1@co.co", "name": "Guy"}],
+            "Hi {name}!",
+            "Subject",
+            1,
+        )
+        self.email_service.dispatch_sending_emails.assert_any_await(
+            [{"id": 2, "email": "guy_2@co.co", "name": "Guy"}],
+            "Hi {name}!",
+            "Subject",
+            2,
+        )
+        self.retry_scheduler.acknowledge.assert_any_await("entry-1")
+        self.retry_scheduler.acknowledge.assert_any_await("entry-2")
+
+    @patch("email_client.services.email.retry.logger")
+    async def test_process_due_dispatch_error(self, logger_mock: MagicMock):
+        self.retry_scheduler.pop_due.return_value = self.entries
+        self.email_service.dispatch_sending_emails.side_effect = [
+            ConnectionError(),
+            None,
+        ]
+
+        self.assertEqual(await self.poller.process_due(), 2)
+
+        self.assertEqual(self.email_service.dispatch_sending_emails.await_count, 2)
+        self.retry_scheduler.acknowledge.assert_awaited_once_with("entry-2")
+        logger_mock.error.assert_called_once()
+
+    @patch("email_client.services.email.retry.logger")
+    async def test_process_due_read_error(self, logger_mock: MagicMock):
+        self.retry_scheduler.pop_due.side_effect = ConnectionError()
+
+        self.assertEqual(await self.poller.process_due(), 0)
+
+        self.email_service.dispatch_sending_emails.assert_not_awaited()
+        logger_mock.error.assert_called_once()
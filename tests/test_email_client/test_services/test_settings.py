@@ -37,6 +37,7 @@ class SettingsServiceTestCase(TestCase):
         self.settings_storage.save_gateway_credentials.assert_awaited_once_with(
             "admin", "admin1"
         )
+        self.settings_storage.notify_settings_changed.assert_awaited_once()
 
     async def test_update_custom_headers(self):
         service = SettingsService(self.settings_storage)
@@ -46,3 +47,14 @@ class SettingsServiceTestCase(TestCase):
         self.settings_storage.save_custom_headers.assert_awaited_once_with(
             {"from": "admin <admin1@co.co"}
         )
+        self.settings_storage.notify_settings_changed.assert_awaited_once()
+
+    async def test_update_email_from(self):
+        service = SettingsService(self.settings_storage)
+
+        await service.update_email_from("Admin", "admin@co.co")
+
+        self.settings_storage.save_email_from.assert_awaited_once_with(
+            "Admin", "admin@co.co"
+        )
+        self.settings_storage.notify_settings_changed.assert_awaited_once()
@@ -0,0 +1,119 @@
+from asyncio import sleep
+
+from asynctest import TestCase, create_autospec, patch, CoroutineMock, MagicMock
+
+from email_client.queue.abstract import AbstractJobQueue
+from email_client.services.email.abstract import AbstractSendEmailService
+from email_client.services.email.worker import SendEmailWorker
+
+
+class SendEmailWorkerTestCase(TestCase):
+    def setUp(self):
+        self.job_queue = create_autospec(AbstractJobQueue)
+        self.email_service = create_autospec(AbstractSendEmailService)
+        self.worker = SendEmailWorker(
+            self.job_queue, self.email_service, "worker-1", 2, 1000, 30000
+        )
+        self.entry = {
+            "jobs": [{"id": 1, "email": "guy_1@co.co", "name": "Guy"}],
+            "template": "Hi {name}!",
+            "subject": "Subject",
+            "retry_attempt": 0,
+        }
+
+    async def test_process_entries(self):
+        self.job_queue.claim_stale.return_value = []
+        self.job_queue.consume.return_value = [("1-0", self.entry)]
+
+        await self.worker.process_entries()
+
+        self.job_queue.claim_stale.assert_awaited_once_with("worker-1", 30000, 2)
+        self.job_queue.consume.assert_awaited_once_with("worker-1", 2, 1000)
+        self.email_service.send_emails.assert_awaited_once_with(
+            [{"id": 1, "email": "guy_1@co.co", "name": "Guy"}],
+            "Hi {name}!",
+            "Subject",
+            0,
+        )
+        self.job_queue.acknowledge.assert_awaited_once_with("1-0")
+
+    async def test_process_entries_stale_first(self):
+        self.job_queue.claim_stale.return_value = [("1-0", self.entry, 1)]
+
+        await self.worker.process_entries()
+
+        self.job_queue.consume.assert_not_awaited()
+        self.email_service.send_emails.assert_awaited_once()
+        self.job_queue.acknowledge.assert_awaited_once_with("1-0")
+
+    async def test_process_entries_renewed_while_sending(self):
+        worker = SendEmailWorker(
+            self.job_queue, self.email_service, "worker-1", 2, 1000, 30
+        )
+        self.job_queue.claim_stale.return_value = [
+            ("1-0", self.entry, 0),
+            ("2-0", self.entry, 0),
+        ]
+        self.email_service.send_emails.side_effect = lambda *_: sleep(0.025)
+
+        await worker.process_entries()
+
+        self.job_queue.renew.assert_any_await("worker-1", "1-0", "2-0")
+        self.job_queue.renew.assert_any_await("worker-1", "2-0")
+        renew_count = self.job_queue.renew.await_count
+
+        await sleep(0.03)
+        self.assertEqual(renew_count, self.job_queue.renew.await_count)
+
+    @patch("email_client.services.email.worker.logger")
+    async def test_process_entries_dead_letter(self, logger_mock: MagicMock):
+        self.job_queue.claim_stale.return_value = [
+            ("1-0", self.entry, 5),
+            ("2-0", self.entry, 4),
+        ]
+
+        await self.worker.process_entries()
+
+        self.email_service.fail_jobs.assert_awaited_once_with(self.entry["jobs"])
+        self.job_queue.dead_letter.assert_awaited_once_with("1-0", self.entry)
+        self.email_service.send_emails.assert_awaited_once()
+        self.job_queue.acknowledge.assert_awaited_once_with("2-0")
+        self.job_queue.consume.assert_not_awaited()
+        logger_mock.error.assert_called_once()
+
+    @patch("email_client.services.email.worker.logger")
+    async def test_process_entries_not_acknowledged_on_error(
+        self, logger_mock: MagicMock
+    ):
+        self.job_queue.claim_stale.return_value = []
+        self.job_queue.consume.return_value = [("1-0", self.entry)]
+        self.email_service.send_emails.side_effect = ConnectionError()
+
+        await self.worker.process_entries()
+
+        self.job_queue.acknowledge.assert_not_awaited()
+        logger_mock.error.assert_called_once()
+
+    @patch("email_client.services.email.worker.sleep", new_callable=CoroutineMock)
+    @patch("email_client.services.email.worker.logger")
+    async def test_process_entries_queue_unavailable(
+        self, logger_mock: MagicMock, sleep_mock: CoroutineMock
+    ):
+        self.job_queue.claim_stale.side_effect = ConnectionError()
+
+        await self.worker.process_entries()
+
+        sleep_mock.assert_awaited_once_with(1)
+        self.email_service.send_emails.assert_not_awaited()
+        logger_mock.error.assert_called_once()
+
+    async def test_run_until_stopped(self):
+        async def process_once():
+            self.worker.stop()
+
+        with patch.object(
+            self.worker, "process_entries", CoroutineMock(side_effect=process_once)
+        ) as process_mock:
+            await self.worker.run()
+
+        process_mock.assert_awaited_once()
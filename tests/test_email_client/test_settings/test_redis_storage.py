@@ -1,3 +1,5 @@
+from asyncio import ensure_future, sleep, Queue
+
 from asynctest import TestCase, CoroutineMock, Mock
 
 from email_client.settings.redis import SimpleRedisSettingsStorage
@@ -10,6 +12,8 @@ class SimpleRedisSettingsStorageTestCase(TestCase):
             hgetall=CoroutineMock(),
             hmset=CoroutineMock(),
             delete=CoroutineMock(),
+            publish=CoroutineMock(),
+            subscribe=CoroutineMock(),
         )
         self.storage = SimpleRedisSettingsStorage(self.redis)
 
@@ -81,3 +85,86 @@ class SimpleRedisSettingsStorageTestCase(TestCase):
             await self.storage.get_gateway_credentials_headers_and_from(),
             (("user", "admin1"), {}, {"name": "Admin", "email": "admin@co.co"}),
         )
+
+    async def _start_listening(self) -> Queue:
+        messages = Queue()
+
+        async def wait_message():
+            message = await messages.get()
+            messages.put_nowait(message)
+            return message is not None
+
+        async def get():
+            return await messages.get()
+
+        self.redis.subscribe.return_value = [
+            Mock(wait_message=CoroutineMock(side_effect=wait_message), get=get)
+        ]
+        self.listener = ensure_future(self.storage.listen_for_changes())
+        await sleep(0)
+        return messages
+
+    async def test_get_gateway_credentials_headers_and_from_not_cached(self):
+        self.redis.hmget.side_effect = [
+            ["user", "admin1"],
+            ["Admin", "admin@co.co"],
+        ] * 2
+        self.redis.hgetall.return_value = {}
+
+        await self.storage.get_gateway_credentials_headers_and_from()
+        await self.storage.get_gateway_credentials_headers_and_from()
+
+        self.assertEqual(self.redis.hmget.await_count, 4)
+
+    async def test_get_gateway_credentials_headers_and_from_cached(self):
+        messages = await self._start_listening()
+        self.redis.hmget.side_effect = [
+            ["user", "admin1"],
+            ["Admin", "admin@co.co"],
+            ["user2", "admin2"],
+            ["Admin", "admin@co.co"],
+        ]
+        self.redis.hgetall.return_value = {}
+
+        for _ in range(3):
+            self.assertEqual(
+                await self.storage.get_gateway_credentials_headers_and_from(),
+                (("user", "admin1"), {}, {"name": "Admin", "email": "admin@co.co"}),
+            )
+        self.assertEqual(self.redis.hmget.await_count, 2)
+        self.redis.subscribe.assert_awaited_once_with(
+            "email_client/settings/invalidate"
+        )
+
+        messages.put_nowait(b"2")
+        await sleep(0)
+
+        self.assertEqual(
+            await self.storage.get_gateway_credentials_headers_and_from(),
+            (("user2", "admin2"), {}, {"name": "Admin", "email": "admin@co.co"}),
+        )
+        self.assertEqual(self.redis.hmget.await_count, 4)
+
+        messages.put_nowait(None)
+        await self.listener
+
+    async def test_notify_settings_changed(self):
+        messages = await self._start_listening()
+        self.redis.hmget.side_effect = [
+            ["user", "admin1"],
+            ["Admin", "admin@co.co"],
+        ] * 2
+        self.redis.hgetall.return_value = {}
+
+        await self.storage.get_gateway_credentials_headers_and_from()
+        await self.storage.notify_settings_changed()
+        await self.storage.get_gateway_credentials_headers_and_from()
+
+        self.assertEqual(self.redis.hmget.await_count, 4)
+        self.redis.publish.assert_awaited_once()
+        self.assertEqual(
+            self.redis.publish.call_args[0][0], "email_client/settings/invalidate"
+        )
+
+        messages.put_nowait(None)
+        await self.listener
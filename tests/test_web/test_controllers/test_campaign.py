@@ -0,0 +1,82 @@
+from urllib.parse import urlencode
+
+from tests.test_web.test_controllers.base import BaseHandlerTest
+
+
+class TestCampaignsHandler(BaseHandlerTest):
+    def setUp(self):
+        super().setUp()
+        self.email_service.send_emails.return_value = ({"id": 7}, None)
+
+    def test_post(self):
+        response = self.fetch(
+            "/campaigns",
+            method="POST",
+            body=urlencode(
+                {
+                    "subject": "Hello",
+                    "segment_id": "1",
+                    "template_id": "2",
+                    "include_segment_ids": "",
+                    "exclude_segment_ids": "",
+                    "exclude_template_id": "",
+                }
+            ),
+            follow_redirects=False,
+        )
+
+        self.assertEqual(response.code, 302)
+        self.assertEqual(response.headers["location"], "/campaigns/7")
+        self.email_service.send_emails.assert_awaited_once_with(
+            subject="Hello",
+            segment_id=1,
+            template_id=2,
+            include_segment_ids=[],
+            exclude_segment_ids=[],
+            exclude_template_id=None,
+        )
+
+    def test_post_targeting(self):
+        response = self.fetch(
+            "/campaigns",
+            method="POST",
+            body=urlencode(
+                {
+                    "subject": "Hello",
+                    "segment_id": "1",
+                    "template_id": "2",
+                    "include_segment_ids": "3,4",
+                    "exclude_segment_ids": "5",
+                    "exclude_template_id": "1",
+                }
+            ),
+            follow_redirects=False,
+        )
+
+        self.assertEqual(response.code, 302)
+        self.email_service.send_emails.assert_awaited_once_with(
+            subject="Hello",
+            segment_id=1,
+            template_id=2,
+            include_segment_ids=[3, 4],
+            exclude_segment_ids=[5],
+            exclude_template_id=1,
+        )
+
+    def test_post_invalid_segments(self):
+        response = self.fetch(
+            "/campaigns",
+            method="POST",
+            body=urlencode(
+                {
+                    "subject": "Hello",
+                    "segment_id": "1",
+                    "template_id": "2",
+                    "include_segment_ids": "3,x",
+                }
+            ),
+            follow_redirects=False,
+        )
+
+        self.assertEqual(response.code, 400)
+        self.email_service.send_emails.assert_not_awaited()
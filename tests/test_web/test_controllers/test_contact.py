@@ -6,25 +6,42 @@ from tests.test_web.test_controllers.base import BaseHandlerTest
 class TestContactsHandler(BaseHandlerTest):
     def test_get(self):
         self.contact_service.get_contacts_pages_count.return_value = 5
+        self.contact_service.read_contacts.return_value = {
+            "objects": [{"id": 26}, {"id": 50}],
+            "prev": 26,
+            "next": 50,
+        }
 
-        response = self.fetch("/contacts?page=2", method="GET")
+        response = self.fetch("/contacts?after=25", method="GET")
 
         self.assertEqual(response.code, 200)
-        self.contact_service.read_contacts.assert_awaited_once_with(2, 25)
+        self.contact_service.read_contacts.assert_awaited_once_with(25, 25, None)
         self.contact_service.get_contacts_pages_count.assert_awaited_once_with(25)
         self.template_loader.load.assert_called_once_with("contacts/contacts.html")
         self.template_loader.load.return_value.generate.assert_called_once_with(
-            objects=self.contact_service.read_contacts.return_value,
+            objects=[{"id": 26}, {"id": 50}],
             columns=["id", "name", "email"],
             url_base="/contacts/",
-            pages={
-                "prev": [1],
-                "first": False,
-                "current": 2,
-                "next": [3, 4],
-                "last": True,
-                "total": 5,
-            },
+            pages={"prev": 26, "next": 50, "total": 5, "query": "?"},
+        )
+
+    def test_get_before(self):
+        self.contact_service.get_contacts_pages_count.return_value = 1
+        self.contact_service.read_contacts.return_value = {
+            "objects": [{"id": 1}],
+            "prev": None,
+            "next": None,
+        }
+
+        response = self.fetch("/contacts?before=26", method="GET")
+
+        self.assertEqual(response.code, 200)
+        self.contact_service.read_contacts.assert_awaited_once_with(25, None, 26)
+        self.template_loader.load.return_value.generate.assert_called_once_with(
+            objects=[{"id": 1}],
+            columns=["id", "name", "email"],
+            url_base="/contacts/",
+            pages=None,
         )
 
     def test_post(self):
@@ -118,13 +135,12 @@ class TestContactSegmentFormHandler(BaseHandlerTest):
         response = self.fetch("/contacts/2/segments", method="GET")
 
         self.assertEqual(response.code, 200)
-        self.contact_service.read_segments.assert_awaited_once_with(1, None)
+        self.contact_service.read_segments.assert_not_awaited()
         self.template_loader.load.assert_called_once_with(
             "contacts/contact_segment_form.html"
         )
         self.template_loader.load.return_value.generate.assert_called_once_with(
-            action="/contacts/2/segments",
-            segments=self.contact_service.read_segments.return_value,
+            action="/contacts/2/segments"
         )
 
     def test_post(self):
@@ -0,0 +1,174 @@
+import json
+
+from asynctest import call
+
+from common.exceptions import ValidationError
+
+from tests.test_web.test_controllers.base import BaseHandlerTest
+
+
+class TestContactImportHandler(BaseHandlerTest):
+    def setUp(self):
+        super().setUp()
+        self.contact_service.import_contacts.side_effect = lambda contacts, _: len(
+            contacts
+        )
+
+    def test_post_csv(self):
+        response = self.fetch(
+            "/api/v1/contacts/import?segment_id=4",
+            method="POST",
+            headers={"Content-Type": "text/csv"},
+            body="﻿email,name,first_name\r\n"
+            "jk1@co.co,User1,Janusz\r\n"
+            "not-an-email,User2,Janusz\r\n"
+            "jk3@co.co,User3\r\n"
+            "jk4@co.co,User4,Jan\r\n",
+        )
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(response.headers["X-Imported-Contacts"], "2")
+        self.assertEqual(
+            {
+                "imported": 2,
+                "rejected": 2,
+                "errors": [
+                    {
+                        "line": 3,
+                        "error": "expected an Email for dictionary value @ data['email']",
+                    },
+                    {"line": 4, "error": "expected 3 values, found 2"},
+                ],
+            },
+            json.loads(response.body),
+        )
+        self.contact_service.import_contacts.assert_awaited_once_with(
+            [
+                {
+                    "email": "jk1@co.co",
+                    "name": "User1",
+                    "first_name": "Janusz",
+                    "last_name": "",
+                },
+                {
+                    "email": "jk4@co.co",
+                    "name": "User4",
+                    "first_name": "Jan",
+                    "last_name": "",
+                },
+            ],
+            4,
+        )
+        self.contact_service.check_segment_editable.assert_awaited_once_with(4)
+
+    def test_post_ndjson_in_chunks(self):
+        contacts = [
+            {"name": f"User{i}", "email": f"jk{i}@co.co", "last_name": "Kowalski"}
+            for i in range(1, 1502)
+        ]
+
+        response = self.fetch(
+            "/api/v1/contacts/import",
+            method="POST",
+            headers={"Content-Type": "application/x-ndjson"},
+            body="\n".join([*map(json.dumps, contacts), '"not a contact"', "{"]),
+        )
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(
+            {
+                "imported": 1501,
+                "rejected": 2,
+                "errors": [
+                    {"line": 1502, "error": "expected a dictionary"},
+                    {
+                        "line": 1503,
+                        "error": "JSONDecodeError('Expecting property name enclosed "
+                        "in double quotes: line 1 column 2 (char 1)')",
+                    },
+                ],
+            },
+            json.loads(response.body),
+        )
+        expected = [{"first_name": "", **contact} for contact in contacts]
+        self.contact_service.import_contacts.assert_has_awaits(
+            [call(expected[:1000], None), call(expected[1000:], None)]
+        )
+
+    def test_post_csv_quoted_newlines(self):
+        response = self.fetch(
+            "/api/v1/contacts/import",
+            method="POST",
+            headers={"Content-Type": "text/csv"},
+            body="email,name,last_name\r\n"
+            'jk1@co.co,"User1\r\nSecond line","Kowalski, ""Jr"""\r\n'
+            'jk2@co.co,"User2\n\nafter blank",\r\n'
+            'jk3@co.co,"unterminated\r\n',
+        )
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(
+            {
+                "imported": 2,
+                "rejected": 1,
+                "errors": [{"line": 7, "error": "unterminated quoted field"}],
+            },
+            json.loads(response.body),
+        )
+        self.contact_service.import_contacts.assert_awaited_once_with(
+            [
+                {
+                    "email": "jk1@co.co",
+                    "name": "User1\r\nSecond line",
+                    "first_name": "",
+                    "last_name": 'Kowalski, "Jr"',
+                },
+                {
+                    "email": "jk2@co.co",
+                    "name": "User2\n\nafter blank",
+                    "first_name": "",
+                    "last_name": "",
+                },
+            ],
+            None,
+        )
+
+    def test_post_csv_missing_columns(self):
+        response = self.fetch(
+            "/api/v1/contacts/import",
+            method="POST",
+            headers={"Content-Type": "text/csv"},
+            body="email,first_name\njk1@co.co,Janusz\n",
+        )
+
+        self.assertEqual(response.code, 400)
+        self.contact_service.import_contacts.assert_not_awaited()
+
+    def test_post_segment_not_editable(self):
+        self.contact_service.check_segment_editable.side_effect = ValidationError(
+            "Segment 4 doesn't exist"
+        )
+
+        response = self.fetch(
+            "/api/v1/contacts/import?segment_id=4",
+            method="POST",
+            headers={"Content-Type": "text/csv"},
+            body="email,name,first_name\njk1@co.co,User1,Janusz\n",
+        )
+
+        self.assertEqual(response.code, 400)
+        self.assertEqual(
+            {"error": "Segment 4 doesn't exist"}, json.loads(response.body)
+        )
+        self.contact_service.import_contacts.assert_not_awaited()
+
+    def test_post_unsupported_format(self):
+        response = self.fetch(
+            "/api/v1/contacts/import",
+            method="POST",
+            headers={"Content-Type": "application/json"},
+            body="[]",
+        )
+
+        self.assertEqual(response.code, 415)
+        self.contact_service.import_contacts.assert_not_awaited()
@@ -0,0 +1,130 @@
+from asynctest import Mock
+from tornado.simple_httpclient import HTTPStreamClosedError
+
+from common.exceptions import OverloadedError
+from tests.test_web.test_controllers.base import BaseHandlerTest
+
+
+class TestExportHandlers(BaseHandlerTest):
+    def setUp(self):
+        super().setUp()
+        self.closed = Mock()
+
+    def _pages(self, *pages, error: Exception = None):
+        async def iterate():
+            try:
+                for page in pages:
+                    yield page
+
+                if error:
+                    raise error
+            finally:
+                self.closed()
+
+        return iterate()
+
+    def test_export_contacts(self):
+        self.contact_service.export_contacts.return_value = self._pages(
+            [
+                {
+                    "id": 1,
+                    "name": "User1",
+                    "email": "jk1@co.co",
+                    "first_name": "Janusz",
+                    "last_name": "Kowalski, Jr.",
+                }
+            ],
+            [
+                {
+                    "id": 2,
+                    "name": "User2",
+                    "email": "jk2@co.co",
+                    "first_name": "",
+                    "last_name": "",
+                }
+            ],
+        )
+
+        response = self.fetch("/contacts/export")
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(response.headers["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(
+            response.body.decode(),
+            "id,name,email,first_name,last_name\r\n"
+            '1,User1,jk1@co.co,Janusz,"Kowalski, Jr."\r\n'
+            "2,User2,jk2@co.co,,\r\n",
+        )
+        self.contact_service.export_contacts.assert_called_once_with(1000)
+        self.closed.assert_called_once_with()
+
+    def test_export_segment_empty(self):
+        self.contact_service.export_segment_contacts.return_value = self._pages()
+
+        response = self.fetch("/segments/4/export")
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(
+            response.body.decode(), "id,name,email,first_name,last_name\r\n"
+        )
+        self.contact_service.export_segment_contacts.assert_called_once_with(4, 1000)
+
+    def test_export_campaign_filtered(self):
+        self.email_service.export_email_request_jobs.return_value = self._pages(
+            [
+                {
+                    "id": 5,
+                    "status": "failure",
+                    "message_id": "",
+                    "contact_id": 1,
+                    "name": "User1",
+                    "email": "jk1@co.co",
+                }
+            ]
+        )
+
+        response = self.fetch("/campaigns/3/export?status=failure")
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(
+            response.body.decode(),
+            "id,contact_id,name,email,status,message_id\r\n"
+            "5,1,User1,jk1@co.co,failure,\r\n",
+        )
+        self.email_service.export_email_request_jobs.assert_called_once_with(
+            3, 1000, "failure"
+        )
+
+    def test_export_fails_before_first_page(self):
+        self.contact_service.export_contacts.return_value = self._pages(
+            error=ConnectionError()
+        )
+
+        response = self.fetch("/contacts/export")
+
+        self.assertEqual(response.code, 500)
+        self.closed.assert_called_once_with()
+
+    def test_export_overloaded(self):
+        self.contact_service.export_segment_contacts.return_value = self._pages(
+            error=OverloadedError("Database is overloaded", 2)
+        )
+
+        response = self.fetch("/segments/4/export")
+
+        self.assertEqual(response.code, 503)
+        self.assertEqual(response.headers["Retry-After"], "2")
+        self.assertTrue(response.headers["Content-Type"].startswith("application/json"))
+        self.assertNotIn("Content-Disposition", response.headers)
+        self.closed.assert_called_once_with()
+
+    def test_export_fails_after_first_page(self):
+        self.contact_service.export_contacts.return_value = self._pages(
+            [{"id": 1, "name": "User1", "email": "jk1@co.co"}], error=ConnectionError()
+        )
+
+        # truncated chunked response can't be read as complete
+        with self.assertRaises(HTTPStreamClosedError):
+            self.fetch("/contacts/export")
+
+        self.closed.assert_called_once_with()
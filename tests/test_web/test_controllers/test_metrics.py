@@ -0,0 +1,27 @@
+import json
+
+from asynctest import create_autospec
+
+from tests.test_web.test_controllers.base import BaseHandlerTest
+from web.app import make_app
+from web.repositories.pool import MonitoredEngine
+
+
+class TestPoolMetricsHandler(BaseHandlerTest):
+    def get_app(self):
+        self.db_engine = create_autospec(MonitoredEngine)
+        self.db_engine.metrics.return_value = {"in_use": 2, "max_size": 10}
+
+        return make_app(
+            self.template_loader,
+            self.contact_service,
+            self.email_service,
+            self.settings_service,
+            self.db_engine,
+        )
+
+    def test_get(self):
+        response = self.fetch("/api/v1/metrics/db-pool", method="GET")
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual({"in_use": 2, "max_size": 10}, json.loads(response.body))
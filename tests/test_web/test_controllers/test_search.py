@@ -0,0 +1,42 @@
+import json
+
+from tests.test_web.test_controllers.base import BaseHandlerTest
+
+
+class TestSearchHandlers(BaseHandlerTest):
+    def test_search_contacts(self):
+        self.contact_service.search_contacts.return_value = [
+            {"id": 3, "name": "Janusz", "email": "jk@co.co"}
+        ]
+
+        response = self.fetch("/api/v1/contacts/search?q=+janu+", method="GET")
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(
+            {"results": [{"id": 3, "name": "Janusz", "email": "jk@co.co"}]},
+            json.loads(response.body),
+        )
+        self.contact_service.search_contacts.assert_awaited_once_with("janu", 10)
+
+    def test_search_segments(self):
+        self.contact_service.search_segments.return_value = [{"id": 1, "name": "Users"}]
+
+        response = self.fetch("/api/v1/segments/search?q=user&limit=5", method="GET")
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(
+            {"results": [{"id": 1, "name": "Users"}]}, json.loads(response.body)
+        )
+        self.contact_service.search_segments.assert_awaited_once_with("user", 5)
+
+    def test_search_too_short(self):
+        response = self.fetch("/api/v1/segments/search?q=us", method="GET")
+
+        self.assertEqual(response.code, 400)
+        self.contact_service.search_segments.assert_not_awaited()
+
+    def test_search_limit_too_high(self):
+        response = self.fetch("/api/v1/contacts/search?q=user&limit=1000", method="GET")
+
+        self.assertEqual(response.code, 400)
+        self.contact_service.search_contacts.assert_not_awaited()
@@ -0,0 +1,144 @@
+import json
+
+from common.enums import SegmentOperation
+from common.exceptions import ValidationError
+from tests.test_web.test_controllers.base import BaseHandlerTest
+
+
+class TestSegmentOperationHandlers(BaseHandlerTest):
+    def test_add_contact_ids(self):
+        self.contact_service.add_contacts_to_segment.return_value = 2
+
+        response = self.fetch(
+            "/api/v1/segments/3/members",
+            method="POST",
+            body=json.dumps({"action": "add", "contact_ids": [1, 5, 7]}),
+        )
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual({"affected": 2}, json.loads(response.body))
+        self.contact_service.add_contacts_to_segment.assert_awaited_once_with(
+            3, contact_ids=[1, 5, 7]
+        )
+
+    def test_add_to_rule_segment(self):
+        self.contact_service.add_contacts_to_segment.side_effect = ValidationError(
+            "Segment 3 has a rule, members can't be added"
+        )
+
+        response = self.fetch(
+            "/api/v1/segments/3/members",
+            method="POST",
+            body=json.dumps({"action": "add", "from_id": 1, "to_id": 100}),
+        )
+
+        self.assertEqual(response.code, 400)
+
+    def test_remove_range(self):
+        self.contact_service.remove_contacts_from_segment.return_value = 100
+
+        response = self.fetch(
+            "/api/v1/segments/3/members",
+            method="POST",
+            body=json.dumps({"action": "remove", "from_id": 1, "to_id": 100}),
+        )
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual({"affected": 100}, json.loads(response.body))
+        self.contact_service.remove_contacts_from_segment.assert_awaited_once_with(
+            3, id_range=(1, 100)
+        )
+
+    def test_members_ids_and_range(self):
+        response = self.fetch(
+            "/api/v1/segments/3/members",
+            method="POST",
+            body=json.dumps(
+                {"action": "add", "contact_ids": [1], "from_id": 1, "to_id": 100}
+            ),
+        )
+
+        self.assertEqual(response.code, 400)
+        self.contact_service.add_contacts_to_segment.assert_not_awaited()
+
+    def test_build(self):
+        self.contact_service.build_segment.return_value = 1000
+
+        response = self.fetch(
+            "/api/v1/segments/3/build",
+            method="POST",
+            body=json.dumps(
+                {"operation": "difference", "segment_ids": [1, 2], "replace": True}
+            ),
+        )
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual({"added": 1000}, json.loads(response.body))
+        self.contact_service.build_segment.assert_awaited_once_with(
+            3, SegmentOperation.DIFFERENCE, [1, 2], True
+        )
+
+    def test_build_invalid(self):
+        self.contact_service.build_segment.side_effect = ValidationError("itself")
+
+        response = self.fetch(
+            "/api/v1/segments/3/build",
+            method="POST",
+            body=json.dumps(
+                {"operation": "union", "segment_ids": [3], "replace": True}
+            ),
+        )
+
+        self.assertEqual(response.code, 400)
+        self.assertEqual({"error": "itself"}, json.loads(response.body))
+
+    def test_copy(self):
+        self.contact_service.copy_segment.return_value = {
+            "id": 4,
+            "name": "Copy",
+            "members": 10,
+        }
+
+        response = self.fetch(
+            "/api/v1/segments/3/copy", method="POST", body=json.dumps({"name": "Copy"})
+        )
+
+        self.assertEqual(response.code, 201)
+        self.assertEqual(
+            {"id": 4, "name": "Copy", "members": 10}, json.loads(response.body)
+        )
+        self.contact_service.copy_segment.assert_awaited_once_with(3, "Copy")
+
+    def test_set_rule(self):
+        response = self.fetch(
+            "/api/v1/segments/3/rule",
+            method="PUT",
+            body=json.dumps(
+                {"rule": {"email_domain": "Acme.com", "exclude_segments": [4]}}
+            ),
+        )
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(
+            {"rule": {"email_domain": "acme.com", "exclude_segments": [4]}},
+            json.loads(response.body),
+        )
+        self.contact_service.set_segment_rule.assert_awaited_once_with(
+            3, {"email_domain": "acme.com", "exclude_segments": [4]}
+        )
+
+    def test_clear_rule(self):
+        response = self.fetch(
+            "/api/v1/segments/3/rule", method="PUT", body=json.dumps({"rule": None})
+        )
+
+        self.assertEqual(response.code, 200)
+        self.contact_service.set_segment_rule.assert_awaited_once_with(3, None)
+
+    def test_set_empty_rule(self):
+        response = self.fetch(
+            "/api/v1/segments/3/rule", method="PUT", body=json.dumps({"rule": {}})
+        )
+
+        self.assertEqual(response.code, 400)
+        self.contact_service.set_segment_rule.assert_not_awaited()
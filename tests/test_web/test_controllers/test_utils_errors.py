@@ -1,6 +1,7 @@
 from asynctest import TestCase, CoroutineMock, MagicMock
 from voluptuous import Invalid
 
+from common.exceptions import OverloadedError
 from web.controllers.utils.errors import handle_errors
 
 
@@ -33,6 +34,17 @@ class TestHandleErrors(TestCase):
             error="Not an int"
         )
 
+    async def test_overloaded_error(self):
+        self._coro.side_effect = OverloadedError("Try later", 2)
+
+        await self.test_coro(self._self, 1, 2)
+
+        self._self.set_status.assert_called_once_with(503)
+        self._self.set_header.assert_called_once_with("Retry-After", 2)
+        self._self.loader.load.return_value.generate.assert_called_once_with(
+            error="Try later"
+        )
+
     async def test_error(self):
         self._coro.side_effect = ValueError("Not an int")
 
@@ -22,6 +22,10 @@ class DBEngineMock:
         self.acquired = True
         return self
 
+    @property
+    def dialect(self):
+        return self.conn._dialect
+
     def assert_was_acquired(self):
         assert self.acquired
 
@@ -43,7 +47,8 @@ class AioPGBaseTestCase(TestCase):
             cls.engine = None
             cls.connection = None
         else:
-            cls.connection = cls.loop.run_until_complete(cls.engine.acquire())
+            # the connection is held by the whole test case
+            cls.connection = cls.loop.run_until_complete(cls.engine.engine.acquire())
             super().setUpClass()
 
     async def setUp(self):
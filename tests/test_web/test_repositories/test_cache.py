@@ -0,0 +1,181 @@
+import json
+from asyncio import CancelledError, Queue, ensure_future, sleep
+
+from asynctest import TestCase, CoroutineMock, Mock, create_autospec, patch
+
+from tests.test_web.test_repositories.aiopg_base import DBEngineMock
+from web.repositories.cache import (
+    PostgresCacheInvalidator,
+    RepositoryCache,
+    AbstractCacheInvalidator,
+)
+from web.repositories.contact.abstract import AbstractContactRepository
+from web.repositories.contact.cached import CachedContactRepository
+from web.repositories.jobs.abstract import AbstractJobRepository
+from web.repositories.jobs.cached import CachedJobRepository
+
+
+class RepositoryCacheTestCase(TestCase):
+    def setUp(self):
+        self.cache = RepositoryCache(10)
+        self.loader = CoroutineMock(return_value={"id": 1, "name": "Template"})
+
+    async def test_read_through(self):
+        self.assertEqual(
+            {"id": 1, "name": "Template"},
+            await self.cache.get_or_load("template", 1, self.loader),
+        )
+        self.assertEqual(
+            {"id": 1, "name": "Template"},
+            await self.cache.get_or_load("template", 1, self.loader),
+        )
+        self.loader.assert_awaited_once()
+
+    async def test_returns_copies(self):
+        (await self.cache.get_or_load("template", 1, self.loader))["name"] = "Changed"
+
+        self.assertEqual(
+            {"id": 1, "name": "Template"},
+            await self.cache.get_or_load("template", 1, self.loader),
+        )
+
+    async def test_expires(self):
+        with patch("web.repositories.cache.monotonic", Mock(side_effect=[0, 11, 11])):
+            await self.cache.get_or_load("template", 1, self.loader)
+            await self.cache.get_or_load("template", 1, self.loader)
+
+        self.assertEqual(2, self.loader.await_count)
+
+    async def test_invalidate_key(self):
+        await self.cache.get_or_load("template", 1, self.loader)
+        await self.cache.get_or_load("template", 2, self.loader)
+
+        self.cache.invalidate("template", 1)
+
+        await self.cache.get_or_load("template", 1, self.loader)
+        await self.cache.get_or_load("template", 2, self.loader)
+        self.assertEqual(3, self.loader.await_count)
+
+    async def test_invalidate_namespace(self):
+        await self.cache.get_or_load("segments", (25, None, None), self.loader)
+        await self.cache.get_or_load("segments", (25, 25, None), self.loader)
+
+        self.cache.invalidate("segments")
+
+        await self.cache.get_or_load("segments", (25, None, None), self.loader)
+        await self.cache.get_or_load("segments", (25, 25, None), self.loader)
+        self.assertEqual(4, self.loader.await_count)
+
+
+class PostgresCacheInvalidatorTestCase(TestCase):
+    def setUp(self):
+        self.cache = create_autospec(RepositoryCache)
+        self.notifies = Queue()
+        self.connection = Mock(
+            execute=CoroutineMock(), connection=Mock(notifies=self.notifies)
+        )
+        self.invalidator = PostgresCacheInvalidator(
+            DBEngineMock(self.connection), self.cache, "invalidation"
+        )
+
+    async def test_invalidate(self):
+        await self.invalidator.invalidate("segments", (25, None, None))
+
+        self.cache.invalidate.assert_called_once_with("segments", (25, None, None))
+        self.connection.execute.assert_awaited_once_with(
+            "SELECT pg_notify(%s, %s)",
+            "invalidation",
+            json.dumps({"namespace": "segments", "key": [25, None, None]}),
+        )
+
+    async def test_listen(self):
+        listener = ensure_future(self.invalidator.listen())
+        await self.notifies.put(
+            Mock(payload=json.dumps({"namespace": "segments", "key": [25, 1, None]}))
+        )
+        await self.notifies.put(
+            Mock(payload=json.dumps({"namespace": "template", "key": 4}))
+        )
+        await sleep(0.01)
+        listener.cancel()
+
+        with self.assertRaises(CancelledError):
+            await listener
+
+        self.connection.execute.assert_awaited_once_with('LISTEN "invalidation"')
+        self.cache.clear.assert_called_once_with()
+        self.cache.invalidate.assert_any_call("segments", (25, 1, None))
+        self.cache.invalidate.assert_any_call("template", 4)
+
+
+class CachedRepositoriesTestCase(TestCase):
+    def setUp(self):
+        self.cache = RepositoryCache(60)
+        self.invalidator = create_autospec(AbstractCacheInvalidator)
+        self.job_repository = create_autospec(AbstractJobRepository)
+        self.contact_repository = create_autospec(AbstractContactRepository)
+
+    async def test_get_template_cached(self):
+        self.job_repository.get_template.return_value = {"id": 1, "template": "Hi!"}
+        repository = CachedJobRepository(
+            self.job_repository, self.cache, self.invalidator
+        )
+
+        await repository.get_template(1)
+
+        self.assertEqual({"id": 1, "template": "Hi!"}, await repository.get_template(1))
+        self.job_repository.get_template.assert_awaited_once_with(1)
+
+    async def test_update_template_invalidates(self):
+        repository = CachedJobRepository(
+            self.job_repository, self.cache, self.invalidator
+        )
+
+        await repository.update_template({"id": 1, "template": "Hello!"})
+
+        self.job_repository.update_template.assert_awaited_once_with(
+            {"id": 1, "template": "Hello!"}
+        )
+        self.invalidator.invalidate.assert_any_await("template", 1)
+        self.invalidator.invalidate.assert_any_await("templates")
+
+    async def test_read_segments_cached_per_page(self):
+        self.contact_repository.read_segments.return_value = [{"id": 1, "name": "A"}]
+        repository = CachedContactRepository(
+            self.contact_repository, self.cache, self.invalidator
+        )
+
+        await repository.read_segments(25)
+        await repository.read_segments(25)
+        await repository.read_segments(25, 1)
+
+        self.assertEqual(2, self.contact_repository.read_segments.await_count)
+
+    async def test_update_segment_invalidates(self):
+        repository = CachedContactRepository(
+            self.contact_repository, self.cache, self.invalidator
+        )
+
+        await repository.update_segment({"id": 3, "name": "B"})
+
+        self.contact_repository.update_segment.assert_awaited_once_with(
+            {"id": 3, "name": "B"}
+        )
+        self.invalidator.invalidate.assert_any_await("segment", 3)
+        self.invalidator.invalidate.assert_any_await("segments")
+
+    async def test_copy_segment_invalidates(self):
+        self.contact_repository.copy_segment.return_value = {
+            "id": 4,
+            "name": "Copy",
+            "members": 2,
+        }
+        repository = CachedContactRepository(
+            self.contact_repository, self.cache, self.invalidator
+        )
+
+        await repository.copy_segment(3, "Copy")
+
+        self.contact_repository.copy_segment.assert_awaited_once_with(3, "Copy")
+        self.invalidator.invalidate.assert_any_await("segments")
+        self.invalidator.invalidate.assert_any_await("segment", 4)
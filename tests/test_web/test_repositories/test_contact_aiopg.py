@@ -1,3 +1,4 @@
+from common.enums import SegmentOperation
 from tests.test_web.test_repositories.aiopg_base import AioPGBaseTestCase
 from web.repositories.contact.aiopg import SimplePostgresContactRepository
 
@@ -88,7 +89,7 @@ class AioPGContactRepositoryTestCase(AioPGBaseTestCase):
             """
         )
 
-        first_page = await self.repository.read_contacts(0, 4)
+        first_page = await self.repository.read_contacts(4)
 
         self.assertEqual(
             [
@@ -124,7 +125,7 @@ class AioPGContactRepositoryTestCase(AioPGBaseTestCase):
             first_page,
         )
 
-        second_page = await self.repository.read_contacts(1, 4)
+        second_page = await self.repository.read_contacts(4, after=4)
 
         self.assertEqual(
             [
@@ -139,7 +140,11 @@ class AioPGContactRepositoryTestCase(AioPGBaseTestCase):
             second_page,
         )
 
-        self.assertEqual([], await self.repository.read_contacts(2, 4))
+        self.assertEqual([], await self.repository.read_contacts(4, after=5))
+
+        previous_page = await self.repository.read_contacts(2, before=4)
+
+        self.assertEqual([2, 3], [contact["id"] for contact in previous_page])
 
     async def test_update_contact(self):
         await self.connection.execute(
@@ -206,7 +211,8 @@ class AioPGContactRepositoryTestCase(AioPGBaseTestCase):
 
         segment = await self.repository.get_segment(1)
 
-        self.assertEqual({"id": 1, "name": "test-seg"}, segment)
+        self.assertEqual({"id": 1, "name": "test-seg", "rule": None}, segment)
+        self.assertIsNone(await self.repository.get_segment(2))
 
     async def test_read_segments(self):
         await self.connection.execute(
@@ -216,17 +222,17 @@ class AioPGContactRepositoryTestCase(AioPGBaseTestCase):
             """
         )
 
-        first_page = await self.repository.read_segments(0, 2)
+        first_page = await self.repository.read_segments(2)
 
         self.assertEqual(
             [{"id": 1, "name": "test-seg"}, {"id": 2, "name": "beta"}], first_page
         )
 
-        second_page = await self.repository.read_segments(1, 2)
+        second_page = await self.repository.read_segments(2, after=2)
 
         self.assertEqual([{"id": 3, "name": "alpha"}], second_page)
 
-        third_page = await self.repository.read_segments(2, 2)
+        third_page = await self.repository.read_segments(2, after=3)
 
         self.assertEqual([], third_page)
 
@@ -238,7 +244,7 @@ class AioPGContactRepositoryTestCase(AioPGBaseTestCase):
             """
         )
 
-        first_page = await self.repository.read_segments(0, None)
+        first_page = await self.repository.read_segments()
 
         self.assertEqual(
             [
@@ -311,6 +317,10 @@ class AioPGContactRepositoryTestCase(AioPGBaseTestCase):
             segment_contacts,
         )
 
+        second_page = await self.repository.list_contacts_in_segment(1, 2, after=1)
+
+        self.assertEqual([3, 4], [contact["id"] for contact in second_page])
+
     async def test_add_contact_to_segment(self):
         await self.connection.execute(
             """
@@ -392,3 +402,319 @@ class AioPGContactRepositoryTestCase(AioPGBaseTestCase):
         )
 
         self.assertEqual(5, await self.repository.get_segments_count())
+
+    async def test_counters_follow_deletes(self):
+        await self.connection.execute(
+            """
+            INSERT INTO contact (id, name, first_name, last_name, email)
+            VALUES
+            (1, 'User1', 'Janusz', 'Kowalski', 'jk1@co.co'),
+            (2, 'User2', 'Janusz', 'Kowalski', 'jk2@co.co'),
+            (3, 'User3', 'Janusz', 'Kowalski', 'jk3@co.co')
+            """
+        )
+        await self.connection.execute(
+            "INSERT INTO segment (id, name) VALUES (1, 'Segment1'), (2, 'Segment2')"
+        )
+
+        await self.repository.delete_contact(2)
+        await self.repository.delete_segment(2)
+
+        self.assertEqual(2, await self.repository.get_contacts_count())
+        self.assertEqual(1, await self.repository.get_segments_count())
+
+    async def test_get_segment_contacts_count(self):
+        await self.connection.execute(
+            """
+            INSERT INTO contact (id, name, first_name, last_name, email)
+            VALUES
+            (1, 'User1', 'Janusz', 'Kowalski', 'jk1@co.co'),
+            (2, 'User2', 'Janusz', 'Kowalski', 'jk2@co.co'),
+            (3, 'User3', 'Janusz', 'Kowalski', 'jk3@co.co')
+            """
+        )
+        await self.connection.execute(
+            "INSERT INTO segment (id, name) VALUES (1, 'Segment1'), (2, 'Segment2')"
+        )
+        await self.connection.execute(
+            """
+            INSERT INTO segment_contact (contact_id, segment_id)
+            VALUES (1, 1), (2, 1), (3, 1), (1, 2)
+            """
+        )
+
+        await self.repository.remove_contact_from_segment(1, 3)
+        # membership removed by cascade is counted as well
+        await self.repository.delete_contact(2)
+
+        self.assertEqual(1, await self.repository.get_segment_contacts_count(1))
+        self.assertEqual(1, await self.repository.get_segment_contacts_count(2))
+        self.assertEqual(0, await self.repository.get_segment_contacts_count(3))
+
+    async def test_get_contacts_count_estimated(self):
+        repository = SimplePostgresContactRepository(self.db_engine_mock, True)
+        await self.connection.execute(
+            """
+            INSERT INTO contact (id, name, first_name, last_name, email)
+            VALUES (1, 'User1', 'Janusz', 'Kowalski', 'jk1@co.co')
+            """
+        )
+
+        # estimates are refreshed by ANALYZE only
+        await self.connection.execute("ANALYZE contact")
+
+        self.assertEqual(1, await repository.get_contacts_count())
+
+    async def test_upsert_contacts(self):
+        await self.connection.execute(
+            """
+            INSERT INTO contact (id, name, first_name, last_name, email)
+            VALUES (1, 'User1', 'Janusz', 'Kowalski', 'jk1@co.co')
+            """
+        )
+        await self.connection.execute("INSERT INTO segment (id, name) VALUES (1, 'A')")
+        await self.connection.execute(
+            "INSERT INTO segment_contact (contact_id, segment_id) VALUES (1, 1)"
+        )
+
+        imported = await self.repository.upsert_contacts(
+            [
+                {
+                    "name": "User1",
+                    "email": "jk1@co.co",
+                    "first_name": "Jan",
+                    "last_name": "Kowal",
+                },
+                {
+                    "name": "User2",
+                    "email": "jk2@co.co",
+                    "first_name": "",
+                    "last_name": "",
+                },
+                {
+                    "name": "User2b",
+                    "email": "jk2@co.co",
+                    "first_name": "",
+                    "last_name": "",
+                },
+            ],
+            1,
+        )
+
+        self.assertEqual(2, imported)
+        contacts = await self.connection.execute(
+            """
+            SELECT c.name, c.first_name, c.last_name, c.email
+            FROM contact c JOIN segment_contact sc ON sc.contact_id = c.id
+            WHERE sc.segment_id = 1 ORDER BY c.email
+            """
+        )
+        self.assertEqual(
+            [("User1", "Jan", "Kowal", "jk1@co.co"), ("User2b", "", "", "jk2@co.co")],
+            await contacts.fetchall(),
+        )
+        self.assertEqual(2, await self.repository.get_contacts_count())
+        self.assertEqual(2, await self.repository.get_segment_contacts_count(1))
+
+    async def test_iterate_segment_contacts(self):
+        await self.connection.execute(
+            """
+            INSERT INTO contact (id, name, first_name, last_name, email)
+            VALUES
+            (1, 'User1', 'Janusz', 'Kowalski', 'jk1@co.co'),
+            (2, 'User2', 'Janusz', 'Kowalski', 'jk2@co.co'),
+            (3, 'User3', 'Janusz', 'Kowalski', 'jk3@co.co')
+            """
+        )
+        await self.connection.execute("INSERT INTO segment (id, name) VALUES (1, 'A')")
+        await self.connection.execute(
+            """
+            INSERT INTO segment_contact (contact_id, segment_id)
+            VALUES (1, 1), (3, 1)
+            """
+        )
+
+        pages = [
+            [contact["email"] for contact in page]
+            async for page in self.repository.iterate_segment_contacts(1, 1)
+        ]
+
+        self.assertEqual([["jk1@co.co"], ["jk3@co.co"]], pages)
+
+    async def _generate_segments(self):
+        await self.connection.execute(
+            """
+            INSERT INTO contact (id, name, first_name, last_name, email)
+            SELECT i, 'User' || i, '', '', 'jk' || i || '@co.co'
+            FROM generate_series(1, 6) AS i
+            """
+        )
+        await self.connection.execute(
+            "INSERT INTO segment (id, name) VALUES (1, 'A'), (2, 'B'), (3, 'C')"
+        )
+        await self.connection.execute(
+            """
+            INSERT INTO segment_contact (contact_id, segment_id)
+            VALUES (1, 1), (2, 1), (3, 1), (2, 2), (3, 2), (4, 2), (6, 3)
+            """
+        )
+
+    async def _segment_members(self, segment_id: int):
+        members = await self.connection.execute(
+            "SELECT contact_id FROM segment_contact WHERE segment_id = %s "
+            "ORDER BY contact_id",
+            segment_id,
+        )
+        return [row[0] for row in await members.fetchall()]
+
+    async def test_add_and_remove_contacts_in_bulk(self):
+        await self._generate_segments()
+
+        self.assertEqual(
+            2, await self.repository.add_contacts_to_segment(3, [1, 6, 5, 100])
+        )
+        self.assertEqual(
+            2, await self.repository.remove_contacts_from_segment(3, id_range=(2, 5))
+        )
+        self.assertEqual([1, 6], await self._segment_members(3))
+        self.assertEqual(2, await self.repository.get_segment_contacts_count(3))
+
+        await self.repository.delete_segment(3)
+
+        counters = await self.connection.execute(
+            "SELECT count(*) FROM row_counter WHERE table_name = 'segment_contact' "
+            "AND key = 3"
+        )
+        self.assertEqual(0, await counters.scalar())
+        self.assertEqual(2, await self.repository.get_segments_count())
+
+    async def test_combine_segments(self):
+        await self._generate_segments()
+
+        self.assertEqual(
+            1,
+            await self.repository.combine_segments(
+                SegmentOperation.DIFFERENCE, [1, 2], 3, replace=True
+            ),
+        )
+        self.assertEqual([1], await self._segment_members(3))
+
+        await self.repository.combine_segments(SegmentOperation.UNION, [1, 2], 3)
+        self.assertEqual([1, 2, 3, 4], await self._segment_members(3))
+
+        await self.repository.combine_segments(
+            SegmentOperation.INTERSECTION, [1, 2], 3, replace=True
+        )
+        self.assertEqual([2, 3], await self._segment_members(3))
+        self.assertEqual(2, await self.repository.get_segment_contacts_count(3))
+
+    async def test_copy_segment(self):
+        await self.connection.execute(
+            """
+            INSERT INTO contact (id, name, first_name, last_name, email)
+            SELECT i, 'User' || i, '', '', 'jk' || i || '@co.co'
+            FROM generate_series(1, 4) AS i
+            """
+        )
+        # far from the ids the copy gets from the sequence
+        await self.connection.execute(
+            "INSERT INTO segment (id, name) VALUES (100000, 'B')"
+        )
+        await self.connection.execute(
+            """
+            INSERT INTO segment_contact (contact_id, segment_id)
+            VALUES (2, 100000), (3, 100000), (4, 100000)
+            """
+        )
+
+        segment = await self.repository.copy_segment(100000, "Copy of B")
+
+        self.assertEqual("Copy of B", segment["name"])
+        self.assertEqual(3, segment["members"])
+        self.assertEqual([2, 3, 4], await self._segment_members(segment["id"]))
+        self.assertEqual(
+            3, await self.repository.get_segment_contacts_count(segment["id"])
+        )
+
+    async def test_rule_segment_members(self):
+        await self._generate_segments()
+        await self.connection.execute(
+            """
+            UPDATE contact SET email = 'jk' || id || '@acme.com' WHERE id IN (3, 4, 5)
+            """
+        )
+        await self.connection.execute(
+            """
+            INSERT INTO segment (id, name, rule) VALUES
+            (4, 'acme', '{"email_domain": "acme.com", "exclude_segments": [1]}'),
+            (5, 'D', NULL),
+            (6, 'E', '{"segments": [2, 3], "exclude_segments": [1]}')
+            """
+        )
+
+        self.assertEqual(
+            [4, 5],
+            [
+                contact["id"]
+                for contact in await self.repository.list_contacts_in_segment(4)
+            ],
+        )
+        self.assertEqual(
+            [5],
+            [
+                contact["id"]
+                for contact in await self.repository.list_contacts_in_segment(
+                    4, 1, after=4
+                )
+            ],
+        )
+        self.assertEqual(2, await self.repository.get_segment_contacts_count(4))
+        self.assertEqual(2, await self.repository.get_segment_contacts_count(6))
+
+        pages = [
+            [contact["email"] for contact in page]
+            async for page in self.repository.iterate_segment_contacts(4, 1)
+        ]
+        self.assertEqual([["jk4@acme.com"], ["jk5@acme.com"]], pages)
+
+        await self.repository.combine_segments(SegmentOperation.UNION, [4, 3], 5)
+        self.assertEqual([4, 5, 6], await self._segment_members(5))
+
+        await self.repository.combine_segments(
+            SegmentOperation.INTERSECTION, [2, 4], 5, replace=True
+        )
+        self.assertEqual([4], await self._segment_members(5))
+
+        await self.repository.combine_segments(
+            SegmentOperation.DIFFERENCE, [2, 4], 5, replace=True
+        )
+        self.assertEqual([2, 3], await self._segment_members(5))
+
+    async def test_search_contacts(self):
+        await self.connection.execute(
+            """
+            INSERT INTO contact (id, name, first_name, last_name, email)
+            VALUES (1, 'Janusz Kowalski', '', '', 'jk@co.co'),
+            (2, 'Jan Nowak', '', '', 'janusz.nowak@co.co'),
+            (3, 'Anna Nowak', '', '', 'an@co.co')
+            """
+        )
+
+        contacts = await self.repository.search_contacts("janusz", 10)
+
+        self.assertEqual({1, 2}, {contact["id"] for contact in contacts})
+        self.assertEqual(
+            {"id": 1, "name": "Janusz Kowalski", "email": "jk@co.co"}, contacts[0]
+        )
+
+    async def test_search_segments(self):
+        await self.connection.execute(
+            """
+            INSERT INTO segment (id, name)
+            VALUES (1, 'Testers'), (2, 'Beta testers'), (3, 'Users')
+            """
+        )
+
+        segments = await self.repository.search_segments("tester", 1)
+
+        self.assertEqual([{"id": 1, "name": "Testers"}], segments)
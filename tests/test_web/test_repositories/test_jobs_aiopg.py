@@ -43,7 +43,15 @@ class AioPGContactRepositoryTestCase(AioPGBaseTestCase):
 
         request = await self.repository.create_email_request(1, 1, "My test campaign")
         self.assertEqual(
-            {"id": 1, "segment_id": 1, "template_id": 1, "name": "My test campaign"},
+            {
+                "id": 1,
+                "segment_id": 1,
+                "template_id": 1,
+                "name": "My test campaign",
+                "include_segment_ids": [],
+                "exclude_segment_ids": [],
+                "exclude_template_id": None,
+            },
             request,
         )
 
@@ -67,8 +75,92 @@ class AioPGContactRepositoryTestCase(AioPGBaseTestCase):
             ],
             await jobs.fetchall(),
         )
+        self.assertEqual(
+            {"pending": 4}, await self.repository.get_email_request_status_counts(1)
+        )
+
+    async def test_create_email_request_rule_segment(self):
+        await self._generate_base_data()
+        await self.connection.execute(
+            """
+            INSERT INTO contact (id, name, first_name, last_name, email)
+            VALUES (5, 'User5', 'Jan', 'Nowak', 'jn@ACME.com'),
+            (6, 'User6', 'Jan', 'Kowalski', 'jk@acme.com')
+            """
+        )
+        await self.connection.execute(
+            """
+            INSERT INTO segment (id, name, rule) VALUES
+            (3, 'acme', '{"email_domain": "acme.com", "first_name": "J*"}'),
+            (4, 'acme-or-seg', '{"segments": [3, 2], "exclude_segments": [5]}'),
+            (5, 'kowalski', '{"last_name": "kowal*", "email_domain": "acme.com"}')
+            """
+        )
+
+        await self.repository.create_email_request(4, 1, "Rule campaign")
+
+        jobs = await self.connection.execute(
+            "SELECT contact_id FROM job ORDER BY contact_id"
+        )
+        self.assertEqual([(2,), (3,), (5,)], await jobs.fetchall())
+
+    async def test_create_email_request_targeting(self):
+        await self._generate_base_data()
+        await self.connection.execute(
+            """
+            INSERT INTO contact (id, name, first_name, last_name, email)
+            VALUES (5, 'User5', 'Jan', 'Nowak', 'jn@co.co'),
+            (6, 'User6', 'Jan', 'Nowak', 'jn6@co.co')
+            """
+        )
+        await self.connection.execute(
+            "INSERT INTO segment (id, name) VALUES (3, 'seg3'), (4, 'seg4')"
+        )
+        await self.connection.execute(
+            """
+            INSERT INTO segment_contact (contact_id, segment_id)
+            VALUES (2, 3), (5, 3), (6, 3), (1, 4)
+            """
+        )
+        await self.connection.execute(
+            """
+            INSERT INTO email_request (id, name, template_id, segment_id)
+            VALUES (100000, 'test-camp', 2, 1)
+            """
+        )
+        # ids far from the sequences used by create_email_request
+        await self.connection.execute(
+            """
+            INSERT INTO job (id, request_id, contact_id, status)
+            VALUES (100000, 100000, 6, 'success'), (100001, 100000, 5, 'failure')
+            """
+        )
+
+        request = await self.repository.create_email_request(
+            2, 1, "Targeted campaign", [3], [4], 2
+        )
+
+        jobs = await self.connection.execute(
+            "SELECT contact_id FROM job WHERE request_id = %s ORDER BY contact_id",
+            request["id"],
+        )
+        self.assertEqual([(2,), (3,), (5,)], await jobs.fetchall())
+
+        campaign = await self.repository.get_email_request(request["id"])
+        self.assertEqual(
+            {
+                "id": request["id"],
+                "name": "Targeted campaign",
+                "segment": {"name": "seg", "id": 2},
+                "template": {"name": "test-template", "id": 1},
+                "include_segments": [{"name": "seg3", "id": 3}],
+                "exclude_segments": [{"name": "seg4", "id": 4}],
+                "exclude_template": {"name": "template-2", "id": 2},
+            },
+            campaign,
+        )
 
-    async def test_get_email_request_job_data(self):
+    async def test_iterate_email_request_job_data(self):
         await self._generate_base_data()
         await self.connection.execute(
             """
@@ -84,44 +176,63 @@ class AioPGContactRepositoryTestCase(AioPGBaseTestCase):
             """
         )
 
-        jobs = await self.repository.get_email_request_job_data(1)
+        pages = [
+            [job["id"] for job in page]
+            async for page in self.repository.iterate_email_request_job_data(1, 3)
+        ]
+
+        self.assertEqual([[1, 2, 3], [4]], pages)
+
+    async def test_iterate_email_request_job_statuses(self):
+        await self._generate_base_data()
+        await self.connection.execute(
+            """
+            INSERT INTO email_request (id, name, template_id, segment_id)
+            VALUES (1, 'test-camp', 1, 1)
+            """
+        )
+        await self.connection.execute(
+            """
+            INSERT INTO job (id, request_id, contact_id, status)
+            SELECT contact_id, 1, contact_id, 'pending'
+            FROM segment_contact WHERE segment_id = 1
+            """
+        )
+        await self.connection.execute(
+            "UPDATE job SET status = 'failure', message_id = 'a1' WHERE id IN (2, 4)"
+        )
+
+        pages = [
+            page
+            async for page in self.repository.iterate_email_request_job_statuses(
+                1, 1, EmailResult.FAILURE.value
+            )
+        ]
 
         self.assertEqual(
             [
-                {
-                    "email": "jk1@co.co",
-                    "first_name": "Janusz",
-                    "id": 1,
-                    "last_name": "Kowalski",
-                    "name": "User1",
-                    "user_id": 1,
-                },
-                {
-                    "email": "jk2@co.co",
-                    "first_name": "Janusz",
-                    "id": 2,
-                    "last_name": "Kowalski",
-                    "name": "User2",
-                    "user_id": 2,
-                },
-                {
-                    "email": "jk3@co.co",
-                    "first_name": "Janusz",
-                    "id": 3,
-                    "last_name": "Kowalski",
-                    "name": "User3",
-                    "user_id": 3,
-                },
-                {
-                    "email": "jk4@co.co",
-                    "first_name": "Janusz",
-                    "id": 4,
-                    "last_name": "Kowalski",
-                    "name": "User4",
-                    "user_id": 4,
-                },
+                [
+                    {
+                        "id": 2,
+                        "status": "failure",
+                        "message_id": "a1",
+                        "contact_id": 2,
+                        "name": "User2",
+                        "email": "jk2@co.co",
+                    }
+                ],
+                [
+                    {
+                        "id": 4,
+                        "status": "failure",
+                        "message_id": "a1",
+                        "contact_id": 4,
+                        "name": "User4",
+                        "email": "jk4@co.co",
+                    }
+                ],
             ],
-            jobs,
+            pages,
         )
 
     async def test_get_email_requests(self):
@@ -161,6 +272,9 @@ class AioPGContactRepositoryTestCase(AioPGBaseTestCase):
                 "name": "camp3",
                 "segment": {"name": "seg", "id": 2},
                 "template": {"name": "template-2", "id": 2},
+                "include_segments": [],
+                "exclude_segments": [],
+                "exclude_template": None,
             },
             campaign,
         )
@@ -197,6 +311,34 @@ class AioPGContactRepositoryTestCase(AioPGBaseTestCase):
             jobs,
         )
 
+    async def test_get_email_request_job_statuses_filtered(self):
+        await self._generate_base_data()
+        await self.connection.execute(
+            """
+            INSERT INTO email_request (id, name, template_id, segment_id)
+            VALUES (1, 'test-camp', 1, 1)
+            """
+        )
+        await self.connection.execute(
+            """
+            INSERT INTO job (id, request_id, contact_id, status)
+            SELECT contact_id, 1, contact_id, 'pending'
+            FROM segment_contact WHERE segment_id = 1
+            """
+        )
+        await self.connection.execute(
+            "UPDATE job SET status = 'success' WHERE id IN (2, 3, 4)"
+        )
+
+        jobs = await self.repository.get_email_requests_job_statuses(
+            1, 1, after=2, status=EmailResult.SUCCESS.value
+        )
+
+        self.assertEqual(
+            [{"id": 3, "status": "success", "contact": {"name": "User3", "id": 3}}],
+            jobs,
+        )
+
     async def test_update_job_statuses(self):
         await self._generate_base_data()
         await self.connection.execute(
@@ -212,6 +354,12 @@ class AioPGContactRepositoryTestCase(AioPGBaseTestCase):
             FROM segment_contact WHERE segment_id = 1
             """
         )
+        await self.connection.execute(
+            """
+            INSERT INTO email_request_status (request_id, status, count)
+            VALUES (1, 'pending', 4)
+            """
+        )
 
         await self.repository.update_job_statuses(
             {
@@ -239,6 +387,55 @@ class AioPGContactRepositoryTestCase(AioPGBaseTestCase):
             ],
             await post_update.fetchall(),
         )
+        self.assertEqual(
+            {"pending": 0, "success": 2, "failure": 1, "retry": 1},
+            await self.repository.get_email_request_status_counts(1),
+        )
+
+    async def test_update_job_statuses_in_chunks(self):
+        await self._generate_base_data()
+        await self.connection.execute(
+            """
+            INSERT INTO email_request (id, name, template_id, segment_id)
+            VALUES (1, 'test-camp', 1, 1)
+            """
+        )
+        await self.connection.execute(
+            """
+            INSERT INTO job (id, request_id, contact_id, status)
+            SELECT contact_id, 1, contact_id, 'pending'
+            FROM segment_contact WHERE segment_id = 1
+            """
+        )
+        repository = SimplePostgresJobRepository(self.db_engine_mock, 2)
+
+        await repository.update_job_statuses(
+            {
+                EmailResult.RECOVERABLE_FAILURE.value: [
+                    {"id": 1, "message_id": ""},
+                    {"id": 4, "message_id": ""},
+                ],
+                EmailResult.SUCCESS.value: [
+                    {"id": 1, "message_id": "a3e1"},
+                    {"id": 2, "message_id": "d41a"},
+                    {"id": 3, "message_id": "e451"},
+                ],
+            }
+        )
+
+        post_update = await self.connection.execute(
+            "SELECT id, status, message_id FROM job ORDER BY id"
+        )
+
+        self.assertEqual(
+            [
+                (1, "success", "a3e1"),
+                (2, "success", "d41a"),
+                (3, "success", "e451"),
+                (4, "retry", ""),
+            ],
+            await post_update.fetchall(),
+        )
 
     async def test_create_template(self):
         template = {"name": "Test Template 1", "template": "Template content"}
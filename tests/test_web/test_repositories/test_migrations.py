@@ -0,0 +1,88 @@
+import os
+from tempfile import TemporaryDirectory
+
+from asynctest import TestCase, CoroutineMock, MagicMock, Mock, call
+
+from tests.test_web.test_repositories.aiopg_base import DBEngineMock
+from web.repositories.migrations import Migration, PostgresMigrationRunner
+
+
+class PostgresMigrationRunnerTestCase(TestCase):
+    def setUp(self):
+        self.migrations_dir = TemporaryDirectory()
+        self._write("0001_initial.sql", "CREATE TABLE IF NOT EXISTS a (id int);")
+        self._write(
+            "0002_a_index.sql",
+            "-- migration: no-transaction\n"
+            "DROP INDEX CONCURRENTLY IF EXISTS a_idx;\n"
+            "CREATE INDEX CONCURRENTLY a_idx ON a (id);\n",
+        )
+        self._write("README", "not a migration")
+
+        self.versions = Mock(fetchall=CoroutineMock(return_value=[(1,)]))
+        self.connection = Mock(
+            execute=CoroutineMock(
+                side_effect=lambda query, *args: self.versions
+                if query == "SELECT version FROM schema_version"
+                else None
+            ),
+            begin=Mock(return_value=MagicMock()),
+        )
+        self.runner = PostgresMigrationRunner(
+            DBEngineMock(self.connection), self.migrations_dir.name
+        )
+
+    def tearDown(self):
+        self.migrations_dir.cleanup()
+
+    def _write(self, file_name: str, content: str):
+        with open(os.path.join(self.migrations_dir.name, file_name), "w") as file:
+            file.write(content)
+
+    def test_load_migrations(self):
+        self.assertEqual(
+            [
+                Migration(1, "initial", "CREATE TABLE IF NOT EXISTS a (id int);", True),
+                Migration(
+                    2,
+                    "a_index",
+                    "-- migration: no-transaction\n"
+                    "DROP INDEX CONCURRENTLY IF EXISTS a_idx;\n"
+                    "CREATE INDEX CONCURRENTLY a_idx ON a (id);\n",
+                    False,
+                ),
+            ],
+            self.runner.load_migrations(),
+        )
+
+    async def test_migrate_applies_missing_versions(self):
+        self.assertEqual([2], await self.runner.migrate())
+
+        executed = [
+            args[0].strip() for args, _ in self.connection.execute.call_args_list
+        ]
+        self.assertNotIn("CREATE TABLE IF NOT EXISTS a (id int);", executed)
+        self.assertIn(
+            "-- migration: no-transaction\nDROP INDEX CONCURRENTLY IF EXISTS a_idx",
+            executed,
+        )
+        self.assertIn("CREATE INDEX CONCURRENTLY a_idx ON a (id)", executed)
+        self.connection.execute.assert_has_awaits(
+            [
+                call("SELECT pg_advisory_lock(%s)", PostgresMigrationRunner.lock_id),
+                call(
+                    "INSERT INTO schema_version (version, name) VALUES (%s, %s)",
+                    2,
+                    "a_index",
+                ),
+                call("SELECT pg_advisory_unlock(%s)", PostgresMigrationRunner.lock_id),
+            ],
+            any_order=True,
+        )
+        # index is built outside of a transaction
+        self.connection.begin.assert_not_called()
+
+    async def test_migrate_up_to_date(self):
+        self.versions.fetchall.return_value = [(1,), (2,)]
+
+        self.assertEqual([], await self.runner.migrate())
@@ -0,0 +1,76 @@
+from asyncio import Future, sleep
+
+from asynctest import TestCase, CoroutineMock, Mock, patch
+
+from common.exceptions import OverloadedError
+from web.repositories.pool import MonitoredEngine
+
+
+class MonitoredEngineTestCase(TestCase):
+    def setUp(self):
+        self.connection = Mock()
+        self.engine = Mock(
+            acquire=CoroutineMock(return_value=self.connection),
+            release=CoroutineMock(),
+            minsize=1,
+            maxsize=4,
+            size=3,
+            freesize=1,
+        )
+        self.monitored = MonitoredEngine(self.engine, 0.05, 2)
+
+    async def test_acquire_and_release(self):
+        with patch("web.repositories.pool.monotonic", Mock(side_effect=[10, 10.5])):
+            async with self.monitored.acquire() as conn:
+                self.assertIs(self.connection, conn)
+                self.engine.release.assert_not_awaited()
+
+        self.engine.release.assert_awaited_once_with(self.connection)
+        self.assertEqual(
+            {
+                "min_size": 1,
+                "max_size": 4,
+                "size": 3,
+                "in_use": 2,
+                "utilization": 0.5,
+                "waiting": 0,
+                "acquired": 1,
+                "timeouts": 0,
+                "wait_time": {"total": 0.5, "max": 0.5, "mean": 0.5},
+            },
+            self.monitored.metrics(),
+        )
+
+    async def test_released_on_error(self):
+        with self.assertRaises(ValueError):
+            async with self.monitored.acquire():
+                raise ValueError()
+
+        self.engine.release.assert_awaited_once_with(self.connection)
+
+    async def test_acquire_timeout(self):
+        self.engine.acquire = Mock(return_value=Future())
+
+        with self.assertRaises(OverloadedError) as error:
+            async with self.monitored.acquire():
+                pass
+
+        self.assertEqual(2, error.exception.retry_after)
+        self.engine.release.assert_not_awaited()
+        self.assertEqual(1, self.monitored.metrics()["timeouts"])
+
+    async def test_waiting(self):
+        pending = Future()
+        self.engine.acquire = Mock(return_value=pending)
+
+        async def acquire():
+            async with self.monitored.acquire():
+                pass
+
+        task = self.loop.create_task(acquire())
+        await sleep(0)
+
+        self.assertEqual(1, self.monitored.metrics()["waiting"])
+        pending.set_result(self.connection)
+        await task
+        self.assertEqual(0, self.monitored.metrics()["waiting"])
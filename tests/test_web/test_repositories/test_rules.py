@@ -0,0 +1,41 @@
+from asynctest import TestCase, CoroutineMock, Mock
+
+from common.exceptions import ValidationError
+from web.repositories.sqlalchemy.rules import compile_segment_rule, load_segment_rules
+
+
+class LoadSegmentRulesTestCase(TestCase):
+    def setUp(self):
+        self.segments = {
+            1: None,
+            2: {"segments": [1, 3], "exclude_segments": [4]},
+            4: {"email_domain": "acme.com"},
+        }
+        self.conn = Mock(execute=CoroutineMock(side_effect=self._execute))
+
+    async def _execute(self, query):
+        ids = query.compile().params["ids"]
+        rows = [
+            {"id": segment_id, "rule": self.segments[segment_id]}
+            for segment_id in ids
+            if segment_id in self.segments
+        ]
+        return Mock(fetchall=CoroutineMock(return_value=rows))
+
+    async def test_single_segment(self):
+        self.assertEqual({1: None}, await load_segment_rules(self.conn, [1]))
+
+    async def test_follows_references(self):
+        self.assertEqual(
+            {1: None, 2: self.segments[2], 3: None, 4: self.segments[4]},
+            await load_segment_rules(self.conn, [2]),
+        )
+        self.assertEqual(2, self.conn.execute.await_count)
+
+
+class CompileSegmentRuleTestCase(TestCase):
+    def test_cycle(self):
+        rules = {1: {"segments": [2]}, 2: {"exclude_segments": [1]}}
+
+        with self.assertRaises(ValidationError):
+            compile_segment_rule(rules, 1)
@@ -0,0 +1,57 @@
+from asynctest import TestCase, CoroutineMock, Mock
+from sqlalchemy import Integer, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql.psycopg2 import PGDialect_psycopg2
+
+from web.repositories.sqlalchemy.pagination import (
+    build_keyset_pages,
+    select_keyset_page,
+)
+from web.repositories.sqlalchemy.statements import CompiledStatementCache
+from web.repositories.sqlalchemy.tables import contact_table, segment_table
+
+
+class CompiledStatementCacheTestCase(TestCase):
+    def setUp(self):
+        self.conn = Mock(execute=CoroutineMock())
+        self.statements = CompiledStatementCache(Mock(dialect=PGDialect_psycopg2()))
+
+    async def test_compiles_once(self):
+        query = select([segment_table.c.id, segment_table.c.name]).where(
+            segment_table.c.id == any_(bindparam("ids", type_=ARRAY(Integer)))
+        )
+        query.compile = Mock(wraps=query.compile)
+
+        await self.statements.execute(self.conn, query, ids=[1, 2])
+        await self.statements.execute(self.conn, query, ids=[3])
+
+        query.compile.assert_called_once()
+        sql, parameters = self.conn.execute.await_args[0]
+        self.assertEqual(
+            "SELECT segment.id, segment.name \nFROM segment \n"
+            "WHERE segment.id = ANY (%(ids)s)",
+            sql,
+        )
+        self.assertEqual({"ids": [3]}, parameters)
+
+    async def test_keyset_pages(self):
+        pages = build_keyset_pages(
+            select([contact_table.c.id, contact_table.c.name]), contact_table.c.id
+        )
+
+        query, params = select_keyset_page(pages, 25, before=40)
+        await self.statements.execute(self.conn, query, **params)
+
+        self.conn.execute.assert_awaited_once_with(
+            "SELECT contact.id, contact.name \nFROM contact \n"
+            "WHERE contact.id < %(before)s ORDER BY contact.id DESC \n"
+            " LIMIT %(limit)s",
+            {"before": 40, "limit": 25},
+        )
+        self.assertEqual(
+            (pages.first, {"limit": None}), select_keyset_page(pages, None)
+        )
+        self.assertEqual(
+            (pages.after, {"limit": 10, "after": 5}),
+            select_keyset_page(pages, 10, after=5),
+        )
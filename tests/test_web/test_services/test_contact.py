@@ -0,0 +1,111 @@
+from asynctest import TestCase, create_autospec
+
+from common.enums import SegmentOperation
+from common.exceptions import ValidationError
+from web.repositories.contact.abstract import AbstractContactRepository
+from web.services.contact.service import ContactService
+
+
+class ContactServiceTestCase(TestCase):
+    def setUp(self):
+        self._contact_repo = create_autospec(AbstractContactRepository)
+        self._segments = {
+            2: {"id": 2, "name": "Static", "rule": None},
+            3: {"id": 3, "name": "Acme", "rule": {"segments": [2, 4]}},
+            4: {"id": 4, "name": "Testers", "rule": {"exclude_segments": [1]}},
+        }
+        self._contact_repo.get_segment.side_effect = self._segments.get
+
+        self.service = ContactService(self._contact_repo)
+
+    async def test_set_segment_rule(self):
+        await self.service.set_segment_rule(
+            1, {"email_domain": "acme.com", "segments": [2]}
+        )
+
+        self._contact_repo.update_segment.assert_awaited_once_with(
+            {"id": 1, "rule": {"email_domain": "acme.com", "segments": [2]}}
+        )
+
+    async def test_clear_segment_rule(self):
+        await self.service.set_segment_rule(1, None)
+
+        self._contact_repo.get_segment.assert_not_awaited()
+        self._contact_repo.update_segment.assert_awaited_once_with(
+            {"id": 1, "rule": None}
+        )
+
+    async def test_set_segment_rule_cycle(self):
+        with self.assertRaises(ValidationError):
+            await self.service.set_segment_rule(1, {"exclude_segments": [3]})
+
+        self._contact_repo.update_segment.assert_not_awaited()
+
+    async def test_set_segment_rule_missing_reference(self):
+        with self.assertRaisesRegex(ValidationError, "Segment 5 doesn't exist"):
+            await self.service.set_segment_rule(1, {"segments": [2, 5]})
+
+        self._contact_repo.update_segment.assert_not_awaited()
+
+    async def test_copy_segment(self):
+        self._contact_repo.copy_segment.return_value = {
+            "id": 5,
+            "name": "Copy",
+            "members": 3,
+        }
+
+        self.assertEqual(
+            {"id": 5, "name": "Copy", "members": 3},
+            await self.service.copy_segment(2, "Copy"),
+        )
+        self._contact_repo.copy_segment.assert_awaited_once_with(2, "Copy")
+
+    async def test_copy_missing_segment(self):
+        with self.assertRaises(ValidationError):
+            await self.service.copy_segment(5, "Copy")
+
+        self._contact_repo.copy_segment.assert_not_awaited()
+
+    async def test_build_segment(self):
+        self._contact_repo.combine_segments.return_value = 3
+
+        self.assertEqual(
+            3, await self.service.build_segment(2, SegmentOperation.UNION, [3, 4])
+        )
+        self._contact_repo.combine_segments.assert_awaited_once_with(
+            SegmentOperation.UNION, [3, 4], 2, False
+        )
+
+    async def test_add_contacts_to_segment(self):
+        self._contact_repo.add_contacts_to_segment.return_value = 2
+
+        self.assertEqual(
+            2, await self.service.add_contacts_to_segment(2, contact_ids=[1, 5])
+        )
+        self._contact_repo.add_contacts_to_segment.assert_awaited_once_with(
+            2, [1, 5], None
+        )
+
+    async def test_add_contacts_to_not_editable_segment(self):
+        for segment_id in (3, 5):
+            with self.assertRaises(ValidationError):
+                await self.service.add_contacts_to_segment(segment_id, id_range=(1, 9))
+            with self.assertRaises(ValidationError):
+                await self.service.add_contact_to_segment(segment_id, 1)
+
+        self._contact_repo.add_contacts_to_segment.assert_not_awaited()
+        self._contact_repo.add_contact_to_segment.assert_not_awaited()
+
+    async def test_check_segment_editable(self):
+        await self.service.check_segment_editable(2)
+
+        with self.assertRaisesRegex(ValidationError, "Segment 5 doesn't exist"):
+            await self.service.check_segment_editable(5)
+        with self.assertRaisesRegex(ValidationError, "Segment 3 has a rule"):
+            await self.service.check_segment_editable(3)
+
+    async def test_build_rule_segment(self):
+        with self.assertRaises(ValidationError):
+            await self.service.build_segment(3, SegmentOperation.UNION, [2])
+
+        self._contact_repo.combine_segments.assert_not_awaited()
@@ -1,4 +1,6 @@
-from asynctest import TestCase, create_autospec
+from asyncio import sleep
+
+from asynctest import TestCase, create_autospec, call
 
 from common.enums import EmailResult
 from common.exceptions import (
@@ -9,6 +11,12 @@ from common.exceptions import (
 from web.integrations.email_client.abstract import AbstractEmailClient
 from web.repositories.jobs.abstract import AbstractJobRepository
 from web.services.email.service import EmailService
+from web.services.email.status_buffer import JobStatusBuffer
+
+
+async def iterate_pages(*pages):
+    for page in pages:
+        yield page
 
 
 class EmailServiceTestCase(TestCase):
@@ -29,7 +37,9 @@ class EmailServiceTestCase(TestCase):
             "segment_id": 189,
             "name": "Take a look at a new feature",
         }
-        self._job_repo.get_email_request_job_data.return_value = self._jobs
+        self._job_repo.iterate_email_request_job_data.return_value = iterate_pages(
+            self._jobs
+        )
         self._job_repo.get_template.return_value = {
             "id": 213,
             "name": "Feature email",
@@ -54,13 +64,70 @@ class EmailServiceTestCase(TestCase):
             result,
         )
         self._job_repo.create_email_request.assert_awaited_once_with(
-            189, 213, "Take a look at a new feature"
+            189, 213, "Take a look at a new feature", (), (), None
         )
-        self._job_repo.get_email_request_job_data.assert_awaited_once_with(42)
+        self._job_repo.iterate_email_request_job_data.assert_called_once_with(42, 1000)
         self._email_client.schedule_mailing_jobs.assert_awaited_once_with(
             self._jobs, "Click and see for yourself.", "Take a look at a new feature"
         )
 
+    async def test_send_emails_targeting(self):
+        await self.service.send_emails(
+            189, 213, "Take a look at a new feature", [190, 191], [192], 200
+        )
+
+        self._job_repo.create_email_request.assert_awaited_once_with(
+            189, 213, "Take a look at a new feature", [190, 191], [192], 200
+        )
+
+    async def test_send_emails_in_pages(self):
+        self._job_repo.iterate_email_request_job_data.return_value = iterate_pages(
+            self._jobs[:2], self._jobs[2:]
+        )
+        posted = []
+
+        async def schedule_mailing_jobs(jobs, template, subject):
+            await sleep(0)
+            posted.append(jobs)
+
+        self._email_client.schedule_mailing_jobs.side_effect = schedule_mailing_jobs
+        service = EmailService(self._job_repo, self._email_client, 2)
+
+        _, error = await service.send_emails(189, 213, "Take a look at a new feature")
+
+        self.assertIsNone(error)
+        self.assertEqual(posted, [self._jobs[:2], self._jobs[2:]])
+        self._job_repo.iterate_email_request_job_data.assert_called_once_with(42, 2)
+        self._email_client.schedule_mailing_jobs.assert_has_awaits(
+            [
+                call(
+                    self._jobs[:2],
+                    "Click and see for yourself.",
+                    "Take a look at a new feature",
+                ),
+                call(
+                    self._jobs[2:],
+                    "Click and see for yourself.",
+                    "Take a look at a new feature",
+                ),
+            ]
+        )
+
+    async def test_send_emails_stops_after_error(self):
+        self._job_repo.iterate_email_request_job_data.return_value = iterate_pages(
+            self._jobs[:1], self._jobs[1:2], self._jobs[2:]
+        )
+        self._email_client.schedule_mailing_jobs.side_effect = UnavailableServiceError(
+            "Unknown reason"
+        )
+
+        _, error = await self.service.send_emails(
+            189, 213, "Take a look at a new feature"
+        )
+
+        self.assertEqual(error, "Email service not available: Unknown reason.")
+        self._email_client.schedule_mailing_jobs.assert_awaited_once()
+
     async def test_send_emails_validation_error(self):
         self._email_client.schedule_mailing_jobs.side_effect = ValidationError(
             "Expected str, not int"
@@ -83,7 +150,7 @@ class EmailServiceTestCase(TestCase):
             result,
         )
         self._job_repo.create_email_request.assert_awaited_once_with(
-            189, 213, "Take a look at a new feature"
+            189, 213, "Take a look at a new feature", (), (), None
         )
         self._email_client.schedule_mailing_jobs.assert_awaited_once_with(
             self._jobs, "Click and see for yourself.", "Take a look at a new feature"
@@ -111,7 +178,7 @@ class EmailServiceTestCase(TestCase):
             result,
         )
         self._job_repo.create_email_request.assert_awaited_once_with(
-            189, 213, "Take a look at a new feature"
+            189, 213, "Take a look at a new feature", (), (), None
         )
         self._email_client.schedule_mailing_jobs.assert_awaited_once_with(
             self._jobs, "Click and see for yourself.", "Take a look at a new feature"
@@ -139,7 +206,7 @@ class EmailServiceTestCase(TestCase):
             result,
         )
         self._job_repo.create_email_request.assert_awaited_once_with(
-            189, 213, "Take a look at a new feature"
+            189, 213, "Take a look at a new feature", (), (), None
         )
         self._email_client.schedule_mailing_jobs.assert_awaited_once_with(
             self._jobs, "Click and see for yourself.", "Take a look at a new feature"
@@ -151,12 +218,13 @@ class EmailServiceTestCase(TestCase):
             {"id": 231, "name": "Discounts"},
         ]
 
-        result = await self.service.get_email_requests()
+        result = await self.service.get_email_requests(1, after=200)
 
         self.assertEqual(
-            [{"id": 231, "name": "Hello!"}, {"id": 231, "name": "Discounts"}], result
+            {"objects": [{"id": 231, "name": "Hello!"}], "prev": 231, "next": 231},
+            result,
         )
-        self._job_repo.get_email_requests.assert_awaited_once()
+        self._job_repo.get_email_requests.assert_awaited_once_with(2, 200, None)
 
     async def test_get_email_request_details(self):
         self._job_repo.get_email_request.return_value = {
@@ -177,8 +245,14 @@ class EmailServiceTestCase(TestCase):
                 "status": EmailResult.SUCCESS.value,
             },
         ]
+        self._job_repo.get_email_request_status_counts.return_value = {
+            EmailResult.FAILURE.value: 1,
+            EmailResult.SUCCESS.value: 1,
+        }
 
-        result = await self.service.get_email_request_details(231)
+        result = await self.service.get_email_request_details(
+            231, 25, status=EmailResult.FAILURE.value
+        )
 
         self.assertEqual(
             {
@@ -188,23 +262,37 @@ class EmailServiceTestCase(TestCase):
                     "template": {"id": 145, "name": "Welcome email"},
                     "segment": {"id": 14, "name": "New users"},
                 },
-                "jobs": [
-                    {
-                        "id": 45,
-                        "contact": {"id": 145, "name": "user1"},
-                        "status": EmailResult.FAILURE.value,
-                    },
-                    {
-                        "id": 46,
-                        "contact": {"id": 87, "name": "user2"},
-                        "status": EmailResult.SUCCESS.value,
-                    },
-                ],
+                "statuses": {
+                    EmailResult.SUCCESS.value: 1,
+                    EmailResult.AUTH_FAILURE.value: 0,
+                    EmailResult.FAILURE.value: 1,
+                    EmailResult.RECOVERABLE_FAILURE.value: 0,
+                    EmailResult.PENDING.value: 0,
+                },
+                "jobs": {
+                    "objects": [
+                        {
+                            "id": 45,
+                            "contact": {"id": 145, "name": "user1"},
+                            "status": EmailResult.FAILURE.value,
+                        },
+                        {
+                            "id": 46,
+                            "contact": {"id": 87, "name": "user2"},
+                            "status": EmailResult.SUCCESS.value,
+                        },
+                    ],
+                    "prev": None,
+                    "next": None,
+                },
             },
             result,
         )
         self._job_repo.get_email_request.assert_awaited_once_with(231)
-        self._job_repo.get_email_requests_job_statuses.assert_awaited_once_with(231)
+        self._job_repo.get_email_requests_job_statuses.assert_awaited_once_with(
+            231, 26, None, None, EmailResult.FAILURE.value
+        )
+        self._job_repo.get_email_request_status_counts.assert_awaited_once_with(231)
 
     async def test_update_job_statuses(self):
         statuses = {
@@ -215,3 +303,15 @@ class EmailServiceTestCase(TestCase):
         await self.service.update_jobs_statuses(statuses)
 
         self._job_repo.update_job_statuses.assert_awaited_once_with(statuses)
+
+    async def test_update_job_statuses_buffered(self):
+        status_buffer = create_autospec(JobStatusBuffer)
+        service = EmailService(
+            self._job_repo, self._email_client, status_buffer=status_buffer
+        )
+        statuses = {EmailResult.SUCCESS.value: [{"id": 12, "message_id": "a1"}]}
+
+        await service.update_jobs_statuses(statuses)
+
+        status_buffer.add.assert_awaited_once_with(statuses)
+        self._job_repo.update_job_statuses.assert_not_awaited()
@@ -0,0 +1,56 @@
+from unittest import TestCase
+
+from web.services.pagination import create_keyset_page, get_keyset_limit
+
+
+class KeysetPageTestCase(TestCase):
+    def setUp(self):
+        self.objects = [{"id": i} for i in range(1, 5)]
+
+    def test_get_keyset_limit(self):
+        self.assertEqual(26, get_keyset_limit(25))
+        self.assertIsNone(get_keyset_limit(None))
+
+    def test_first_page(self):
+        self.assertEqual(
+            {"objects": self.objects[:3], "prev": None, "next": 3},
+            create_keyset_page(self.objects, 3),
+        )
+
+    def test_only_page(self):
+        self.assertEqual(
+            {"objects": self.objects, "prev": None, "next": None},
+            create_keyset_page(self.objects, 5),
+        )
+
+    def test_after(self):
+        self.assertEqual(
+            {"objects": self.objects[:3], "prev": 1, "next": 3},
+            create_keyset_page(self.objects, 3, after=0),
+        )
+        self.assertEqual(
+            {"objects": self.objects, "prev": 1, "next": None},
+            create_keyset_page(self.objects, 5, after=0),
+        )
+
+    def test_before(self):
+        self.assertEqual(
+            {"objects": self.objects[1:], "prev": 2, "next": 4},
+            create_keyset_page(self.objects, 3, before=5),
+        )
+        self.assertEqual(
+            {"objects": self.objects, "prev": None, "next": 4},
+            create_keyset_page(self.objects, 5, before=5),
+        )
+
+    def test_empty(self):
+        self.assertEqual(
+            {"objects": [], "prev": None, "next": None},
+            create_keyset_page([], 3, after=10),
+        )
+
+    def test_not_paginated(self):
+        self.assertEqual(
+            {"objects": self.objects, "prev": None, "next": None},
+            create_keyset_page(self.objects, None),
+        )
@@ -0,0 +1,38 @@
+from asynctest import TestCase, create_autospec, patch, CoroutineMock
+
+from common.coalescing import CoalescingBuffer
+from common.enums import EmailResult
+from web.repositories.jobs.abstract import AbstractJobRepository
+from web.services.email.status_buffer import JobStatusBuffer
+
+
+class JobStatusBufferTestCase(TestCase):
+    def setUp(self):
+        self.job_repository = create_autospec(AbstractJobRepository)
+
+    async def test_flush_updates_job_statuses(self):
+        buffer = JobStatusBuffer(self.job_repository, 100, 60)
+
+        await buffer.add(
+            {
+                EmailResult.SUCCESS.value: [{"id": 1, "message_id": "a1"}],
+                EmailResult.FAILURE.value: [{"id": 2, "message_id": ""}],
+            }
+        )
+        await buffer.flush()
+
+        self.job_repository.update_job_statuses.assert_awaited_once_with(
+            {
+                EmailResult.SUCCESS.value: [{"id": 1, "message_id": "a1"}],
+                EmailResult.FAILURE.value: [{"id": 2, "message_id": ""}],
+            }
+        )
+        await buffer.close()
+
+    async def test_close_bounded_by_default(self):
+        buffer = JobStatusBuffer(self.job_repository)
+
+        with patch.object(CoalescingBuffer, "close", CoroutineMock()) as close_mock:
+            await buffer.close()
+
+        close_mock.assert_awaited_once_with(10)
@@ -20,3 +20,8 @@ class TemplateValidateTestCase(TestCase):
         template = "Hey {name}! You agree that we'll send stuff to your {12ds} {email}."
 
         self.assertRaises(Invalid, validate_template, template)
+
+    def test_malformed_template(self):
+        template = "Hey {name! You agree that we'll send stuff to your {email}."
+
+        self.assertRaises(Invalid, validate_template, template)
@@ -1,4 +1,5 @@
 from asyncio import get_event_loop
+from signal import SIGINT, SIGTERM
 
 from tornado.platform.asyncio import AsyncIOMainLoop
 
@@ -8,6 +9,13 @@ if __name__ == "__main__":
     AsyncIOMainLoop().install()
     loop = get_event_loop()
 
-    app, config = loop.run_until_complete(init_app())
+    app, config, shutdown = loop.run_until_complete(init_app())
     app.listen(config["port"])
-    loop.run_forever()
+
+    for signal in (SIGINT, SIGTERM):
+        loop.add_signal_handler(signal, loop.stop)
+
+    try:
+        loop.run_forever()
+    finally:
+        loop.run_until_complete(shutdown())
@@ -1,6 +1,7 @@
 import os
+from asyncio import ensure_future
 from json import load
-from re import findall
+from typing import Optional
 
 from aiohttp import ClientSession
 from aiopg.sa import create_engine
@@ -17,10 +18,25 @@ from web.controllers.contact import (
     ContactHandler,
     ContactFormHandler,
     ContactSegmentFormHandler,
+    ContactImportFormHandler,
 )
+from web.controllers.contact_import import ContactImportHandler
 from web.controllers.dashboard import Dashboard
+from web.controllers.export import (
+    ContactsExportHandler,
+    SegmentExportHandler,
+    CampaignExportHandler,
+)
 from web.controllers.job import JobStatusHandler
+from web.controllers.metrics import PoolMetricsHandler
 from web.controllers.segment import SegmentsHandler, SegmentHandler, SegmentFormHandler
+from web.controllers.segment_operations import (
+    SegmentMembersHandler,
+    SegmentBuildHandler,
+    SegmentCopyHandler,
+    SegmentRuleHandler,
+)
+from web.controllers.search import ContactSearchHandler, SegmentSearchHandler
 from web.controllers.settings import SettingsRequestHandler
 from web.controllers.template import (
     TemplatesHandler,
@@ -28,22 +44,38 @@ from web.controllers.template import (
     TemplateHandler,
 )
 from web.integrations.email_client.http import EmailHTTPClient
+from web.repositories.cache import (
+    LocalCacheInvalidator,
+    PostgresCacheInvalidator,
+    RepositoryCache,
+)
 from web.repositories.contact.aiopg import SimplePostgresContactRepository
+from web.repositories.contact.cached import CachedContactRepository
 from web.repositories.jobs.aiopg import SimplePostgresJobRepository
+from web.repositories.jobs.cached import CachedJobRepository
+from web.repositories.migrations import PostgresMigrationRunner
+from web.repositories.pool import MonitoredEngine
 from web.services.contact.abstract import AbstractContactService
 from web.services.contact.service import ContactService
 from web.services.email.abstract import AbstractEmailService
 from web.services.email.service import EmailService
+from web.services.email.status_buffer import JobStatusBuffer
 from web.services.settings.abstract import AbstractSettingsService
 from web.services.settings.service import SettingsService
 
 
-async def init_db(config_file: str, force_init_db=False):
+async def init_db(config_file: str, force_init_db=False) -> MonitoredEngine:
     with open(config_file) as dbconfig:
         config = load(dbconfig)
 
-    with open(config["sql"]) as sql_file:
-        init_sql = sql_file.read()
+    pool_config = config.get("pool", {})
+    connection_options = {}
+
+    if pool_config.get("statement_timeout"):
+        # milliseconds, applied to every connection of the pool
+        connection_options[
+            "options"
+        ] = f"-c statement_timeout={int(pool_config['statement_timeout'])}"
 
     engine = await create_engine(
         user=config["user"],
@@ -51,29 +83,20 @@ async def init_db(config_file: str, force_init_db=False):
         host=config["host"],
         port=config["port"],
         password=config["password"],
+        minsize=pool_config.get("min_size", 1),
+        maxsize=pool_config.get("max_size", 10),
+        **connection_options,
     )
+    migration_runner = PostgresMigrationRunner(engine, config["migrations"])
 
-    required_tables = set(findall(r"CREATE TABLE ([\w_]+) \(", init_sql))
-
-    async with engine.acquire() as conn:
-        query = """
-            SELECT table_name
-            FROM information_schema.tables
-            WHERE table_type = 'BASE TABLE'
-            AND table_schema = 'public'
-            AND table_catalog = %s
-        """
-        tables = await conn.execute(query, config["name"])
-        all_tables = set(table["table_name"] for table in await tables.fetchall())
+    if force_init_db:
+        await migration_runner.reset()
 
-    if force_init_db or all_tables != required_tables:
-        with open(config["sql"]) as sql_file:
-            init_sql = sql_file.read()
+    await migration_runner.migrate()
 
-        async with engine.acquire() as conn:
-            await conn.execute(init_sql)
-
-    return engine
+    return MonitoredEngine(
+        engine, pool_config.get("acquire_timeout", 5), pool_config.get("retry_after", 1)
+    )
 
 
 def create_contact_app(
@@ -88,6 +111,12 @@ def create_contact_app(
             (r"/contacts", ContactsHandler, shared_kwargs),
             (r"/contacts/(?P<contact_id>\d+)", ContactHandler, shared_kwargs),
             (r"/contacts/add", ContactFormHandler, shared_kwargs),
+            (r"/contacts/import", ContactImportFormHandler, shared_kwargs),
+            (
+                r"/contacts/export",
+                ContactsExportHandler,
+                {"contact_service": contact_service},
+            ),
             (r"/contacts/(?P<contact_id>\d+)/edit", ContactFormHandler, shared_kwargs),
             (
                 r"/contacts/(?P<contact_id>\d+)/segments",
@@ -111,6 +140,11 @@ def create_segment_app(
             (r"/segments/(?P<segment_id>\d+)", SegmentHandler, shared_kwargs),
             (r"/segments/add", SegmentFormHandler, shared_kwargs),
             (r"/segments/(?P<segment_id>\d+)/edit", SegmentFormHandler, shared_kwargs),
+            (
+                r"/segments/(?P<segment_id>\d+)/export",
+                SegmentExportHandler,
+                {"contact_service": contact_service},
+            ),
         ]
     )
 
@@ -148,6 +182,11 @@ def create_campaign_app(
             (r"/campaigns", CampaignsHandler, shared_kwargs),
             (r"/campaigns/(?P<campaign_id>\d+)", CampaignHandler, shared_kwargs),
             (r"/campaigns/create", CampaignFormHandler, shared_kwargs),
+            (
+                r"/campaigns/(?P<campaign_id>\d+)/export",
+                CampaignExportHandler,
+                {"email_service": email_service},
+            ),
         ]
     )
 
@@ -157,9 +196,18 @@ def make_app(
     contact_service: AbstractContactService,
     email_service: AbstractEmailService,
     settings_service: AbstractSettingsService,
+    db_engine: Optional[MonitoredEngine] = None,
 ):
+    metrics_handlers = []
+
+    if db_engine is not None:
+        metrics_handlers.append(
+            (r"/api/v1/metrics/db-pool", PoolMetricsHandler, {"db_engine": db_engine})
+        )
+
     return Application(
         [
+            *metrics_handlers,
             (r"/", Dashboard, {"template_loader": template_loader}),
             (r"/contacts.*", create_contact_app(template_loader, contact_service)),
             (r"/segments.*", create_segment_app(template_loader, contact_service)),
@@ -177,6 +225,41 @@ def make_app(
                 create_campaign_app(template_loader, email_service, contact_service),
             ),
             (r"/api/v1/job", JobStatusHandler, {"email_service": email_service}),
+            (
+                r"/api/v1/contacts/import",
+                ContactImportHandler,
+                {"contact_service": contact_service},
+            ),
+            (
+                r"/api/v1/contacts/search",
+                ContactSearchHandler,
+                {"contact_service": contact_service},
+            ),
+            (
+                r"/api/v1/segments/search",
+                SegmentSearchHandler,
+                {"contact_service": contact_service},
+            ),
+            (
+                r"/api/v1/segments/(?P<segment_id>\d+)/members",
+                SegmentMembersHandler,
+                {"contact_service": contact_service},
+            ),
+            (
+                r"/api/v1/segments/(?P<segment_id>\d+)/build",
+                SegmentBuildHandler,
+                {"contact_service": contact_service},
+            ),
+            (
+                r"/api/v1/segments/(?P<segment_id>\d+)/copy",
+                SegmentCopyHandler,
+                {"contact_service": contact_service},
+            ),
+            (
+                r"/api/v1/segments/(?P<segment_id>\d+)/rule",
+                SegmentRuleHandler,
+                {"contact_service": contact_service},
+            ),
         ]
     )
 
@@ -190,17 +273,60 @@ async def init_app():
     with open(app_config_file) as config_file:
         app_config = load(config_file)
 
-    contact_repository = SimplePostgresContactRepository(db_engine)
+    contact_repository = SimplePostgresContactRepository(
+        db_engine, app_config.get("estimate_counts", False)
+    )
     job_repository = SimplePostgresJobRepository(db_engine)
+    cache_config = app_config.get("cache", {})
+    cache_listener = None
+
+    if cache_config.get("enabled"):
+        cache = RepositoryCache(cache_config.get("ttl", 60))
+
+        if cache_config.get("broadcast"):
+            invalidator = PostgresCacheInvalidator(
+                db_engine, cache, cache_config.get("channel", "cache_invalidation")
+            )
+            cache_listener = ensure_future(invalidator.listen())
+        else:
+            invalidator = LocalCacheInvalidator(cache)
+
+        contact_repository = CachedContactRepository(
+            contact_repository, cache, invalidator
+        )
+        job_repository = CachedJobRepository(job_repository, cache, invalidator)
 
     email_client = EmailHTTPClient(ClientSession(), app_config["email"]["url"])
 
     contact_service = ContactService(contact_repository)
-    email_service = EmailService(job_repository, email_client)
+    buffer_config = app_config.get("status_buffer", {})
+    status_buffer = None
+
+    if buffer_config.get("enabled"):
+        status_buffer = JobStatusBuffer(
+            job_repository,
+            buffer_config.get("max_size", 5000),
+            buffer_config.get("flush_interval", 1),
+        )
+
+    email_service = EmailService(
+        job_repository,
+        email_client,
+        app_config["email"].get("dispatch_page_size", 1000),
+        status_buffer,
+    )
     settings_service = SettingsService(email_client)
 
     template_loader = Loader("templates")
 
-    app = make_app(template_loader, contact_service, email_service, settings_service)
+    app = make_app(
+        template_loader, contact_service, email_service, settings_service, db_engine
+    )
+
+    async def shutdown():
+        if cache_listener:
+            cache_listener.cancel()
+        if status_buffer:
+            await status_buffer.close(buffer_config.get("shutdown_timeout", 10))
 
-    return app, app_config
+    return app, app_config, shutdown
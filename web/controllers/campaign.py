@@ -2,6 +2,7 @@ from tornado.template import Loader
 
 from common.enums import EmailResult
 from web.controllers.utils.errors import handle_errors
+from web.controllers.utils.pagination import create_pagination_context
 from web.controllers.utils.validated import ValidatedFormRequestHandler
 from web.schemas import campaign_schema
 from web.services.contact.abstract import AbstractContactService
@@ -34,10 +35,16 @@ class CampaignsHandler(BaseCampaignRequestHandler):
 
     @handle_errors
     async def get(self):
-        contacts = await self.email_service.get_email_requests()
+        after, before = self._get_cursor()
+        campaigns = await self.email_service.get_email_requests(
+            DEFAULT_PER_PAGE, after, before
+        )
         self.write(
             self.loader.load("campaigns/campaigns.html").generate(
-                objects=contacts, columns=["id", "name"], url_base="/campaigns/"
+                objects=campaigns["objects"],
+                columns=["id", "name"],
+                url_base="/campaigns/",
+                pages=create_pagination_context(campaigns),
             )
         )
 
@@ -51,12 +58,25 @@ class CampaignsHandler(BaseCampaignRequestHandler):
 class CampaignHandler(BaseCampaignRequestHandler):
     @handle_errors
     async def get(self, campaign_id: str):
-        campaign = await self.email_service.get_email_request_details(int(campaign_id))
+        after, before = self._get_cursor()
+        status = self.get_query_argument("status", None)
+
+        if status not in LABEL_MAPPING:
+            status = None
+
+        campaign = await self.email_service.get_email_request_details(
+            int(campaign_id), DEFAULT_PER_PAGE, after, before, status
+        )
         self.write(
             self.loader.load("campaigns/campaign.html").generate(
                 campaign=campaign["request"],
-                jobs=campaign["jobs"],
+                statuses=campaign["statuses"],
+                status=status,
+                jobs=campaign["jobs"]["objects"],
                 labels=LABEL_MAPPING,
+                pages=create_pagination_context(
+                    campaign["jobs"], filters={"status": status}
+                ),
             )
         )
 
@@ -66,10 +86,9 @@ class CampaignFormHandler(BaseCampaignRequestHandler):
     async def get(self):
         action = "/campaigns"
         templates = await self.email_service.list_email_templates()
-        segments = await self.contact_service.read_segments(1, None)
 
         self.write(
             self.loader.load("campaigns/campaign_form.html").generate(
-                action=action, segments=segments, templates=templates
+                action=action, templates=templates
             )
         )
@@ -24,15 +24,15 @@ class ContactsHandler(BaseContactRequestHandler):
 
     @handle_errors
     async def get(self):
-        page = self._get_page()
-        contacts = await self.service.read_contacts(page, DEFAULT_PER_PAGE)
+        after, before = self._get_cursor()
+        page = await self.service.read_contacts(DEFAULT_PER_PAGE, after, before)
         pages = await self.service.get_contacts_pages_count(DEFAULT_PER_PAGE)
 
         pagination_context = create_pagination_context(page, pages)
 
         self.write(
             self.loader.load("contacts/contacts.html").generate(
-                objects=contacts,
+                objects=page["objects"],
                 columns=["id", "name", "email"],
                 url_base="/contacts/",
                 pages=pagination_context,
@@ -85,11 +85,10 @@ class ContactSegmentFormHandler(BaseContactRequestHandler):
     @handle_errors
     async def get(self, contact_id: str):
         action = f"/contacts/{contact_id}/segments"
-        segments = await self.service.read_segments(1, None)
 
         self.write(
             self.loader.load("contacts/contact_segment_form.html").generate(
-                action=action, segments=segments
+                action=action
             )
         )
 
@@ -98,3 +97,13 @@ class ContactSegmentFormHandler(BaseContactRequestHandler):
         data = self.get_data("post")
         await self.service.add_contact_to_segment(data["segment_id"], int(contact_id))
         self.redirect(f"/contacts/{contact_id}")
+
+
+class ContactImportFormHandler(BaseContactRequestHandler):
+    @handle_errors
+    async def get(self):
+        self.write(
+            self.loader.load("contacts/import.html").generate(
+                action="/api/v1/contacts/import"
+            )
+        )
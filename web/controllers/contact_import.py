@@ -0,0 +1,67 @@
+from typing import Optional
+
+from tornado.web import RequestHandler, stream_request_body
+
+from common.decorators import handle_errors
+from common.exceptions import ValidationError
+from web.controllers.stream import ContactImportStream
+from web.services.contact.abstract import AbstractContactService
+
+
+@stream_request_body
+class ContactImportHandler(RequestHandler):
+    max_stream_body_size = 2 ** 30
+
+    def initialize(
+        self, contact_service: AbstractContactService, import_chunk_size: int = 1000
+    ):
+        self.service = contact_service
+        self._import_chunk_size = import_chunk_size
+
+        self._stream: Optional[ContactImportStream] = None
+        self._stream_error: Optional[Exception] = None
+
+    async def prepare(self):
+        content_type = self.request.headers.get("Content-Type", "")
+        segment_id = self.get_query_argument("segment_id", None)
+
+        try:
+            segment_id = int(segment_id) if segment_id else None
+        except ValueError:
+            self._stream_error = ValidationError(f"Invalid segment id {segment_id}")
+            return
+
+        try:
+            # body isn't read before the segment is known to accept contacts
+            if segment_id is not None:
+                await self.service.check_segment_editable(segment_id)
+
+            self._stream = ContactImportStream(
+                self.service,
+                content_type.split(";")[0].strip(),
+                segment_id,
+                self._import_chunk_size,
+            )
+        except Exception as e:
+            self._stream_error = e
+        else:
+            self.request.connection.set_max_body_size(self.max_stream_body_size)
+
+    async def data_received(self, chunk: bytes):
+        # rest of the body is drained after an error, close raises it
+        if self._stream_error is None:
+            await self._stream.receive(chunk)
+
+    @handle_errors
+    async def post(self):
+        try:
+            if self._stream_error is not None:
+                raise self._stream_error
+
+            await self._stream.close()
+        finally:
+            # chunks imported before an error stay imported
+            if self._stream is not None:
+                self.set_header("X-Imported-Contacts", self._stream.imported)
+
+        self.write(self._stream.report())
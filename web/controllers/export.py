@@ -0,0 +1,112 @@
+import csv
+import logging
+import traceback
+from io import StringIO
+from typing import AsyncIterator, Dict, List, Optional
+
+from tornado.iostream import StreamClosedError
+from tornado.web import RequestHandler
+
+from common.decorators import handle_errors
+from common.enums import EmailResult
+from web.services.contact.abstract import AbstractContactService
+from web.services.email.abstract import AbstractEmailService
+
+EXPORT_PAGE_SIZE = 1000
+CONTACT_COLUMNS = ["id", "name", "email", "first_name", "last_name"]
+JOB_STATUSES = frozenset(result.value for result in EmailResult)
+JOB_COLUMNS = ["id", "contact_id", "name", "email", "status", "message_id"]
+
+
+class BaseCsvExportHandler(RequestHandler):
+    """Streams CSV read page by page, flushing every page to the client.
+
+    Rows are written as they are read from the database, so the response
+    status is sent with the first page. Failures before it are responded by
+    handle_errors (503 when the database is overloaded), failures after that
+    close the connection without terminating the chunked response, so the
+    client can tell the file is truncated.
+    """
+
+    async def write_csv(
+        self, file_name: str, columns: List[str], pages: AsyncIterator[List[Dict]]
+    ):
+        self.set_header("Content-Type", "text/csv; charset=utf-8")
+        self.set_header("Content-Disposition", f'attachment; filename="{file_name}"')
+
+        buffer = StringIO()
+        writer = csv.DictWriter(buffer, columns, extrasaction="ignore")
+        writer.writeheader()
+        flushed = False
+
+        try:
+            async for rows in pages:
+                writer.writerows(rows)
+                self.write(buffer.getvalue())
+                buffer.seek(0)
+                buffer.truncate()
+                # waits until the page is sent, slow clients slow down reading
+                await self.flush()
+                flushed = True
+
+            self.write(buffer.getvalue())
+        except StreamClosedError:
+            logging.info(f"Client disconnected during {file_name} export.")
+        except Exception:
+            if not flushed:
+                # error response replaces the CSV headers
+                self.clear()
+                raise
+
+            logging.error(
+                f"Error occured when exporting {file_name}: {traceback.format_exc()}"
+            )
+            self.request.connection.stream.close()
+        finally:
+            await pages.aclose()
+
+
+class ContactsExportHandler(BaseCsvExportHandler):
+    def initialize(self, contact_service: AbstractContactService):
+        self.service = contact_service
+
+    @handle_errors
+    async def get(self):
+        await self.write_csv(
+            "contacts.csv",
+            CONTACT_COLUMNS,
+            self.service.export_contacts(EXPORT_PAGE_SIZE),
+        )
+
+
+class SegmentExportHandler(BaseCsvExportHandler):
+    def initialize(self, contact_service: AbstractContactService):
+        self.service = contact_service
+
+    @handle_errors
+    async def get(self, segment_id: str):
+        await self.write_csv(
+            f"segment-{segment_id}.csv",
+            CONTACT_COLUMNS,
+            self.service.export_segment_contacts(int(segment_id), EXPORT_PAGE_SIZE),
+        )
+
+
+class CampaignExportHandler(BaseCsvExportHandler):
+    def initialize(self, email_service: AbstractEmailService):
+        self.service = email_service
+
+    @handle_errors
+    async def get(self, campaign_id: str):
+        status: Optional[str] = self.get_query_argument("status", None)
+
+        if status not in JOB_STATUSES:
+            status = None
+
+        await self.write_csv(
+            f"campaign-{campaign_id}.csv",
+            JOB_COLUMNS,
+            self.service.export_email_request_jobs(
+                int(campaign_id), EXPORT_PAGE_SIZE, status
+            ),
+        )
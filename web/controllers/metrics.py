@@ -0,0 +1,13 @@
+from tornado.web import RequestHandler
+
+from common.decorators import handle_errors
+from web.repositories.pool import MonitoredEngine
+
+
+class PoolMetricsHandler(RequestHandler):
+    def initialize(self, db_engine: MonitoredEngine):
+        self.db_engine = db_engine
+
+    @handle_errors
+    async def get(self):
+        self.write(self.db_engine.metrics())
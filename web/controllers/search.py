@@ -0,0 +1,41 @@
+from typing import Dict
+
+from tornado.web import RequestHandler
+from voluptuous import Invalid
+
+from common.decorators import handle_errors
+from common.exceptions import ValidationError
+from web.schemas import search_schema
+from web.services.contact.abstract import AbstractContactService
+
+
+class BaseSearchHandler(RequestHandler):
+    def initialize(self, contact_service: AbstractContactService):
+        self.service = contact_service
+
+    def get_search(self) -> Dict:
+        try:
+            return search_schema(
+                {
+                    key: self.get_query_argument(key)
+                    for key in self.request.query_arguments.keys()
+                }
+            )
+        except Invalid as e:
+            raise ValidationError(e.error_message)
+
+
+class ContactSearchHandler(BaseSearchHandler):
+    @handle_errors
+    async def get(self):
+        search = self.get_search()
+        contacts = await self.service.search_contacts(search["q"], search["limit"])
+        self.write({"results": contacts})
+
+
+class SegmentSearchHandler(BaseSearchHandler):
+    @handle_errors
+    async def get(self):
+        search = self.get_search()
+        segments = await self.service.search_segments(search["q"], search["limit"])
+        self.write({"results": segments})
@@ -24,15 +24,15 @@ class SegmentsHandler(BaseSegmentRequestHandler):
 
     @handle_errors
     async def get(self):
-        page = self._get_page()
-        contacts = await self.service.read_segments(int(page), DEFAULT_PER_PAGE)
+        after, before = self._get_cursor()
+        page = await self.service.read_segments(DEFAULT_PER_PAGE, after, before)
         pages = await self.service.get_segments_pages_count(DEFAULT_PER_PAGE)
 
         pagination_context = create_pagination_context(page, pages)
 
         self.write(
             self.loader.load("segments/segments.html").generate(
-                objects=contacts,
+                objects=page["objects"],
                 columns=["id", "name"],
                 url_base="/segments/",
                 pages=pagination_context,
@@ -51,11 +51,19 @@ class SegmentHandler(BaseSegmentRequestHandler):
 
     @handle_errors
     async def get(self, segment_id: str):
+        after, before = self._get_cursor()
         segment = await self.service.get_segment(int(segment_id))
-        contacts = await self.service.list_contacts_in_segment(int(segment_id))
+        contacts = await self.service.list_contacts_in_segment(
+            int(segment_id), DEFAULT_PER_PAGE, after, before
+        )
+        pages = await self.service.get_segment_contacts_pages_count(
+            int(segment_id), DEFAULT_PER_PAGE
+        )
         self.write(
             self.loader.load("segments/segment.html").generate(
-                segment=segment, contacts=contacts
+                segment=segment,
+                contacts=contacts["objects"],
+                pages=create_pagination_context(contacts, pages),
             )
         )
 
@@ -0,0 +1,73 @@
+from typing import Dict
+
+from tornado.web import RequestHandler
+
+from common.decorators import handle_errors, validate_json
+from web.schemas import (
+    segment_build_schema,
+    segment_copy_schema,
+    segment_members_schema,
+    segment_rule_update_schema,
+)
+from web.services.contact.abstract import AbstractContactService
+
+
+class BaseSegmentOperationHandler(RequestHandler):
+    def initialize(self, contact_service: AbstractContactService):
+        self.service = contact_service
+
+
+class SegmentMembersHandler(BaseSegmentOperationHandler):
+    _schemas = {"post": segment_members_schema}
+
+    @handle_errors
+    @validate_json
+    async def post(self, data: Dict, segment_id: str):
+        if "contact_ids" in data:
+            selection = {"contact_ids": data["contact_ids"]}
+        else:
+            selection = {"id_range": (data["from_id"], data["to_id"])}
+
+        if data["action"] == "add":
+            affected = await self.service.add_contacts_to_segment(
+                int(segment_id), **selection
+            )
+        else:
+            affected = await self.service.remove_contacts_from_segment(
+                int(segment_id), **selection
+            )
+
+        self.write({"affected": affected})
+
+
+class SegmentBuildHandler(BaseSegmentOperationHandler):
+    _schemas = {"post": segment_build_schema}
+
+    @handle_errors
+    @validate_json
+    async def post(self, data: Dict, segment_id: str):
+        added = await self.service.build_segment(
+            int(segment_id), data["operation"], data["segment_ids"], data["replace"]
+        )
+        self.write({"added": added})
+
+
+class SegmentCopyHandler(BaseSegmentOperationHandler):
+    _schemas = {"post": segment_copy_schema}
+
+    @handle_errors
+    @validate_json
+    async def post(self, data: Dict, segment_id: str):
+        segment = await self.service.copy_segment(int(segment_id), data["name"])
+        self.set_status(201)
+        self.write(segment)
+
+
+class SegmentRuleHandler(BaseSegmentOperationHandler):
+    _schemas = {"put": segment_rule_update_schema}
+
+    @handle_errors
+    @validate_json
+    async def put(self, data: Dict, segment_id: str):
+        await self.service.set_segment_rule(int(segment_id), data["rule"])
+        self.write(data)
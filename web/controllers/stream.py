@@ -0,0 +1,155 @@
+import csv
+from json import JSONDecodeError, loads
+from typing import Dict, List, Optional
+
+from voluptuous import Invalid
+
+from common.exceptions import UnsupportedFormatError, ValidationError
+from common.stream import LineStream
+from web.schemas import contact_import_schema
+from web.services.contact.abstract import AbstractContactService
+
+
+class ContactImportStream(LineStream):
+    """Validates and imports contacts from CSV or NDJSON lines as they arrive.
+
+    CSV starts with a header line naming the columns, quoted fields may span
+    lines. NDJSON has a single contact object per line. Invalid rows are
+    skipped and reported (the first max_errors of them), valid ones are
+    imported in chunks of chunk_size.
+    """
+
+    formats = {"text/csv": "csv", "application/x-ndjson": "ndjson"}
+
+    def __init__(
+        self,
+        contact_service: AbstractContactService,
+        content_type: str,
+        segment_id: Optional[int] = None,
+        chunk_size: int = 1000,
+        max_line_size: int = 65536,
+        max_errors: int = 100,
+    ):
+        if content_type not in self.formats:
+            raise UnsupportedFormatError(f"Can't import contacts from {content_type}")
+
+        super().__init__(max_line_size)
+        self._contact_service = contact_service
+        self._format = self.formats[content_type]
+        self._segment_id = segment_id
+        self._chunk_size = chunk_size
+        self._max_errors = max_errors
+
+        # CSV record with a quoted field continuing on the next line
+        self._record = ""
+        self._record_line = 0
+        self._columns: Optional[List[str]] = None
+        self._contacts: List[Dict] = []
+        self.imported = 0
+        self.rejected = 0
+        self.errors: List[Dict] = []
+
+    def report(self) -> Dict:
+        return {
+            "imported": self.imported,
+            "rejected": self.rejected,
+            "errors": self.errors,
+        }
+
+    async def close(self):
+        await super().close()
+
+        if self._record:
+            self._reject("unterminated quoted field", self._record_line)
+            self._record = ""
+
+        await self._flush()
+
+    async def _process_line(self, line: bytes):
+        try:
+            text = line.decode("utf-8-sig" if self._line_number == 1 else "utf-8")
+        except UnicodeDecodeError as e:
+            self._reject(repr(e), self._record_line if self._record else None)
+            self._record = ""
+            return
+
+        if self._format == "csv":
+            text = self._continue_record(text)
+
+            if text is None:
+                return
+
+        if not text.strip():
+            return
+
+        try:
+            if self._format == "csv":
+                contact = self._parse_csv(text)
+
+                if contact is None:
+                    return
+            else:
+                contact = loads(text)
+
+            self._contacts.append(contact_import_schema(contact))
+        except Invalid as e:
+            self._reject(str(e), self._record_line)
+        except JSONDecodeError as e:
+            self._reject(repr(e))
+
+        if len(self._contacts) >= self._chunk_size:
+            await self._flush()
+
+    def _continue_record(self, text: str) -> Optional[str]:
+        if self._record:
+            text = f"{self._record}\n{text}"
+        else:
+            self._record_line = self._line_number
+
+        # quotes inside quoted fields are doubled, so an odd count of them
+        # means the last field goes on in the next line
+        if text.count('"') % 2 == 0:
+            self._record = ""
+            return text
+
+        if len(text) > self._max_line_size:
+            raise ValidationError(
+                f"Record on line {self._record_line} exceeds "
+                f"{self._max_line_size} bytes"
+            )
+
+        self._record = text
+        return None
+
+    def _parse_csv(self, text: str) -> Optional[Dict]:
+        values = next(csv.reader([text.rstrip("\r")]))
+
+        if self._columns is None:
+            self._columns = [column.strip().lower() for column in values]
+
+            if not {"name", "email"}.issubset(self._columns):
+                raise ValidationError("CSV header has to name name and email columns")
+
+            return None
+
+        if len(values) != len(self._columns):
+            raise Invalid(f"expected {len(self._columns)} values, found {len(values)}")
+
+        return dict(zip(self._columns, values))
+
+    def _reject(self, error: str, line_number: Optional[int] = None):
+        self.rejected += 1
+
+        if len(self.errors) < self._max_errors:
+            self.errors.append(
+                {"line": line_number or self._line_number, "error": error}
+            )
+
+    async def _flush(self):
+        if not self._contacts:
+            return
+
+        contacts, self._contacts = self._contacts, []
+        self.imported += await self._contact_service.import_contacts(
+            contacts, self._segment_id
+        )
@@ -6,6 +6,8 @@ from typing import Callable
 
 from voluptuous import Invalid
 
+from common.exceptions import OverloadedError
+
 
 def handle_errors(func: Callable):
     @wraps(func)
@@ -18,6 +20,10 @@ def handle_errors(func: Callable):
             )
             self.set_status(HTTPStatus.BAD_REQUEST)
             self.write(self.loader.load("error.html").generate(error=str(e)))
+        except OverloadedError as e:
+            self.set_status(HTTPStatus.SERVICE_UNAVAILABLE)
+            self.set_header("Retry-After", e.retry_after)
+            self.write(self.loader.load("error.html").generate(error=str(e)))
         except Exception:
             logging.error(
                 f"Error occured when handling {self.__class__.__name__}.{func.__name__}: {traceback.format_exc()}"
@@ -1,18 +1,20 @@
 from typing import Dict, Optional
+from urllib.parse import urlencode
 
 
-def create_pagination_context(current_page: int, total_pages: int) -> Optional[Dict]:
-    if total_pages < 2:
+def create_pagination_context(
+    page: Dict, total_pages: Optional[int] = None, filters: Optional[Dict] = None
+) -> Optional[Dict]:
+    if page["prev"] is None and page["next"] is None:
         return None
 
-    next_pages = list(range(current_page + 1, min(current_page + 3, total_pages + 1)))
-    prev_pages = list(range(max(current_page - 2, 1), current_page))
+    # query arguments kept by page links, cursor is appended to them
+    filters = {key: value for key, value in (filters or {}).items() if value}
+    query = f"?{urlencode(filters)}&" if filters else "?"
 
     return {
-        "prev": prev_pages,
-        "first": current_page != 1 and 1 not in prev_pages,
-        "next": next_pages,
-        "current": current_page,
-        "last": current_page != total_pages and total_pages not in next_pages,
+        "prev": page["prev"],
+        "next": page["next"],
         "total": total_pages,
+        "query": query,
     }
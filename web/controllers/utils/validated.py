@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Optional, Tuple
 
 from tornado.web import RequestHandler
 from voluptuous import Schema
@@ -20,10 +20,11 @@ class ValidatedFormRequestHandler(RequestHandler):
 
         return schema(data)
 
-    def _get_page(self) -> int:
-        page = int(self.get_query_argument("page", "1"))
+    def _get_cursor(self) -> Tuple[Optional[int], Optional[int]]:
+        after = self.get_query_argument("after", None)
+        before = self.get_query_argument("before", None)
 
-        if page < 1:
-            page = 1
-
-        return page
+        return (
+            int(after) if after else None,
+            int(before) if before and not after else None,
+        )
@@ -0,0 +1,122 @@
+import json
+import traceback
+from abc import ABC, abstractmethod
+from asyncio import CancelledError, sleep
+from copy import deepcopy
+from logging import getLogger
+from time import monotonic
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from aiopg.sa import Engine
+
+logger = getLogger(__name__)
+
+
+class RepositoryCache:
+    """In-process cache of repository reads, expiring after ttl seconds.
+
+    Entries are grouped in namespaces, so writes can drop a single entry or
+    every cached read of the same kind (like all pages of a list).
+    """
+
+    def __init__(self, ttl: float = 60):
+        self._ttl = ttl
+        self._entries: Dict[str, Dict[Hashable, Tuple[float, object]]] = {}
+
+    async def get_or_load(
+        self, namespace: str, key: Hashable, loader: Callable[[], Awaitable]
+    ):
+        entries = self._entries.setdefault(namespace, {})
+        entry = entries.get(key)
+
+        if entry is None or entry[0] < monotonic():
+            value = await loader()
+            entries[key] = (monotonic() + self._ttl, value)
+        else:
+            value = entry[1]
+
+        # callers are free to modify what they get
+        return deepcopy(value)
+
+    def invalidate(self, namespace: str, key: Optional[Hashable] = None):
+        if key is None:
+            self._entries.pop(namespace, None)
+        else:
+            self._entries.get(namespace, {}).pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class AbstractCacheInvalidator(ABC):
+    @abstractmethod
+    async def invalidate(self, namespace: str, key: Optional[Hashable] = None):
+        pass
+
+
+class LocalCacheInvalidator(AbstractCacheInvalidator):
+    def __init__(self, cache: RepositoryCache):
+        self._cache = cache
+
+    async def invalidate(self, namespace: str, key: Optional[Hashable] = None):
+        self._cache.invalidate(namespace, key)
+
+
+class PostgresCacheInvalidator(AbstractCacheInvalidator):
+    """Broadcasts cache invalidations to all web processes with NOTIFY.
+
+    Every process listens on the channel with a dedicated connection and drops
+    notified entries from its own cache, including the process that sent them.
+    Notifications sent while the listening connection was down are lost, so
+    the whole cache is cleared after reconnecting.
+    """
+
+    def __init__(
+        self,
+        db_engine: Engine,
+        cache: RepositoryCache,
+        channel: str = "cache_invalidation",
+        reconnect_interval: float = 5,
+    ):
+        self._db_engine = db_engine
+        self._cache = cache
+        self._channel = channel
+        self._reconnect_interval = reconnect_interval
+
+    async def invalidate(self, namespace: str, key: Optional[Hashable] = None):
+        self._cache.invalidate(namespace, key)
+
+        async with self._db_engine.acquire() as conn:
+            await conn.execute(
+                "SELECT pg_notify(%s, %s)",
+                self._channel,
+                json.dumps({"namespace": namespace, "key": key}),
+            )
+
+    async def listen(self):
+        while True:
+            try:
+                async with self._db_engine.acquire() as conn:
+                    await conn.execute(f'LISTEN "{self._channel}"')
+                    self._cache.clear()
+
+                    while True:
+                        notification = await conn.connection.notifies.get()
+                        self._apply(notification.payload)
+            except CancelledError:
+                raise
+            except Exception:
+                logger.error(
+                    f"Cache invalidation listener failed: {traceback.format_exc()}"
+                )
+                self._cache.clear()
+                await sleep(self._reconnect_interval)
+
+    def _apply(self, payload: str):
+        invalidation = json.loads(payload)
+        key = invalidation["key"]
+
+        # keys are tuples or plain values, JSON turns tuples to lists
+        self._cache.invalidate(
+            invalidation["namespace"], tuple(key) if isinstance(key, list) else key
+        )
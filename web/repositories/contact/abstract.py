@@ -1,5 +1,7 @@
 from abc import abstractmethod, ABC
-from typing import List, Dict, Tuple
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+
+from common.enums import SegmentOperation
 
 
 class AbstractContactRepository(ABC):
@@ -14,7 +16,26 @@ class AbstractContactRepository(ABC):
         pass
 
     @abstractmethod
-    async def read_contacts(self, page: int, per_page: int) -> List[Dict]:
+    async def read_contacts(
+        self,
+        per_page: int = 50,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> List[Dict]:
+        pass
+
+    @abstractmethod
+    async def search_contacts(self, text: str, limit: int) -> List[Dict]:
+        pass
+
+    @abstractmethod
+    async def upsert_contacts(
+        self, contacts: List[Dict], segment_id: Optional[int] = None
+    ) -> int:
+        pass
+
+    @abstractmethod
+    def iterate_contacts(self, page_size: int) -> AsyncIterator[List[Dict]]:
         pass
 
     @abstractmethod
@@ -34,11 +55,20 @@ class AbstractContactRepository(ABC):
         pass
 
     @abstractmethod
-    async def get_segment(self, segment_id: int) -> Dict:
+    async def get_segment(self, segment_id: int) -> Optional[Dict]:
+        pass
+
+    @abstractmethod
+    async def read_segments(
+        self,
+        per_page: Optional[int] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> List[Dict]:
         pass
 
     @abstractmethod
-    async def read_segments(self, page: int, per_page: int) -> List[Dict]:
+    async def search_segments(self, text: str, limit: int) -> List[Dict]:
         pass
 
     @abstractmethod
@@ -54,7 +84,23 @@ class AbstractContactRepository(ABC):
         pass
 
     @abstractmethod
-    async def list_contacts_in_segment(self, segment_id: int):
+    async def list_contacts_in_segment(
+        self,
+        segment_id: int,
+        per_page: Optional[int] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> List[Dict]:
+        pass
+
+    @abstractmethod
+    async def get_segment_contacts_count(self, segment_id: int) -> int:
+        pass
+
+    @abstractmethod
+    def iterate_segment_contacts(
+        self, segment_id: int, page_size: int
+    ) -> AsyncIterator[List[Dict]]:
         pass
 
     @abstractmethod
@@ -64,3 +110,35 @@ class AbstractContactRepository(ABC):
     @abstractmethod
     async def remove_contact_from_segment(self, segment_id: int, contact_id: int):
         pass
+
+    @abstractmethod
+    async def add_contacts_to_segment(
+        self,
+        segment_id: int,
+        contact_ids: Optional[List[int]] = None,
+        id_range: Optional[Tuple[int, int]] = None,
+    ) -> int:
+        pass
+
+    @abstractmethod
+    async def remove_contacts_from_segment(
+        self,
+        segment_id: int,
+        contact_ids: Optional[List[int]] = None,
+        id_range: Optional[Tuple[int, int]] = None,
+    ) -> int:
+        pass
+
+    @abstractmethod
+    async def combine_segments(
+        self,
+        operation: SegmentOperation,
+        source_ids: List[int],
+        target_id: int,
+        replace: bool = False,
+    ) -> int:
+        pass
+
+    @abstractmethod
+    async def copy_segment(self, segment_id: int, name: str) -> Dict:
+        pass
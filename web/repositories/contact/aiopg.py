@@ -1,19 +1,135 @@
-from typing import List, Tuple, Dict, Optional
+from typing import AsyncIterator, List, Tuple, Dict, Optional
 
-from aiopg.sa import Engine
-from sqlalchemy import select, join, and_, func
+from aiopg.sa import Engine, SAConnection
+from sqlalchemy import (
+    Integer,
+    and_,
+    any_,
+    bindparam,
+    exists,
+    func,
+    join,
+    literal,
+    not_,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.sql import ColumnElement, Select
 
+from common.enums import SegmentOperation
 from web.repositories.contact.abstract import AbstractContactRepository
+from web.repositories.sqlalchemy.cursor import iterate_dicts_with_cursor
+from web.repositories.sqlalchemy.pagination import (
+    build_keyset_pages,
+    paginate_by_key,
+    reverse_if_before,
+    select_keyset_page,
+)
+from web.repositories.sqlalchemy.rules import (
+    compile_membership,
+    compile_segment_rule,
+    load_segment_rules,
+)
+from web.repositories.sqlalchemy.search import search_by_similarity
+from web.repositories.sqlalchemy.statements import CompiledStatementCache
 from web.repositories.sqlalchemy.tables import (
     contact_table,
     segment_table,
     segment_contact_table,
+    row_counter_table,
 )
 
 
 class SimplePostgresContactRepository(AbstractContactRepository):
-    def __init__(self, db_engine: Engine):
+    """Contact repository reading row counts from the row_counter table.
+
+    Counters are kept by statement level triggers (see migration 0012). With
+    estimate_counts contacts and segments are counted from planner statistics
+    instead, which are only as fresh as the last ANALYZE.
+
+    Members of segments with a rule have no segment_contact rows, reads of
+    them compile the rule into the query instead.
+    """
+
+    segment_contact_columns = [
+        contact_table.c.id,
+        contact_table.c.name,
+        contact_table.c.email,
+        contact_table.c.first_name,
+        contact_table.c.last_name,
+    ]
+
+    # contacts with emails already stored are updated; rows are deduplicated by
+    # the caller, as one statement can't update the same row twice
+    upsert_contacts_query = """
+        WITH imported AS (
+          INSERT INTO contact (name, email, first_name, last_name)
+          SELECT * FROM unnest(
+            %(names)s::varchar[],
+            %(emails)s::varchar[],
+            %(first_names)s::varchar[],
+            %(last_names)s::varchar[]
+          )
+          ON CONFLICT (email) DO UPDATE
+          SET name = excluded.name,
+            first_name = excluded.first_name,
+            last_name = excluded.last_name
+          RETURNING id
+        ), attached AS (
+          INSERT INTO segment_contact (contact_id, segment_id)
+          SELECT id, %(segment_id)s FROM imported
+          WHERE %(segment_id)s IS NOT NULL
+          ON CONFLICT DO NOTHING
+        )
+        SELECT count(*) FROM imported
+    """
+
+    estimate_query = text(
+        "SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"
+    )
+
+    # statements of the frequent reads are built once and compiled on first use
+    contact_query = contact_table.select(contact_table.c.id == bindparam("contact_id"))
+    contact_segments_query = select(
+        [segment_table.c.id, segment_table.c.name],
+        segment_contact_table.c.contact_id == bindparam("contact_id"),
+    ).select_from(
+        join(
+            segment_table,
+            segment_contact_table,
+            segment_table.c.id == segment_contact_table.c.segment_id,
+        )
+    )
+    contacts_pages = build_keyset_pages(contact_table.select(), contact_table.c.id)
+    segment_query = segment_table.select(segment_table.c.id == bindparam("segment_id"))
+    segments_pages = build_keyset_pages(
+        select([segment_table.c.id, segment_table.c.name]), segment_table.c.id
+    )
+    segment_contacts_pages = build_keyset_pages(
+        select(
+            [contact_table.c.id, contact_table.c.name, contact_table.c.email],
+            segment_contact_table.c.segment_id == bindparam("segment_id"),
+        ).select_from(
+            join(
+                contact_table,
+                segment_contact_table,
+                contact_table.c.id == segment_contact_table.c.contact_id,
+            )
+        ),
+        segment_contact_table.c.contact_id,
+    )
+    counter_query = select([row_counter_table.c.count]).where(
+        and_(
+            row_counter_table.c.table_name == bindparam("table_name"),
+            row_counter_table.c.key == bindparam("key"),
+        )
+    )
+
+    def __init__(self, db_engine: Engine, estimate_counts: bool = False):
         self._db_engine = db_engine
+        self._estimate_counts = estimate_counts
+        self._statements = CompiledStatementCache(db_engine)
 
     async def create_contact(self, contact: Dict):
         async with self._db_engine.acquire() as conn:
@@ -25,34 +141,74 @@ class SimplePostgresContactRepository(AbstractContactRepository):
         self, contact_id: int
     ) -> Tuple[Dict, List[Dict]]:
         async with self._db_engine.acquire() as conn:
-            contact_result = await conn.execute(
-                contact_table.select(contact_table.c.id == contact_id)
+            contact_result = await self._statements.execute(
+                conn, self.contact_query, contact_id=contact_id
             )
             contact = dict(await contact_result.fetchone())
-            segments = await conn.execute(
-                select(
-                    [segment_table.c.id, segment_table.c.name],
-                    segment_contact_table.c.contact_id == contact_id,
-                ).select_from(
-                    join(
-                        segment_table,
-                        segment_contact_table,
-                        segment_table.c.id == segment_contact_table.c.segment_id,
-                    )
-                )
+            segments = await self._statements.execute(
+                conn, self.contact_segments_query, contact_id=contact_id
             )
 
             return contact, list(map(dict, await segments.fetchall()))
 
-    async def read_contacts(self, page: int = 0, per_page: int = 50) -> List[Dict]:
+    async def read_contacts(
+        self,
+        per_page: int = 50,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> List[Dict]:
+        async with self._db_engine.acquire() as conn:
+            query, params = select_keyset_page(
+                self.contacts_pages, per_page, after, before
+            )
+            contacts = await self._statements.execute(conn, query, **params)
+            return reverse_if_before(
+                [dict(contact) for contact in await contacts.fetchall()], before
+            )
+
+    async def search_contacts(self, text: str, limit: int) -> List[Dict]:
         async with self._db_engine.acquire() as conn:
             contacts = await conn.execute(
-                contact_table.select()
-                .offset(per_page * page)
-                .limit(per_page)
-                .order_by(contact_table.c.id)
+                search_by_similarity(
+                    select(
+                        [
+                            contact_table.c.id,
+                            contact_table.c.name,
+                            contact_table.c.email,
+                        ]
+                    ),
+                    [contact_table.c.name, contact_table.c.email],
+                    text,
+                    limit,
+                )
+            )
+            return list(map(dict, await contacts.fetchall()))
+
+    async def upsert_contacts(
+        self, contacts: List[Dict], segment_id: Optional[int] = None
+    ) -> int:
+        contacts = list({contact["email"]: contact for contact in contacts}.values())
+
+        async with self._db_engine.acquire() as conn:
+            result = await conn.execute(
+                self.upsert_contacts_query,
+                {
+                    "names": [contact["name"] for contact in contacts],
+                    "emails": [contact["email"] for contact in contacts],
+                    "first_names": [contact["first_name"] for contact in contacts],
+                    "last_names": [contact["last_name"] for contact in contacts],
+                    "segment_id": segment_id,
+                },
             )
-            return [dict(contact) for contact in await contacts.fetchall()]
+            return await result.scalar()
+
+    def iterate_contacts(self, page_size: int) -> AsyncIterator[List[Dict]]:
+        return iterate_dicts_with_cursor(
+            self._db_engine,
+            contact_table.select().order_by(contact_table.c.id),
+            page_size,
+            "contact_cursor",
+        )
 
     async def update_contact(self, contact: Dict):
         async with self._db_engine.acquire() as conn:
@@ -75,22 +231,40 @@ class SimplePostgresContactRepository(AbstractContactRepository):
             segment["id"] = await result.scalar()
         return segment
 
-    async def get_segment(self, segment_id: int) -> Dict:
+    async def get_segment(self, segment_id: int) -> Optional[Dict]:
         async with self._db_engine.acquire() as conn:
-            segment = await conn.execute(
-                segment_table.select(segment_table.c.id == segment_id)
+            result = await self._statements.execute(
+                conn, self.segment_query, segment_id=segment_id
             )
-            return dict(await segment.fetchone())
+            segment = await result.fetchone()
+            return None if segment is None else dict(segment)
 
-    async def read_segments(self, page: int, per_page: Optional[int]) -> List[Dict]:
+    async def read_segments(
+        self,
+        per_page: Optional[int] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> List[Dict]:
         async with self._db_engine.acquire() as conn:
-            query = segment_table.select()
-
-            if per_page is not None:
-                query = query.offset(per_page * page).limit(per_page)
+            query, params = select_keyset_page(
+                self.segments_pages, per_page, after, before
+            )
+            segments = await self._statements.execute(conn, query, **params)
+            return reverse_if_before(
+                [dict(segment) for segment in await segments.fetchall()], before
+            )
 
-            segments = await conn.execute(query)
-            return [dict(segment) for segment in await segments.fetchall()]
+    async def search_segments(self, text: str, limit: int) -> List[Dict]:
+        async with self._db_engine.acquire() as conn:
+            segments = await conn.execute(
+                search_by_similarity(
+                    select([segment_table.c.id, segment_table.c.name]),
+                    [segment_table.c.name],
+                    text,
+                    limit,
+                )
+            )
+            return list(map(dict, await segments.fetchall()))
 
     async def update_segment(self, segment: Dict):
         async with self._db_engine.acquire() as conn:
@@ -107,11 +281,52 @@ class SimplePostgresContactRepository(AbstractContactRepository):
                 segment_table.delete().where(segment_table.c.id == segment_id)
             )
 
-    async def list_contacts_in_segment(self, segment_id: int):
+    async def list_contacts_in_segment(
+        self,
+        segment_id: int,
+        per_page: Optional[int] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> List[Dict]:
         async with self._db_engine.acquire() as conn:
+            rules = await load_segment_rules(conn, [segment_id])
+
+            if rules[segment_id] is None:
+                query, params = select_keyset_page(
+                    self.segment_contacts_pages, per_page, after, before
+                )
+                contacts = await self._statements.execute(
+                    conn, query, segment_id=segment_id, **params
+                )
+            else:
+                contacts = await conn.execute(
+                    paginate_by_key(
+                        select(
+                            [
+                                contact_table.c.id,
+                                contact_table.c.name,
+                                contact_table.c.email,
+                            ],
+                            compile_segment_rule(rules, segment_id),
+                        ),
+                        contact_table.c.id,
+                        per_page,
+                        after,
+                        before,
+                    )
+                )
+            return reverse_if_before(list(map(dict, await contacts.fetchall())), before)
+
+    async def iterate_segment_contacts(
+        self, segment_id: int, page_size: int
+    ) -> AsyncIterator[List[Dict]]:
+        async with self._db_engine.acquire() as conn:
+            rules = await load_segment_rules(conn, [segment_id])
+
+        if rules[segment_id] is None:
             query = (
                 select(
-                    [contact_table.c.id, contact_table.c.name, contact_table.c.email],
+                    self.segment_contact_columns,
                     segment_contact_table.c.segment_id == segment_id,
                 )
                 .select_from(
@@ -121,11 +336,22 @@ class SimplePostgresContactRepository(AbstractContactRepository):
                         contact_table.c.id == segment_contact_table.c.contact_id,
                     )
                 )
-                .order_by(contact_table.c.id)
+                .order_by(segment_contact_table.c.contact_id)
             )
+        else:
+            query = select(
+                self.segment_contact_columns, compile_segment_rule(rules, segment_id)
+            ).order_by(contact_table.c.id)
 
-            contacts = await conn.execute(query)
-            return list(map(dict, await contacts.fetchall()))
+        pages = iterate_dicts_with_cursor(
+            self._db_engine, query, page_size, "segment_contact_cursor"
+        )
+
+        try:
+            async for contacts in pages:
+                yield contacts
+        finally:
+            await pages.aclose()
 
     async def add_contact_to_segment(self, segment_id: int, contact_id: int):
         async with self._db_engine.acquire() as conn:
@@ -146,16 +372,227 @@ class SimplePostgresContactRepository(AbstractContactRepository):
                 )
             )
 
-    async def get_contacts_count(self) -> int:
+    async def add_contacts_to_segment(
+        self,
+        segment_id: int,
+        contact_ids: Optional[List[int]] = None,
+        id_range: Optional[Tuple[int, int]] = None,
+    ) -> int:
         async with self._db_engine.acquire() as conn:
             result = await conn.execute(
-                select([func.count()]).select_from(contact_table)
+                insert(segment_contact_table)
+                .from_select(
+                    [
+                        segment_contact_table.c.contact_id,
+                        segment_contact_table.c.segment_id,
+                    ],
+                    select([contact_table.c.id, literal(segment_id)]).where(
+                        self._id_filter(contact_table.c.id, contact_ids, id_range)
+                    ),
+                )
+                .on_conflict_do_nothing()
             )
-            return await result.scalar()
+            return result.rowcount
 
-    async def get_segments_count(self) -> int:
+    async def remove_contacts_from_segment(
+        self,
+        segment_id: int,
+        contact_ids: Optional[List[int]] = None,
+        id_range: Optional[Tuple[int, int]] = None,
+    ) -> int:
         async with self._db_engine.acquire() as conn:
             result = await conn.execute(
-                select([func.count()]).select_from(segment_table)
+                segment_contact_table.delete().where(
+                    and_(
+                        segment_contact_table.c.segment_id == segment_id,
+                        self._id_filter(
+                            segment_contact_table.c.contact_id, contact_ids, id_range
+                        ),
+                    )
+                )
             )
-            return await result.scalar()
+            return result.rowcount
+
+    async def combine_segments(
+        self,
+        operation: SegmentOperation,
+        source_ids: List[int],
+        target_id: int,
+        replace: bool = False,
+    ) -> int:
+        async with self._db_engine.acquire() as conn:
+            async with conn.begin():
+                return await self._insert_members(
+                    conn, operation, source_ids, target_id, replace
+                )
+
+    async def copy_segment(self, segment_id: int, name: str) -> Dict:
+        async with self._db_engine.acquire() as conn:
+            # copy is never left without its members
+            async with conn.begin():
+                result = await conn.execute(segment_table.insert().values(name=name))
+                segment = {"id": await result.scalar(), "name": name}
+                segment["members"] = await self._insert_members(
+                    conn, SegmentOperation.UNION, [segment_id], segment["id"]
+                )
+        return segment
+
+    async def _insert_members(
+        self,
+        conn: SAConnection,
+        operation: SegmentOperation,
+        source_ids: List[int],
+        target_id: int,
+        replace: bool = False,
+    ) -> int:
+        rules = await load_segment_rules(conn, source_ids)
+        members = self._combined_members(operation, source_ids, rules).cte("members")
+
+        if replace:
+            await conn.execute(
+                segment_contact_table.delete().where(
+                    and_(
+                        segment_contact_table.c.segment_id == target_id,
+                        ~exists().where(
+                            members.c.contact_id == segment_contact_table.c.contact_id
+                        ),
+                    )
+                )
+            )
+
+        result = await conn.execute(
+            insert(segment_contact_table)
+            .from_select(
+                [
+                    segment_contact_table.c.contact_id,
+                    segment_contact_table.c.segment_id,
+                ],
+                select([members.c.contact_id, literal(target_id)]),
+            )
+            .on_conflict_do_nothing()
+        )
+        return result.rowcount
+
+    @staticmethod
+    def _id_filter(
+        column: ColumnElement,
+        ids: Optional[List[int]] = None,
+        id_range: Optional[Tuple[int, int]] = None,
+    ) -> ColumnElement:
+        # whole list is sent as a single array parameter
+        if ids is not None:
+            return column == any_(bindparam("ids", ids, type_=ARRAY(Integer)))
+        return column.between(*id_range)
+
+    @staticmethod
+    def _combined_members(
+        operation: SegmentOperation,
+        source_ids: List[int],
+        rules: Dict[int, Optional[Dict]],
+    ) -> Select:
+        if any(rules[source_id] is not None for source_id in source_ids):
+            return SimplePostgresContactRepository._compiled_members(
+                operation, source_ids, rules
+            )
+
+        sources = segment_contact_table.alias("sources")
+
+        if operation == SegmentOperation.DIFFERENCE:
+            first, *rest = source_ids
+            others = segment_contact_table.alias("others")
+            return select([sources.c.contact_id]).where(
+                and_(
+                    sources.c.segment_id == first,
+                    ~exists().where(
+                        and_(
+                            others.c.contact_id == sources.c.contact_id,
+                            others.c.segment_id
+                            == any_(bindparam("rest", rest, type_=ARRAY(Integer))),
+                        )
+                    ),
+                )
+            )
+
+        query = select([sources.c.contact_id]).where(
+            sources.c.segment_id
+            == any_(bindparam("sources", source_ids, type_=ARRAY(Integer)))
+        )
+
+        if operation == SegmentOperation.INTERSECTION:
+            return query.group_by(sources.c.contact_id).having(
+                func.count() == len(set(source_ids))
+            )
+
+        return query.distinct()
+
+    @staticmethod
+    def _compiled_members(
+        operation: SegmentOperation,
+        source_ids: List[int],
+        rules: Dict[int, Optional[Dict]],
+    ) -> Select:
+        if operation == SegmentOperation.DIFFERENCE:
+            first, *rest = source_ids
+            condition = compile_segment_rule(rules, first)
+
+            if rest:
+                condition = and_(condition, not_(compile_membership(rules, rest)))
+        elif operation == SegmentOperation.INTERSECTION:
+            condition = and_(
+                *(
+                    compile_segment_rule(rules, source_id)
+                    for source_id in set(source_ids)
+                )
+            )
+        else:
+            condition = compile_membership(rules, source_ids)
+
+        return select([contact_table.c.id.label("contact_id")], condition)
+
+    async def get_contacts_count(self) -> int:
+        return await self._count_rows(contact_table.name)
+
+    async def get_segments_count(self) -> int:
+        return await self._count_rows(segment_table.name)
+
+    async def get_segment_contacts_count(self, segment_id: int) -> int:
+        async with self._db_engine.acquire() as conn:
+            rules = await load_segment_rules(conn, [segment_id])
+
+            if rules[segment_id] is not None:
+                result = await conn.execute(
+                    select([func.count()])
+                    .select_from(contact_table)
+                    .where(compile_segment_rule(rules, segment_id))
+                )
+                return await result.scalar()
+
+            # segments without members have no counter
+            return (
+                await self._read_counter(conn, segment_contact_table.name, segment_id)
+                or 0
+            )
+
+    async def _count_rows(self, table_name: str) -> int:
+        async with self._db_engine.acquire() as conn:
+            count = None
+
+            if not self._estimate_counts:
+                count = await self._read_counter(conn, table_name)
+
+            if count is None:
+                result = await conn.execute(
+                    self.estimate_query.bindparams(table=table_name)
+                )
+                # tables never analyzed have negative estimates
+                count = max(await result.scalar() or 0, 0)
+
+            return count
+
+    async def _read_counter(
+        self, conn: SAConnection, table_name: str, key: int = 0
+    ) -> Optional[int]:
+        result = await self._statements.execute(
+            conn, self.counter_query, table_name=table_name, key=key
+        )
+        return await result.scalar()
@@ -0,0 +1,163 @@
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from common.enums import SegmentOperation
+from web.repositories.cache import AbstractCacheInvalidator, RepositoryCache
+from web.repositories.contact.abstract import AbstractContactRepository
+
+
+class CachedContactRepository(AbstractContactRepository):
+    """Contact repository caching segments, listed in every campaign form."""
+
+    def __init__(
+        self,
+        contact_repository: AbstractContactRepository,
+        cache: RepositoryCache,
+        invalidator: AbstractCacheInvalidator,
+    ):
+        self._contact_repository = contact_repository
+        self._cache = cache
+        self._invalidator = invalidator
+
+    async def create_contact(self, contact: Dict):
+        return await self._contact_repository.create_contact(contact)
+
+    async def get_contact_with_segments(
+        self, contact_id: int
+    ) -> Tuple[Dict, List[Dict]]:
+        return await self._contact_repository.get_contact_with_segments(contact_id)
+
+    async def read_contacts(
+        self,
+        per_page: int = 50,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> List[Dict]:
+        return await self._contact_repository.read_contacts(per_page, after, before)
+
+    async def search_contacts(self, text: str, limit: int) -> List[Dict]:
+        return await self._contact_repository.search_contacts(text, limit)
+
+    async def upsert_contacts(
+        self, contacts: List[Dict], segment_id: Optional[int] = None
+    ) -> int:
+        return await self._contact_repository.upsert_contacts(contacts, segment_id)
+
+    def iterate_contacts(self, page_size: int) -> AsyncIterator[List[Dict]]:
+        return self._contact_repository.iterate_contacts(page_size)
+
+    async def get_contacts_count(self) -> int:
+        return await self._contact_repository.get_contacts_count()
+
+    async def update_contact(self, contact: Dict):
+        await self._contact_repository.update_contact(contact)
+
+    async def delete_contact(self, contact_id: int):
+        await self._contact_repository.delete_contact(contact_id)
+
+    async def create_segment(self, segment: Dict):
+        segment = await self._contact_repository.create_segment(segment)
+        await self._invalidate_new_segment(segment["id"])
+        return segment
+
+    async def get_segment(self, segment_id: int) -> Optional[Dict]:
+        return await self._cache.get_or_load(
+            "segment",
+            segment_id,
+            lambda: self._contact_repository.get_segment(segment_id),
+        )
+
+    async def read_segments(
+        self,
+        per_page: Optional[int] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> List[Dict]:
+        return await self._cache.get_or_load(
+            "segments",
+            (per_page, after, before),
+            lambda: self._contact_repository.read_segments(per_page, after, before),
+        )
+
+    async def search_segments(self, text: str, limit: int) -> List[Dict]:
+        return await self._contact_repository.search_segments(text, limit)
+
+    async def get_segments_count(self) -> int:
+        return await self._contact_repository.get_segments_count()
+
+    async def update_segment(self, segment: Dict):
+        await self._contact_repository.update_segment(segment)
+        await self._invalidator.invalidate("segment", segment["id"])
+        await self._invalidator.invalidate("segments")
+
+    async def delete_segment(self, segment_id: int):
+        await self._contact_repository.delete_segment(segment_id)
+        await self._invalidator.invalidate("segment", segment_id)
+        await self._invalidator.invalidate("segments")
+
+    async def list_contacts_in_segment(
+        self,
+        segment_id: int,
+        per_page: Optional[int] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> List[Dict]:
+        return await self._contact_repository.list_contacts_in_segment(
+            segment_id, per_page, after, before
+        )
+
+    async def get_segment_contacts_count(self, segment_id: int) -> int:
+        return await self._contact_repository.get_segment_contacts_count(segment_id)
+
+    def iterate_segment_contacts(
+        self, segment_id: int, page_size: int
+    ) -> AsyncIterator[List[Dict]]:
+        return self._contact_repository.iterate_segment_contacts(segment_id, page_size)
+
+    async def add_contact_to_segment(self, segment_id: int, contact_id: int):
+        await self._contact_repository.add_contact_to_segment(segment_id, contact_id)
+
+    async def remove_contact_from_segment(self, segment_id: int, contact_id: int):
+        await self._contact_repository.remove_contact_from_segment(
+            segment_id, contact_id
+        )
+
+    async def add_contacts_to_segment(
+        self,
+        segment_id: int,
+        contact_ids: Optional[List[int]] = None,
+        id_range: Optional[Tuple[int, int]] = None,
+    ) -> int:
+        return await self._contact_repository.add_contacts_to_segment(
+            segment_id, contact_ids, id_range
+        )
+
+    async def remove_contacts_from_segment(
+        self,
+        segment_id: int,
+        contact_ids: Optional[List[int]] = None,
+        id_range: Optional[Tuple[int, int]] = None,
+    ) -> int:
+        return await self._contact_repository.remove_contacts_from_segment(
+            segment_id, contact_ids, id_range
+        )
+
+    async def combine_segments(
+        self,
+        operation: SegmentOperation,
+        source_ids: List[int],
+        target_id: int,
+        replace: bool = False,
+    ) -> int:
+        return await self._contact_repository.combine_segments(
+            operation, source_ids, target_id, replace
+        )
+
+    async def copy_segment(self, segment_id: int, name: str) -> Dict:
+        segment = await self._contact_repository.copy_segment(segment_id, name)
+        await self._invalidate_new_segment(segment["id"])
+        return segment
+
+    async def _invalidate_new_segment(self, segment_id: int):
+        await self._invalidator.invalidate("segments")
+        # the id could have been looked up before the segment existed
+        await self._invalidator.invalidate("segment", segment_id)
@@ -1,18 +1,33 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import AsyncIterator, Dict, List, Optional, Sequence
 
 
 class AbstractJobRepository(ABC):
     @abstractmethod
-    async def create_email_request(self, segment_id: int, template_id: int, name: str):
+    async def create_email_request(
+        self,
+        segment_id: int,
+        template_id: int,
+        name: str,
+        include_segment_ids: Sequence[int] = (),
+        exclude_segment_ids: Sequence[int] = (),
+        exclude_template_id: Optional[int] = None,
+    ):
         pass
 
     @abstractmethod
-    async def get_email_request_job_data(self, email_request_id: int) -> List[Dict]:
+    def iterate_email_request_job_data(
+        self, email_request_id: int, page_size: int
+    ) -> AsyncIterator[List[Dict]]:
         pass
 
     @abstractmethod
-    async def get_email_requests(self) -> List[Dict]:
+    async def get_email_requests(
+        self,
+        per_page: Optional[int] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> List[Dict]:
         pass
 
     @abstractmethod
@@ -21,10 +36,25 @@ class AbstractJobRepository(ABC):
 
     @abstractmethod
     async def get_email_requests_job_statuses(
-        self, email_request_id: int
+        self,
+        email_request_id: int,
+        per_page: Optional[int] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+        status: Optional[str] = None,
     ) -> List[Dict]:
         pass
 
+    @abstractmethod
+    def iterate_email_request_job_statuses(
+        self, email_request_id: int, page_size: int, status: Optional[str] = None
+    ) -> AsyncIterator[List[Dict]]:
+        pass
+
+    @abstractmethod
+    async def get_email_request_status_counts(self, email_request_id: int) -> Dict:
+        pass
+
     @abstractmethod
     async def update_job_statuses(self, statuses: Dict):
         pass
@@ -1,12 +1,34 @@
-from itertools import chain
-from typing import Dict, List
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
 from aiopg.sa import Engine
 from aiopg.sa.result import RowProxy
-from sqlalchemy import select, join, literal, case
+from sqlalchemy import (
+    Integer,
+    and_,
+    any_,
+    bindparam,
+    exists,
+    join,
+    literal,
+    not_,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql import Select
 
 from common.enums import EmailResult
 from web.repositories.jobs.abstract import AbstractJobRepository
+from web.repositories.sqlalchemy.cursor import (
+    iterate_dicts_with_cursor,
+    iterate_with_cursor,
+)
+from web.repositories.sqlalchemy.pagination import (
+    build_keyset_pages,
+    reverse_if_before,
+    select_keyset_page,
+)
+from web.repositories.sqlalchemy.rules import compile_membership, load_segment_rules
+from web.repositories.sqlalchemy.statements import CompiledStatementCache
 from web.repositories.sqlalchemy.tables import (
     email_request_table,
     job_table,
@@ -14,14 +36,120 @@ from web.repositories.sqlalchemy.tables import (
     contact_table,
     email_template_table,
     segment_table,
+    email_request_status_table,
 )
 
+excluded_template_table = email_template_table.alias("excluded_template")
+
 
 class SimplePostgresJobRepository(AbstractJobRepository):
-    def __init__(self, db_engine: Engine):
+    # rows already in the reported state are skipped, so repeated reports don't
+    # produce dead tuples; campaign summaries get the net change of each status.
+    # Replaced statuses are read from rows locked first (latest committed
+    # version), so concurrent reports of a job can't both move the same status
+    update_job_statuses_query = """
+        WITH previous AS (
+          SELECT id, status FROM job
+          WHERE id = ANY(%(ids)s::integer[])
+          ORDER BY id
+          FOR UPDATE
+        ), changed AS (
+          UPDATE job
+          SET status = updates.status, message_id = updates.message_id
+          FROM unnest(
+            %(ids)s::integer[], %(statuses)s::varchar[], %(message_ids)s::varchar[]
+          ) AS updates (id, status, message_id), previous
+          WHERE job.id = updates.id
+            AND previous.id = updates.id
+            AND (job.status, job.message_id)
+              IS DISTINCT FROM (updates.status, updates.message_id)
+          RETURNING job.request_id, job.status, previous.status AS previous_status
+        )
+        INSERT INTO email_request_status (request_id, status, count)
+        SELECT request_id, status, sum(delta)
+        FROM (
+          SELECT request_id, status, 1 AS delta FROM changed
+          UNION ALL
+          SELECT request_id, previous_status, -1 FROM changed
+        ) AS moves
+        GROUP BY request_id, status
+        HAVING sum(delta) <> 0
+        ON CONFLICT (request_id, status)
+        DO UPDATE SET count = email_request_status.count + excluded.count
+    """
+
+    # statements of the frequent reads are built once and compiled on first use
+    email_requests_pages = build_keyset_pages(
+        select([email_request_table.c.id, email_request_table.c.name]),
+        email_request_table.c.id,
+    )
+    email_request_query = select(
+        [
+            email_request_table.c.id,
+            email_request_table.c.name,
+            email_request_table.c.template_id,
+            email_template_table.c.name,
+            email_request_table.c.segment_id,
+            segment_table.c.name,
+            email_request_table.c.include_segment_ids,
+            email_request_table.c.exclude_segment_ids,
+            excluded_template_table.c.id,
+            excluded_template_table.c.name,
+        ],
+        email_request_table.c.id == bindparam("request_id"),
+        use_labels=True,
+    ).select_from(
+        join(
+            join(
+                email_request_table,
+                email_template_table,
+                email_template_table.c.id == email_request_table.c.template_id,
+            ),
+            segment_table,
+            email_request_table.c.segment_id == segment_table.c.id,
+        ).outerjoin(
+            excluded_template_table,
+            excluded_template_table.c.id == email_request_table.c.exclude_template_id,
+        )
+    )
+    segment_names_query = select([segment_table.c.id, segment_table.c.name]).where(
+        segment_table.c.id == any_(bindparam("ids", type_=ARRAY(Integer)))
+    )
+    job_statuses_query = select(
+        [job_table.c.id, job_table.c.status, contact_table.c.name, contact_table.c.id],
+        job_table.c.request_id == bindparam("request_id"),
+        use_labels=True,
+    ).select_from(
+        join(job_table, contact_table, job_table.c.contact_id == contact_table.c.id)
+    )
+    job_statuses_pages = build_keyset_pages(job_statuses_query, job_table.c.id)
+    filtered_job_statuses_pages = build_keyset_pages(
+        job_statuses_query.where(job_table.c.status == bindparam("status")),
+        job_table.c.id,
+    )
+    status_counts_query = select(
+        [email_request_status_table.c.status, email_request_status_table.c.count],
+        email_request_status_table.c.request_id == bindparam("request_id"),
+    )
+    template_query = email_template_table.select(
+        email_template_table.c.id == bindparam("template_id")
+    )
+    templates_query = select([email_template_table.c.id, email_template_table.c.name])
+
+    def __init__(self, db_engine: Engine, status_update_chunk_size: int = 5000):
         self._db_engine = db_engine
+        self._status_update_chunk_size = status_update_chunk_size
+        self._statements = CompiledStatementCache(db_engine)
 
-    async def create_email_request(self, segment_id: int, template_id: int, name: str):
+    async def create_email_request(
+        self,
+        segment_id: int,
+        template_id: int,
+        name: str,
+        include_segment_ids: Sequence[int] = (),
+        exclude_segment_ids: Sequence[int] = (),
+        exclude_template_id: Optional[int] = None,
+    ):
         async with self._db_engine.acquire() as conn:
             async with conn.begin():
                 result = await conn.execute(
@@ -31,28 +159,41 @@ class SimplePostgresJobRepository(AbstractJobRepository):
                             "name": name,
                             "template_id": template_id,
                             "segment_id": segment_id,
+                            "include_segment_ids": list(include_segment_ids),
+                            "exclude_segment_ids": list(exclude_segment_ids),
+                            "exclude_template_id": exclude_template_id,
                         }
                     )
                     .returning(email_request_table.c.id)
                 )
                 request_id = await result.scalar()
 
-                await conn.execute(
+                segment_ids = [segment_id, *include_segment_ids]
+                rules = await load_segment_rules(
+                    conn, [*segment_ids, *exclude_segment_ids]
+                )
+
+                jobs = await conn.execute(
                     job_table.insert().from_select(
                         [
+                            job_table.c.contact_id,
                             job_table.c.request_id,
                             job_table.c.status,
-                            job_table.c.contact_id,
                         ],
-                        select(
-                            [
-                                literal(request_id),
-                                literal(EmailResult.PENDING.value),
-                                segment_contact_table.c.contact_id,
-                            ],
-                            segment_contact_table.c.segment_id == segment_id,
-                            segment_contact_table,
-                        ),
+                        self._recipients_query(
+                            rules, segment_ids, exclude_segment_ids, exclude_template_id
+                        )
+                        .column(literal(request_id))
+                        .column(literal(EmailResult.PENDING.value)),
+                    )
+                )
+                await conn.execute(
+                    email_request_status_table.insert().values(
+                        {
+                            "request_id": request_id,
+                            "status": EmailResult.PENDING.value,
+                            "count": jobs.rowcount,
+                        }
                     )
                 )
         return {
@@ -60,137 +201,245 @@ class SimplePostgresJobRepository(AbstractJobRepository):
             "template_id": template_id,
             "id": request_id,
             "name": name,
+            "include_segment_ids": list(include_segment_ids),
+            "exclude_segment_ids": list(exclude_segment_ids),
+            "exclude_template_id": exclude_template_id,
         }
 
-    async def get_email_request_job_data(self, email_request_id: int) -> List[Dict]:
-        async with self._db_engine.acquire() as conn:
-            results = await conn.execute(
-                select(
-                    [
-                        contact_table.c.id,
-                        contact_table.c.name,
-                        contact_table.c.email,
-                        contact_table.c.first_name,
-                        contact_table.c.last_name,
-                        job_table.c.id,
-                    ],
-                    job_table.c.request_id == email_request_id,
-                    use_labels=True,
-                )
-                .select_from(
-                    join(
-                        contact_table,
-                        job_table,
+    @staticmethod
+    def _recipients_query(
+        rules: Dict[int, Optional[Dict]],
+        segment_ids: Sequence[int],
+        exclude_segment_ids: Sequence[int],
+        exclude_template_id: Optional[int],
+    ) -> Select:
+        # members of a single static segment are unique already
+        if (
+            len(segment_ids) == 1
+            and rules[segment_ids[0]] is None
+            and not exclude_segment_ids
+            and exclude_template_id is None
+        ):
+            return select(
+                [segment_contact_table.c.contact_id],
+                segment_contact_table.c.segment_id == segment_ids[0],
+            )
+
+        # every contact is selected once, however many segments it is in
+        conditions = [compile_membership(rules, segment_ids)]
+
+        if exclude_segment_ids:
+            conditions.append(not_(compile_membership(rules, exclude_segment_ids)))
+
+        if exclude_template_id is not None:
+            conditions.append(
+                ~exists().where(
+                    and_(
                         job_table.c.contact_id == contact_table.c.id,
+                        job_table.c.status == EmailResult.SUCCESS.value,
+                        job_table.c.request_id == email_request_table.c.id,
+                        email_request_table.c.template_id == exclude_template_id,
                     )
                 )
-                .order_by(job_table.c.id)
-            )
-
-            return [
-                {
-                    "id": jid,
-                    "name": name,
-                    "user_id": uid,
-                    "first_name": fname,
-                    "last_name": lname,
-                    "email": email,
-                }
-                for uid, name, email, fname, lname, jid in map(
-                    RowProxy.as_tuple, await results.fetchall()
+            )
+
+        return select([contact_table.c.id], and_(*conditions))
+
+    async def iterate_email_request_job_data(
+        self, email_request_id: int, page_size: int
+    ) -> AsyncIterator[List[Dict]]:
+        pages = iterate_with_cursor(
+            self._db_engine,
+            self._job_data_query(email_request_id),
+            page_size,
+            "job_data_cursor",
+        )
+
+        try:
+            async for rows in pages:
+                yield [self._to_job_data(row) for row in rows]
+        finally:
+            await pages.aclose()
+
+    def _job_data_query(self, email_request_id: int) -> Select:
+        return (
+            select(
+                [
+                    contact_table.c.id,
+                    contact_table.c.name,
+                    contact_table.c.email,
+                    contact_table.c.first_name,
+                    contact_table.c.last_name,
+                    job_table.c.id,
+                ],
+                job_table.c.request_id == email_request_id,
+                use_labels=True,
+            )
+            .select_from(
+                join(
+                    contact_table,
+                    job_table,
+                    job_table.c.contact_id == contact_table.c.id,
                 )
-            ]
+            )
+            .order_by(job_table.c.id)
+        )
 
-    async def get_email_requests(self) -> List[Dict]:
+    def _to_job_data(self, row: Tuple) -> Dict:
+        uid, name, email, fname, lname, jid = row
+        return {
+            "id": jid,
+            "name": name,
+            "user_id": uid,
+            "first_name": fname,
+            "last_name": lname,
+            "email": email,
+        }
+
+    async def get_email_requests(
+        self,
+        per_page: Optional[int] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> List[Dict]:
         async with self._db_engine.acquire() as conn:
-            requests = await conn.execute(
-                select([email_request_table.c.id, email_request_table.c.name])
-                .select_from(email_request_table)
-                .order_by(email_request_table.c.id)
+            query, params = select_keyset_page(
+                self.email_requests_pages, per_page, after, before
+            )
+            requests = await self._statements.execute(conn, query, **params)
+            return reverse_if_before(
+                [dict(request) for request in await requests.fetchall()], before
             )
-            return [dict(request) for request in await requests.fetchall()]
 
     async def get_email_request(self, request_id: int) -> Dict:
         async with self._db_engine.acquire() as conn:
-            requests = await conn.execute(
-                select(
-                    [
-                        email_request_table.c.id,
-                        email_request_table.c.name,
-                        email_request_table.c.template_id,
-                        email_template_table.c.name,
-                        email_request_table.c.segment_id,
-                        segment_table.c.name,
-                    ],
-                    email_request_table.c.id == request_id,
-                    use_labels=True,
-                )
-                .select_from(
-                    join(
-                        join(
-                            email_request_table,
-                            email_template_table,
-                            email_template_table.c.id
-                            == email_request_table.c.template_id,
-                        ),
-                        segment_table,
-                        email_request_table.c.segment_id == segment_table.c.id,
-                    )
-                )
-                .order_by(email_request_table.c.id)
+            requests = await self._statements.execute(
+                conn, self.email_request_query, request_id=request_id
+            )
+            (
+                rid,
+                rname,
+                tid,
+                tname,
+                sid,
+                sname,
+                include_ids,
+                exclude_ids,
+                etid,
+                etname,
+            ) = (await requests.fetchone()).as_tuple()
+
+            segments = await self._statements.execute(
+                conn, self.segment_names_query, ids=[*include_ids, *exclude_ids]
             )
-            rid, rname, tid, tname, sid, sname = (await requests.fetchone()).as_tuple()
+            names = dict(map(RowProxy.as_tuple, await segments.fetchall()))
+
             return {
                 "id": rid,
                 "name": rname,
                 "template": {"name": tname, "id": tid},
                 "segment": {"name": sname, "id": sid},
+                # segments deleted since the campaign was sent are skipped
+                "include_segments": [
+                    {"name": names[id_], "id": id_}
+                    for id_ in include_ids
+                    if id_ in names
+                ],
+                "exclude_segments": [
+                    {"name": names[id_], "id": id_}
+                    for id_ in exclude_ids
+                    if id_ in names
+                ],
+                "exclude_template": {"name": etname, "id": etid} if etid else None,
             }
 
     async def get_email_requests_job_statuses(
-        self, email_request_id: int
+        self,
+        email_request_id: int,
+        per_page: Optional[int] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+        status: Optional[str] = None,
     ) -> List[Dict]:
+        if status is None:
+            pages = self.job_statuses_pages
+        else:
+            pages = self.filtered_job_statuses_pages
+
         async with self._db_engine.acquire() as conn:
-            jobs = await conn.execute(
-                select(
-                    [
-                        job_table.c.id,
-                        job_table.c.status,
-                        contact_table.c.name,
-                        contact_table.c.id,
-                    ],
-                    job_table.c.request_id == email_request_id,
-                    use_labels=True,
-                ).select_from(
-                    join(
-                        job_table,
-                        contact_table,
-                        job_table.c.contact_id == contact_table.c.id,
+            query, params = select_keyset_page(pages, per_page, after, before)
+            jobs = await self._statements.execute(
+                conn, query, request_id=email_request_id, status=status, **params
+            )
+            return reverse_if_before(
+                [
+                    {"id": jid, "status": status, "contact": {"name": name, "id": cid}}
+                    for jid, status, name, cid in map(
+                        RowProxy.as_tuple, await jobs.fetchall()
                     )
-                )
+                ],
+                before,
             )
-            return [
-                {"id": jid, "status": status, "contact": {"name": name, "id": cid}}
-                for jid, status, name, cid in map(
-                    RowProxy.as_tuple, await jobs.fetchall()
+
+    def iterate_email_request_job_statuses(
+        self, email_request_id: int, page_size: int, status: Optional[str] = None
+    ) -> AsyncIterator[List[Dict]]:
+        query = (
+            select(
+                [
+                    job_table.c.id,
+                    job_table.c.status,
+                    job_table.c.message_id,
+                    contact_table.c.id.label("contact_id"),
+                    contact_table.c.name,
+                    contact_table.c.email,
+                ],
+                job_table.c.request_id == email_request_id,
+            )
+            .select_from(
+                join(
+                    job_table,
+                    contact_table,
+                    job_table.c.contact_id == contact_table.c.id,
                 )
-            ]
+            )
+            .order_by(job_table.c.id)
+        )
+
+        if status is not None:
+            query = query.where(job_table.c.status == status)
+
+        return iterate_dicts_with_cursor(
+            self._db_engine, query, page_size, "job_status_cursor"
+        )
+
+    async def get_email_request_status_counts(self, email_request_id: int) -> Dict:
+        async with self._db_engine.acquire() as conn:
+            counts = await self._statements.execute(
+                conn, self.status_counts_query, request_id=email_request_id
+            )
+            return dict(map(RowProxy.as_tuple, await counts.fetchall()))
 
     async def update_job_statuses(self, statuses: Dict):
-        updates = tuple(
-            (job["id"], status, job["message_id"])
+        # latest reported status of a job wins, UPDATE ... FROM would pick any
+        updates = {
+            job["id"]: (status, job["message_id"])
             for status, jobs in statuses.items()
             for job in jobs
-        )
+        }
+        job_ids = list(updates)
+
         async with self._db_engine.acquire() as conn:
-            query = f"""
-                INSERT INTO job (id, status, message_id)
-                VALUES {', '.join(['(%s, %s, %s)'] * len(updates))}
-                ON CONFLICT (ID) DO UPDATE SET
-                  status = excluded.status,
-                  message_id = excluded.message_id
-            """
-            await conn.execute(query, *chain(*updates))
+            for i in range(0, len(job_ids), self._status_update_chunk_size):
+                chunk = job_ids[i : i + self._status_update_chunk_size]
+                await conn.execute(
+                    self.update_job_statuses_query,
+                    {
+                        "ids": chunk,
+                        "statuses": [updates[job_id][0] for job_id in chunk],
+                        "message_ids": [updates[job_id][1] for job_id in chunk],
+                    },
+                )
 
     async def create_template(self, template: Dict) -> Dict:
         async with self._db_engine.acquire() as conn:
@@ -213,16 +462,12 @@ class SimplePostgresJobRepository(AbstractJobRepository):
 
     async def get_template(self, template_id: int) -> Dict:
         async with self._db_engine.acquire() as conn:
-            template = await conn.execute(
-                email_template_table.select(email_template_table.c.id == template_id)
+            template = await self._statements.execute(
+                conn, self.template_query, template_id=template_id
             )
             return dict(await template.fetchone())
 
     async def list_templates(self) -> List[Dict]:
         async with self._db_engine.acquire() as conn:
-            templates = await conn.execute(
-                select(
-                    [email_template_table.c.id, email_template_table.c.name]
-                ).select_from(email_template_table)
-            )
+            templates = await self._statements.execute(conn, self.templates_query)
             return [dict(template) for template in await templates.fetchall()]
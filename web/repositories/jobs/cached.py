@@ -0,0 +1,103 @@
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+from web.repositories.cache import AbstractCacheInvalidator, RepositoryCache
+from web.repositories.jobs.abstract import AbstractJobRepository
+
+
+class CachedJobRepository(AbstractJobRepository):
+    """Job repository caching templates, which are read on every campaign."""
+
+    def __init__(
+        self,
+        job_repository: AbstractJobRepository,
+        cache: RepositoryCache,
+        invalidator: AbstractCacheInvalidator,
+    ):
+        self._job_repository = job_repository
+        self._cache = cache
+        self._invalidator = invalidator
+
+    async def create_email_request(
+        self,
+        segment_id: int,
+        template_id: int,
+        name: str,
+        include_segment_ids: Sequence[int] = (),
+        exclude_segment_ids: Sequence[int] = (),
+        exclude_template_id: Optional[int] = None,
+    ):
+        return await self._job_repository.create_email_request(
+            segment_id,
+            template_id,
+            name,
+            include_segment_ids,
+            exclude_segment_ids,
+            exclude_template_id,
+        )
+
+    def iterate_email_request_job_data(
+        self, email_request_id: int, page_size: int
+    ) -> AsyncIterator[List[Dict]]:
+        return self._job_repository.iterate_email_request_job_data(
+            email_request_id, page_size
+        )
+
+    async def get_email_requests(
+        self,
+        per_page: Optional[int] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> List[Dict]:
+        return await self._job_repository.get_email_requests(per_page, after, before)
+
+    async def get_email_request(self, request_id: int) -> Dict:
+        return await self._job_repository.get_email_request(request_id)
+
+    async def get_email_requests_job_statuses(
+        self,
+        email_request_id: int,
+        per_page: Optional[int] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+        status: Optional[str] = None,
+    ) -> List[Dict]:
+        return await self._job_repository.get_email_requests_job_statuses(
+            email_request_id, per_page, after, before, status
+        )
+
+    def iterate_email_request_job_statuses(
+        self, email_request_id: int, page_size: int, status: Optional[str] = None
+    ) -> AsyncIterator[List[Dict]]:
+        return self._job_repository.iterate_email_request_job_statuses(
+            email_request_id, page_size, status
+        )
+
+    async def get_email_request_status_counts(self, email_request_id: int) -> Dict:
+        return await self._job_repository.get_email_request_status_counts(
+            email_request_id
+        )
+
+    async def update_job_statuses(self, statuses: Dict):
+        await self._job_repository.update_job_statuses(statuses)
+
+    async def create_template(self, template: Dict) -> Dict:
+        template = await self._job_repository.create_template(template)
+        await self._invalidator.invalidate("templates")
+        return template
+
+    async def update_template(self, template: Dict):
+        await self._job_repository.update_template(template)
+        await self._invalidator.invalidate("template", template["id"])
+        await self._invalidator.invalidate("templates")
+
+    async def get_template(self, template_id: int) -> Dict:
+        return await self._cache.get_or_load(
+            "template",
+            template_id,
+            lambda: self._job_repository.get_template(template_id),
+        )
+
+    async def list_templates(self) -> List[Dict]:
+        return await self._cache.get_or_load(
+            "templates", None, self._job_repository.list_templates
+        )
@@ -0,0 +1,116 @@
+import os
+from logging import getLogger
+from typing import List, NamedTuple
+
+from aiopg.sa import Engine
+from aiopg.sa.connection import SAConnection
+
+
+logger = getLogger(__name__)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    sql: str
+    transactional: bool
+
+
+class PostgresMigrationRunner:
+    """Applies versioned SQL migrations not recorded in schema_version yet.
+
+    Migrations are files named <version>_<name>.sql, applied in version
+    order. A file starting with the no_transaction_marker line runs its
+    statements one by one outside of a transaction, e.g. to build indexes
+    concurrently.
+    """
+
+    no_transaction_marker = "-- migration: no-transaction"
+    # any constant works, it only has to be the same for all web processes
+    lock_id = 4_518_021
+
+    def __init__(self, db_engine: Engine, migrations_dir: str):
+        self._db_engine = db_engine
+        self._migrations_dir = migrations_dir
+
+    def load_migrations(self) -> List[Migration]:
+        migrations = []
+
+        for file_name in sorted(os.listdir(self._migrations_dir)):
+            if not file_name.endswith(".sql"):
+                continue
+
+            version, _, name = file_name[: -len(".sql")].partition("_")
+
+            with open(os.path.join(self._migrations_dir, file_name)) as sql_file:
+                sql = sql_file.read()
+
+            migrations.append(
+                Migration(
+                    int(version),
+                    name,
+                    sql,
+                    not sql.startswith(self.no_transaction_marker),
+                )
+            )
+
+        return sorted(migrations, key=lambda migration: migration.version)
+
+    async def migrate(self) -> List[int]:
+        migrations = self.load_migrations()
+        applied = []
+
+        async with self._db_engine.acquire() as conn:
+            # other processes starting at the same time wait for this one
+            await conn.execute("SELECT pg_advisory_lock(%s)", self.lock_id)
+            # statement_timeout of the pool is meant for requests, not for
+            # building indexes
+            await conn.execute("SET statement_timeout = 0")
+
+            try:
+                await conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS schema_version (
+                      version INTEGER PRIMARY KEY,
+                      name VARCHAR(128) NOT NULL,
+                      applied_at TIMESTAMP NOT NULL DEFAULT now()
+                    )
+                    """
+                )
+                versions = await conn.execute("SELECT version FROM schema_version")
+                current = {row[0] for row in await versions.fetchall()}
+
+                for migration in migrations:
+                    if migration.version not in current:
+                        await self._apply(conn, migration)
+                        applied.append(migration.version)
+            finally:
+                await conn.execute("RESET statement_timeout")
+                await conn.execute("SELECT pg_advisory_unlock(%s)", self.lock_id)
+
+        return applied
+
+    async def reset(self):
+        async with self._db_engine.acquire() as conn:
+            await conn.execute("DROP SCHEMA public CASCADE")
+            await conn.execute("CREATE SCHEMA public")
+
+    async def _apply(self, conn: SAConnection, migration: Migration):
+        logger.info(f"Applying migration {migration.version} ({migration.name}).")
+
+        if migration.transactional:
+            async with conn.begin():
+                await conn.execute(migration.sql)
+                await self._record(conn, migration)
+        else:
+            for statement in migration.sql.split(";"):
+                if statement.strip():
+                    await conn.execute(statement)
+            await self._record(conn, migration)
+
+    async def _record(self, conn: SAConnection, migration: Migration):
+        await conn.execute(
+            "INSERT INTO schema_version (version, name) VALUES (%s, %s)",
+            migration.version,
+            migration.name,
+        )
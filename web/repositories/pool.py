@@ -0,0 +1,92 @@
+from asyncio import TimeoutError, wait_for
+from contextlib import asynccontextmanager
+from time import monotonic
+from typing import AsyncIterator, Dict
+
+from aiopg.sa import Engine, SAConnection
+
+from common.exceptions import OverloadedError
+
+
+class MonitoredEngine:
+    """Wraps the aiopg engine, bounding the time spent waiting for connections.
+
+    When no connection is freed within acquire_timeout, acquire fails with
+    OverloadedError instead of queueing more requests on the pool, handlers
+    respond with 503 and ask to retry after retry_after seconds. Wait times and
+    pool utilization are collected for metrics.
+    """
+
+    def __init__(self, engine: Engine, acquire_timeout: float, retry_after: int = 1):
+        self._engine = engine
+        self._acquire_timeout = acquire_timeout
+        self._retry_after = retry_after
+
+        self._waiting = 0
+        self._acquired = 0
+        self._timeouts = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    @property
+    def engine(self) -> Engine:
+        return self._engine
+
+    @property
+    def dialect(self):
+        return self._engine.dialect
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[SAConnection]:
+        conn = await self._acquire()
+
+        try:
+            yield conn
+        finally:
+            await self._engine.release(conn)
+
+    def metrics(self) -> Dict:
+        in_use = self._engine.size - self._engine.freesize
+
+        return {
+            "min_size": self._engine.minsize,
+            "max_size": self._engine.maxsize,
+            "size": self._engine.size,
+            "in_use": in_use,
+            "utilization": in_use / self._engine.maxsize,
+            "waiting": self._waiting,
+            "acquired": self._acquired,
+            "timeouts": self._timeouts,
+            "wait_time": {
+                "total": self._wait_time,
+                "max": self._max_wait_time,
+                "mean": self._wait_time / self._acquired if self._acquired else 0.0,
+            },
+        }
+
+    def close(self):
+        self._engine.close()
+
+    async def wait_closed(self):
+        await self._engine.wait_closed()
+
+    async def _acquire(self) -> SAConnection:
+        started = monotonic()
+        self._waiting += 1
+
+        try:
+            conn = await wait_for(self._engine.acquire(), self._acquire_timeout)
+        except TimeoutError:
+            self._timeouts += 1
+            raise OverloadedError(
+                "Database is overloaded, please try again later.", self._retry_after
+            )
+        finally:
+            self._waiting -= 1
+
+        waited = monotonic() - started
+        self._acquired += 1
+        self._wait_time += waited
+        self._max_wait_time = max(self._max_wait_time, waited)
+
+        return conn
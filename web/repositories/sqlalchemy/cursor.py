@@ -0,0 +1,49 @@
+from typing import AsyncIterator, Dict, List
+
+from aiopg.sa import Engine
+from aiopg.sa.result import RowProxy
+from sqlalchemy.sql import Select
+
+
+async def iterate_with_cursor(
+    db_engine: Engine, query: Select, page_size: int, name: str = "export_cursor"
+) -> AsyncIterator[List[tuple]]:
+    """Yields rows of the query in pages read from a server-side cursor.
+
+    Only a single page is held in memory at a time. The cursor is declared in a
+    transaction kept open until the iteration ends, so callers have to exhaust
+    or aclose the iterator.
+    """
+    async with db_engine.acquire() as conn:
+        # cursor lives only as long as the transaction around it
+        async with conn.begin():
+            compiled = query.compile(dialect=db_engine.dialect)
+            await conn.execute(
+                f"DECLARE {name} NO SCROLL CURSOR FOR {compiled}", compiled.params
+            )
+
+            while True:
+                results = await conn.execute(
+                    f"FETCH FORWARD {int(page_size)} FROM {name}"
+                )
+                rows = await results.fetchall()
+
+                if not rows:
+                    break
+
+                yield list(map(RowProxy.as_tuple, rows))
+
+            await conn.execute(f"CLOSE {name}")
+
+
+async def iterate_dicts_with_cursor(
+    db_engine: Engine, query: Select, page_size: int, name: str = "export_cursor"
+) -> AsyncIterator[List[Dict]]:
+    columns = [column.name for column in query.columns]
+    pages = iterate_with_cursor(db_engine, query, page_size, name)
+
+    try:
+        async for rows in pages:
+            yield [dict(zip(columns, row)) for row in rows]
+    finally:
+        await pages.aclose()
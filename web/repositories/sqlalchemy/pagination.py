@@ -0,0 +1,70 @@
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import Column, Integer, bindparam
+from sqlalchemy.sql import Select
+
+
+def paginate_by_key(
+    query: Select,
+    key: Column,
+    limit: Optional[int],
+    after: Optional[int] = None,
+    before: Optional[int] = None,
+) -> Select:
+    """Seeks the page right after/before given key instead of using OFFSET.
+
+    Page before the key is selected in descending order, rows have to be
+    reversed after fetching (see reverse_if_before).
+    """
+    if before is not None:
+        query = query.where(key < before).order_by(key.desc())
+    else:
+        if after is not None:
+            query = query.where(key > after)
+        query = query.order_by(key)
+
+    if limit is not None:
+        query = query.limit(limit)
+
+    return query
+
+
+class KeysetPages(NamedTuple):
+    first: Select
+    after: Select
+    before: Select
+
+
+def build_keyset_pages(query: Select, key: Column) -> KeysetPages:
+    """Prebuilds paginate_by_key statements for each kind of page.
+
+    Page size and the key are bound by limit, after and before parameters,
+    pass them with select_keyset_page.
+    """
+    limit = bindparam("limit", type_=Integer)
+
+    return KeysetPages(
+        paginate_by_key(query, key, limit),
+        paginate_by_key(query, key, limit, after=bindparam("after")),
+        paginate_by_key(query, key, limit, before=bindparam("before")),
+    )
+
+
+def select_keyset_page(
+    pages: KeysetPages,
+    limit: Optional[int],
+    after: Optional[int] = None,
+    before: Optional[int] = None,
+) -> Tuple[Select, Dict]:
+    # LIMIT NULL is the same as no limit in Postgres
+    if before is not None:
+        return pages.before, {"limit": limit, "before": before}
+    if after is not None:
+        return pages.after, {"limit": limit, "after": after}
+    return pages.first, {"limit": limit}
+
+
+def reverse_if_before(rows: list, before: Optional[int]) -> list:
+    if before is not None:
+        rows.reverse()
+    return rows
@@ -0,0 +1,129 @@
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from aiopg.sa import SAConnection
+from aiopg.sa.result import RowProxy
+from sqlalchemy import Integer, and_, any_, bindparam, exists, func, not_, or_, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql import ColumnElement
+
+from common.exceptions import ValidationError
+from web.repositories.sqlalchemy.search import escape_like
+from web.repositories.sqlalchemy.tables import (
+    contact_table,
+    segment_contact_table,
+    segment_table,
+)
+from web.schemas import referenced_segments
+
+PATTERN_COLUMNS = ("name", "first_name", "last_name")
+
+# has to match the expression of contact_email_domain_idx (migration 0009)
+email_domain = func.lower(func.split_part(contact_table.c.email, "@", 2))
+
+
+async def load_segment_rules(
+    conn: SAConnection, segment_ids: Iterable[int]
+) -> Dict[int, Optional[Dict]]:
+    """Reads rules of the segments and of all segments their rules refer to.
+
+    Static segments, as well as ones that don't exist, are mapped to None.
+    """
+    rules: Dict[int, Optional[Dict]] = {}
+    pending = set(segment_ids)
+
+    while pending:
+        result = await conn.execute(
+            select([segment_table.c.id, segment_table.c.rule]).where(
+                segment_table.c.id
+                == any_(bindparam("ids", list(pending), type_=ARRAY(Integer)))
+            )
+        )
+        rules.update(dict.fromkeys(pending))
+        rules.update(map(RowProxy.as_tuple, await result.fetchall()))
+
+        pending = {
+            reference
+            for rule in rules.values()
+            if rule is not None
+            for reference in referenced_segments(rule)
+        } - rules.keys()
+
+    return rules
+
+
+def compile_segment_rule(
+    rules: Dict[int, Optional[Dict]], segment_id: int, _path: Tuple[int, ...] = ()
+) -> ColumnElement:
+    """Builds a condition on contact_table selecting members of the segment.
+
+    Conditions of a rule are combined with AND: email domain is compared case
+    insensitively, name patterns use * as a wildcard, contacts have to be in any
+    of the segments and in none of the exclude_segments. Segments referenced by
+    a rule are compiled in place, so no membership rows are needed.
+    """
+    if segment_id in _path:
+        raise ValidationError(f"Rule of segment {segment_id} refers to itself")
+
+    rule = rules.get(segment_id)
+
+    if rule is None:
+        return compile_membership(rules, [segment_id], _path)
+
+    path = (*_path, segment_id)
+    conditions = []
+
+    if "email_domain" in rule:
+        conditions.append(email_domain == rule["email_domain"].lower())
+
+    for column in PATTERN_COLUMNS:
+        if column in rule:
+            conditions.append(
+                contact_table.c[column].ilike(
+                    escape_like(rule[column]).replace("*", "%")
+                )
+            )
+
+    if rule.get("segments"):
+        conditions.append(compile_membership(rules, rule["segments"], path))
+
+    if rule.get("exclude_segments"):
+        conditions.append(
+            not_(compile_membership(rules, rule["exclude_segments"], path))
+        )
+
+    return and_(*conditions)
+
+
+def compile_membership(
+    rules: Dict[int, Optional[Dict]],
+    segment_ids: Sequence[int],
+    _path: Tuple[int, ...] = (),
+) -> ColumnElement:
+    """Builds a condition on contact_table selecting members of any segment.
+
+    Static segments are checked with a single semi-join on segment_contact,
+    rules of the others are compiled in place.
+    """
+    static_ids = [segment_id for segment_id in segment_ids if rules[segment_id] is None]
+    conditions = [
+        compile_segment_rule(rules, segment_id, _path)
+        for segment_id in segment_ids
+        if rules[segment_id] is not None
+    ]
+
+    if static_ids:
+        conditions.append(
+            exists().where(
+                and_(
+                    segment_contact_table.c.segment_id
+                    == any_(
+                        bindparam(
+                            "segment_ids", static_ids, type_=ARRAY(Integer), unique=True
+                        )
+                    ),
+                    segment_contact_table.c.contact_id == contact_table.c.id,
+                )
+            )
+        )
+
+    return or_(*conditions)
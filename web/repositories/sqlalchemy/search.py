@@ -0,0 +1,32 @@
+from typing import Sequence
+
+from sqlalchemy import Column, func, or_
+from sqlalchemy.sql import Select
+
+
+def search_by_similarity(
+    query: Select, columns: Sequence[Column], text: str, limit: int
+) -> Select:
+    """Selects rows with any of the columns similar to or containing the text.
+
+    Best matches come first. Both conditions can use pg_trgm GIN indexes on
+    the columns (see migration 0011), texts shorter than 3 characters have no
+    trigrams to look up though.
+    """
+    pattern = f"%{escape_like(text)}%"
+    conditions = []
+
+    for column in columns:
+        # pg_trgm similarity operator, % is escaped for the driver
+        conditions.extend([column.op("%%")(text), column.ilike(pattern)])
+
+    similarity = func.greatest(*[func.similarity(column, text) for column in columns])
+
+    return query.where(or_(*conditions)).order_by(similarity.desc()).limit(limit)
+
+
+def escape_like(text: str) -> str:
+    # backslash is the default LIKE escape character in Postgres
+    for special in ("\\", "%", "_"):
+        text = text.replace(special, "\\" + special)
+    return text
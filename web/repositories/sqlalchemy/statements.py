@@ -0,0 +1,40 @@
+from typing import Dict
+
+from aiopg.sa import SAConnection
+from aiopg.sa.result import ResultProxy
+from sqlalchemy.engine.interfaces import Compiled
+from sqlalchemy.sql import ClauseElement
+
+
+class CompiledStatementCache:
+    """Executes prebuilt statements compiled to SQL only on their first use.
+
+    aiopg compiles every SQLAlchemy expression it executes. Statements built
+    once (as class attributes of the repositories) with bindparam for the
+    values of each call are compiled once per cache instead and executed as SQL
+    text, so rows are read by column names from the cursor, not by labels.
+
+    The driver (psycopg2) has no support for server-side prepared statements,
+    so the SQL is still parsed and planned by Postgres on each execution.
+    """
+
+    def __init__(self, db_engine):
+        self._db_engine = db_engine
+        self._compiled: Dict[ClauseElement, Compiled] = {}
+
+    async def execute(
+        self, conn: SAConnection, statement: ClauseElement, **params
+    ) -> ResultProxy:
+        compiled = self._compiled.get(statement)
+
+        if compiled is None:
+            compiled = statement.compile(dialect=self._db_engine.dialect)
+            self._compiled[statement] = compiled
+
+        # same private API aiopg uses to process parameters of expressions
+        processors = compiled._bind_processors
+        parameters = {
+            key: processors[key](value) if key in processors else value
+            for key, value in compiled.construct_params(params).items()
+        }
+        return await conn.execute(str(compiled), parameters)
@@ -1,4 +1,5 @@
-from sqlalchemy import MetaData, Table, Column, Integer, String, Text
+from sqlalchemy import MetaData, Table, Column, BigInteger, Integer, String, Text
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 
 metadata = MetaData()
 
@@ -17,6 +18,7 @@ segment_table = Table(
     metadata,
     Column("id", Integer, primary_key=True),
     Column("name", String(64), unique=True),
+    Column("rule", JSONB),
 )
 
 
@@ -44,6 +46,9 @@ email_request_table = Table(
     Column("name", String(128)),
     Column("template_id", Integer),
     Column("segment_id", Integer),
+    Column("include_segment_ids", ARRAY(Integer)),
+    Column("exclude_segment_ids", ARRAY(Integer)),
+    Column("exclude_template_id", Integer),
 )
 
 
@@ -56,3 +61,21 @@ job_table = Table(
     Column("contact_id", Integer),
     Column("message_id", String(40)),
 )
+
+
+row_counter_table = Table(
+    "row_counter",
+    metadata,
+    Column("table_name", String(64)),
+    Column("key", Integer),
+    Column("count", BigInteger),
+)
+
+
+email_request_status_table = Table(
+    "email_request_status",
+    metadata,
+    Column("request_id", Integer),
+    Column("status", String(16)),
+    Column("count", BigInteger),
+)
@@ -1,11 +1,48 @@
-from voluptuous import Schema, Email, Coerce, Inclusive, In
+from voluptuous import (
+    REMOVE_EXTRA,
+    All,
+    Any,
+    Coerce,
+    Email,
+    In,
+    Inclusive,
+    Invalid,
+    Length,
+    Lower,
+    Optional,
+    Range,
+    Schema,
+    Strip,
+)
 
-from common.enums import EmailResult
+from common.enums import EmailResult, SegmentOperation
 
 contact_schema = Schema(
     {"name": str, "email": Email(), "first_name": str, "last_name": str}, required=True
 )
 
+# lengths of contact table columns, a single row too long would fail whole batch
+contact_import_schema = Schema(
+    {
+        "name": All(str, Length(min=1, max=64)),
+        "email": All(Email(), Length(max=128)),
+        Optional("first_name", default=""): All(str, Length(max=64)),
+        Optional("last_name", default=""): All(str, Length(max=64)),
+    },
+    required=True,
+    extra=REMOVE_EXTRA,
+)
+
+# shorter texts have no trigrams to look up in the search indexes
+search_schema = Schema(
+    {
+        "q": All(str, Strip, Length(min=3, max=64)),
+        Optional("limit", default=10): All(Coerce(int), Range(min=1, max=50)),
+    },
+    required=True,
+    extra=REMOVE_EXTRA,
+)
+
 segment_schema = Schema({"name": str}, required=True)
 
 template_schema = Schema({"name": str, "template": str}, required=True)
@@ -22,8 +59,30 @@ settings_schema = Schema(
 )
 
 
+def _id_list(value: str) -> list:
+    # multiple selection dropdowns submit comma separated values
+    try:
+        return [int(id_) for id_ in value.split(",") if id_.strip()]
+    except ValueError:
+        raise Invalid("expected comma separated ids")
+
+
+def _optional_id(value: str):
+    try:
+        return int(value) if value else None
+    except ValueError:
+        raise Invalid("expected an id")
+
+
 campaign_schema = Schema(
-    {"segment_id": Coerce(int), "template_id": Coerce(int), "subject": str},
+    {
+        "segment_id": Coerce(int),
+        "template_id": Coerce(int),
+        "subject": str,
+        Optional("include_segment_ids", default=""): _id_list,
+        Optional("exclude_segment_ids", default=""): _id_list,
+        Optional("exclude_template_id", default=""): _optional_id,
+    },
     required=True,
 )
 
@@ -35,3 +94,61 @@ update_status_schema = Schema(
     },
     required=True,
 )
+
+
+def _contacts_selected(data: dict) -> dict:
+    if ("contact_ids" in data) == ("from_id" in data):
+        raise Invalid("expected either contact_ids or from_id and to_id")
+    return data
+
+
+segment_members_schema = Schema(
+    All(
+        {
+            "action": In(frozenset(["add", "remove"])),
+            Optional("contact_ids"): All([int], Length(min=1)),
+            Inclusive("from_id", "range"): All(int, Range(min=1)),
+            Inclusive("to_id", "range"): All(int, Range(min=1)),
+        },
+        _contacts_selected,
+    ),
+    required=True,
+)
+
+segment_build_schema = Schema(
+    {
+        "operation": All(
+            In(frozenset(operation.value for operation in SegmentOperation)),
+            Coerce(SegmentOperation),
+        ),
+        "segment_ids": All([int], Length(min=1)),
+        Optional("replace", default=False): bool,
+    },
+    required=True,
+)
+
+segment_copy_schema = Schema({"name": All(str, Length(min=1, max=64))}, required=True)
+
+# conditions are combined with AND, name patterns use * as a wildcard
+segment_rule_schema = Schema(
+    All(
+        {
+            Optional("email_domain"): All(str, Length(min=1, max=128), Lower),
+            Optional("name"): All(str, Length(min=1, max=64)),
+            Optional("first_name"): All(str, Length(min=1, max=64)),
+            Optional("last_name"): All(str, Length(min=1, max=64)),
+            Optional("segments"): All([int], Length(min=1)),
+            Optional("exclude_segments"): All([int], Length(min=1)),
+        },
+        Length(min=1, msg="expected at least one condition"),
+    )
+)
+
+
+def referenced_segments(rule: dict) -> set:
+    return {*rule.get("segments", ()), *rule.get("exclude_segments", ())}
+
+
+segment_rule_update_schema = Schema(
+    {"rule": Any(None, segment_rule_schema)}, required=True
+)
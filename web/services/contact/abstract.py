@@ -1,5 +1,7 @@
 from abc import abstractmethod, ABC
-from typing import List, Dict, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from common.enums import SegmentOperation
 
 
 class AbstractContactService(ABC):
@@ -12,7 +14,23 @@ class AbstractContactService(ABC):
         pass
 
     @abstractmethod
-    async def read_contacts(self, page: int, per_page: int) -> List[Dict]:
+    async def read_contacts(
+        self, per_page: int, after: Optional[int] = None, before: Optional[int] = None
+    ) -> Dict:
+        pass
+
+    @abstractmethod
+    async def search_contacts(self, text: str, limit: int) -> List[Dict]:
+        pass
+
+    @abstractmethod
+    async def import_contacts(
+        self, contacts: List[Dict], segment_id: Optional[int] = None
+    ) -> int:
+        pass
+
+    @abstractmethod
+    def export_contacts(self, page_size: int) -> AsyncIterator[List[Dict]]:
         pass
 
     @abstractmethod
@@ -28,11 +46,20 @@ class AbstractContactService(ABC):
         pass
 
     @abstractmethod
-    async def get_segment(self, segment_id: int) -> Dict:
+    async def get_segment(self, segment_id: int) -> Optional[Dict]:
         pass
 
     @abstractmethod
-    async def read_segments(self, page: int, per_page: Optional[int]) -> List[Dict]:
+    async def read_segments(
+        self,
+        per_page: Optional[int] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> Dict:
+        pass
+
+    @abstractmethod
+    async def search_segments(self, text: str, limit: int) -> List[Dict]:
         pass
 
     @abstractmethod
@@ -44,7 +71,19 @@ class AbstractContactService(ABC):
         pass
 
     @abstractmethod
-    async def list_contacts_in_segment(self, segment_id: int):
+    async def list_contacts_in_segment(
+        self,
+        segment_id: int,
+        per_page: Optional[int] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> Dict:
+        pass
+
+    @abstractmethod
+    def export_segment_contacts(
+        self, segment_id: int, page_size: int
+    ) -> AsyncIterator[List[Dict]]:
         pass
 
     @abstractmethod
@@ -55,6 +94,46 @@ class AbstractContactService(ABC):
     async def remove_contact_from_segment(self, segment_id: int, contact_id: int):
         pass
 
+    @abstractmethod
+    async def add_contacts_to_segment(
+        self,
+        segment_id: int,
+        contact_ids: Optional[List[int]] = None,
+        id_range: Optional[Tuple[int, int]] = None,
+    ) -> int:
+        pass
+
+    @abstractmethod
+    async def remove_contacts_from_segment(
+        self,
+        segment_id: int,
+        contact_ids: Optional[List[int]] = None,
+        id_range: Optional[Tuple[int, int]] = None,
+    ) -> int:
+        pass
+
+    @abstractmethod
+    async def check_segment_editable(self, segment_id: int):
+        pass
+
+    @abstractmethod
+    async def build_segment(
+        self,
+        segment_id: int,
+        operation: SegmentOperation,
+        source_ids: List[int],
+        replace: bool = False,
+    ) -> int:
+        pass
+
+    @abstractmethod
+    async def copy_segment(self, segment_id: int, name: str) -> Dict:
+        pass
+
+    @abstractmethod
+    async def set_segment_rule(self, segment_id: int, rule: Optional[Dict]):
+        pass
+
     @abstractmethod
     async def get_contacts_pages_count(self, per_page: int) -> int:
         pass
@@ -62,3 +141,9 @@ class AbstractContactService(ABC):
     @abstractmethod
     async def get_segments_pages_count(self, per_page: int) -> int:
         pass
+
+    @abstractmethod
+    async def get_segment_contacts_pages_count(
+        self, segment_id: int, per_page: int
+    ) -> int:
+        pass
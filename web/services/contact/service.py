@@ -1,8 +1,12 @@
 from math import ceil
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
+from common.enums import SegmentOperation
+from common.exceptions import ValidationError
 from web.repositories.contact.abstract import AbstractContactRepository
+from web.schemas import referenced_segments
 from web.services.contact.abstract import AbstractContactService
+from web.services.pagination import create_keyset_page, get_keyset_limit
 
 
 class ContactService(AbstractContactService):
@@ -20,10 +24,24 @@ class ContactService(AbstractContactService):
 
         return contact
 
-    async def read_contacts(self, page: int, per_page: int) -> List[Dict]:
-        # in db we use pages from 0, in the view from 1
-        page -= 1
-        return await self._contact_repository.read_contacts(page, per_page)
+    async def read_contacts(
+        self, per_page: int, after: Optional[int] = None, before: Optional[int] = None
+    ) -> Dict:
+        contacts = await self._contact_repository.read_contacts(
+            get_keyset_limit(per_page), after, before
+        )
+        return create_keyset_page(contacts, per_page, after, before)
+
+    async def search_contacts(self, text: str, limit: int) -> List[Dict]:
+        return await self._contact_repository.search_contacts(text, limit)
+
+    async def import_contacts(
+        self, contacts: List[Dict], segment_id: Optional[int] = None
+    ) -> int:
+        return await self._contact_repository.upsert_contacts(contacts, segment_id)
+
+    def export_contacts(self, page_size: int) -> AsyncIterator[List[Dict]]:
+        return self._contact_repository.iterate_contacts(page_size)
 
     async def update_contact(self, contact: Dict):
         await self._contact_repository.update_contact(contact)
@@ -34,13 +52,22 @@ class ContactService(AbstractContactService):
     async def create_segment(self, segment: Dict) -> Dict:
         return await self._contact_repository.create_segment(segment)
 
-    async def get_segment(self, segment_id: int) -> Dict:
+    async def get_segment(self, segment_id: int) -> Optional[Dict]:
         return await self._contact_repository.get_segment(segment_id)
 
-    async def read_segments(self, page: int, per_page: Optional[int]) -> List[Dict]:
-        # in db we use pages from 0, in the view from 1
-        page -= 1
-        return await self._contact_repository.read_segments(page, per_page)
+    async def read_segments(
+        self,
+        per_page: Optional[int] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> Dict:
+        segments = await self._contact_repository.read_segments(
+            get_keyset_limit(per_page), after, before
+        )
+        return create_keyset_page(segments, per_page, after, before)
+
+    async def search_segments(self, text: str, limit: int) -> List[Dict]:
+        return await self._contact_repository.search_segments(text, limit)
 
     async def update_segment(self, segment: Dict):
         await self._contact_repository.update_segment(segment)
@@ -48,10 +75,25 @@ class ContactService(AbstractContactService):
     async def delete_segment(self, segment_id: int):
         await self._contact_repository.delete_segment(segment_id)
 
-    async def list_contacts_in_segment(self, segment_id: int):
-        return await self._contact_repository.list_contacts_in_segment(segment_id)
+    async def list_contacts_in_segment(
+        self,
+        segment_id: int,
+        per_page: Optional[int] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> Dict:
+        contacts = await self._contact_repository.list_contacts_in_segment(
+            segment_id, get_keyset_limit(per_page), after, before
+        )
+        return create_keyset_page(contacts, per_page, after, before)
+
+    def export_segment_contacts(
+        self, segment_id: int, page_size: int
+    ) -> AsyncIterator[List[Dict]]:
+        return self._contact_repository.iterate_segment_contacts(segment_id, page_size)
 
     async def add_contact_to_segment(self, segment_id: int, contact_id: int):
+        await self.check_segment_editable(segment_id)
         await self._contact_repository.add_contact_to_segment(segment_id, contact_id)
 
     async def remove_contact_from_segment(self, segment_id: int, contact_id: int):
@@ -59,8 +101,102 @@ class ContactService(AbstractContactService):
             segment_id, contact_id
         )
 
+    async def add_contacts_to_segment(
+        self,
+        segment_id: int,
+        contact_ids: Optional[List[int]] = None,
+        id_range: Optional[Tuple[int, int]] = None,
+    ) -> int:
+        await self.check_segment_editable(segment_id)
+
+        return await self._contact_repository.add_contacts_to_segment(
+            segment_id, contact_ids, id_range
+        )
+
+    async def remove_contacts_from_segment(
+        self,
+        segment_id: int,
+        contact_ids: Optional[List[int]] = None,
+        id_range: Optional[Tuple[int, int]] = None,
+    ) -> int:
+        return await self._contact_repository.remove_contacts_from_segment(
+            segment_id, contact_ids, id_range
+        )
+
+    async def check_segment_editable(self, segment_id: int):
+        # members of a segment with a rule come from the rule only
+        if (await self._get_existing_segment(segment_id)).get("rule"):
+            raise ValidationError(
+                f"Segment {segment_id} has a rule, members can't be added"
+            )
+
+    async def build_segment(
+        self,
+        segment_id: int,
+        operation: SegmentOperation,
+        source_ids: List[int],
+        replace: bool = False,
+    ) -> int:
+        # members removed first would change the result computed afterwards
+        if replace and segment_id in source_ids:
+            raise ValidationError("Segment can't be built from itself when replaced")
+
+        await self.check_segment_editable(segment_id)
+
+        return await self._contact_repository.combine_segments(
+            operation, source_ids, segment_id, replace
+        )
+
+    async def copy_segment(self, segment_id: int, name: str) -> Dict:
+        await self._get_existing_segment(segment_id)
+
+        return await self._contact_repository.copy_segment(segment_id, name)
+
+    async def set_segment_rule(self, segment_id: int, rule: Optional[Dict]):
+        if rule is not None:
+            await self._check_rule_references(segment_id, rule)
+
+        await self._contact_repository.update_segment({"id": segment_id, "rule": rule})
+
+    async def _check_rule_references(self, segment_id: int, rule: Dict):
+        # rules are compiled recursively when campaigns are created
+        pending = referenced_segments(rule)
+        checked = set()
+
+        while pending:
+            reference = pending.pop()
+
+            if reference == segment_id:
+                raise ValidationError(
+                    f"Rule of segment {segment_id} can't refer to the segment itself"
+                )
+
+            checked.add(reference)
+            referenced_rule = (await self._get_existing_segment(reference)).get("rule")
+
+            if referenced_rule is not None:
+                pending |= referenced_segments(referenced_rule) - checked
+
+    async def _get_existing_segment(self, segment_id: int) -> Dict:
+        segment = await self._contact_repository.get_segment(segment_id)
+
+        if segment is None:
+            raise ValidationError(f"Segment {segment_id} doesn't exist")
+
+        return segment
+
     async def get_contacts_pages_count(self, per_page: int) -> int:
         return int(ceil(await self._contact_repository.get_contacts_count() / per_page))
 
     async def get_segments_pages_count(self, per_page: int) -> int:
         return int(ceil(await self._contact_repository.get_segments_count() / per_page))
+
+    async def get_segment_contacts_pages_count(
+        self, segment_id: int, per_page: int
+    ) -> int:
+        return int(
+            ceil(
+                await self._contact_repository.get_segment_contacts_count(segment_id)
+                / per_page
+            )
+        )
@@ -1,20 +1,44 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
 
 class AbstractEmailService(ABC):
     @abstractmethod
     async def send_emails(
-        self, segment_id: int, template_id: int, subject: str
+        self,
+        segment_id: int,
+        template_id: int,
+        subject: str,
+        include_segment_ids: Sequence[int] = (),
+        exclude_segment_ids: Sequence[int] = (),
+        exclude_template_id: Optional[int] = None,
     ) -> Tuple[Dict, str]:
         pass
 
     @abstractmethod
-    async def get_email_requests(self):
+    async def get_email_requests(
+        self,
+        per_page: Optional[int] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> Dict:
         pass
 
     @abstractmethod
-    async def get_email_request_details(self, job_id: int):
+    async def get_email_request_details(
+        self,
+        request_id: int,
+        per_page: Optional[int] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+        status: Optional[str] = None,
+    ) -> Dict:
+        pass
+
+    @abstractmethod
+    def export_email_request_jobs(
+        self, request_id: int, page_size: int, status: Optional[str] = None
+    ) -> AsyncIterator[List[Dict]]:
         pass
 
     @abstractmethod
@@ -1,5 +1,7 @@
-from typing import Dict, List, Tuple
+from asyncio import Future, ensure_future
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
+from common.enums import EmailResult
 from common.exceptions import (
     ValidationError,
     UnavailableServiceError,
@@ -8,30 +10,46 @@ from common.exceptions import (
 from web.integrations.email_client.http import EmailHTTPClient
 from web.repositories.jobs.abstract import AbstractJobRepository
 from web.services.email.abstract import AbstractEmailService
+from web.services.email.status_buffer import JobStatusBuffer
+from web.services.pagination import create_keyset_page, get_keyset_limit
 
 
 class EmailService(AbstractEmailService):
     def __init__(
-        self, job_repository: AbstractJobRepository, email_client: EmailHTTPClient
+        self,
+        job_repository: AbstractJobRepository,
+        email_client: EmailHTTPClient,
+        dispatch_page_size: int = 1000,
+        status_buffer: Optional[JobStatusBuffer] = None,
     ):
         self._job_repository = job_repository
         self._email_client = email_client
+        self._dispatch_page_size = dispatch_page_size
+        self._status_buffer = status_buffer
 
     async def send_emails(
-        self, segment_id: int, template_id: int, subject: str
+        self,
+        segment_id: int,
+        template_id: int,
+        subject: str,
+        include_segment_ids: Sequence[int] = (),
+        exclude_segment_ids: Sequence[int] = (),
+        exclude_template_id: Optional[int] = None,
     ) -> Tuple[Dict, str]:
         created_request = await self._job_repository.create_email_request(
-            segment_id, template_id, subject
-        )
-        jobs = await self._job_repository.get_email_request_job_data(
-            created_request["id"]
+            segment_id,
+            template_id,
+            subject,
+            include_segment_ids,
+            exclude_segment_ids,
+            exclude_template_id,
         )
         template = await self._job_repository.get_template(template_id)
         error = None
 
         try:
-            await self._email_client.schedule_mailing_jobs(
-                jobs, template["template"], subject
+            await self._dispatch_jobs(
+                created_request["id"], template["template"], subject
             )
         except ValidationError as e:
             error = f"Request malformed: {e}, contact administrator."
@@ -42,17 +60,75 @@ class EmailService(AbstractEmailService):
 
         return created_request, error
 
-    async def get_email_requests(self):
-        return await self._job_repository.get_email_requests()
+    async def _dispatch_jobs(self, request_id: int, template: str, subject: str):
+        pages = self._job_repository.iterate_email_request_job_data(
+            request_id, self._dispatch_page_size
+        )
+        scheduling: Optional[Future] = None
+
+        try:
+            async for jobs in pages:
+                # next page is fetched while the previous one is being posted
+                if scheduling is not None:
+                    await scheduling
+
+                scheduling = ensure_future(
+                    self._email_client.schedule_mailing_jobs(jobs, template, subject)
+                )
+
+            if scheduling is not None:
+                await scheduling
+        finally:
+            if scheduling is not None and not scheduling.done():
+                scheduling.cancel()
 
-    async def get_email_request_details(self, request_id: int):
+            await pages.aclose()
+
+    async def get_email_requests(
+        self,
+        per_page: Optional[int] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+    ) -> Dict:
+        requests = await self._job_repository.get_email_requests(
+            get_keyset_limit(per_page), after, before
+        )
+        return create_keyset_page(requests, per_page, after, before)
+
+    async def get_email_request_details(
+        self,
+        request_id: int,
+        per_page: Optional[int] = None,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+        status: Optional[str] = None,
+    ) -> Dict:
         request_details = await self._job_repository.get_email_request(request_id)
-        jobs = await self._job_repository.get_email_requests_job_statuses(request_id)
+        counts = await self._job_repository.get_email_request_status_counts(request_id)
+        jobs = await self._job_repository.get_email_requests_job_statuses(
+            request_id, get_keyset_limit(per_page), after, before, status
+        )
+
+        return {
+            "request": request_details,
+            "statuses": {
+                result.value: counts.get(result.value, 0) for result in EmailResult
+            },
+            "jobs": create_keyset_page(jobs, per_page, after, before),
+        }
 
-        return {"request": request_details, "jobs": jobs}
+    def export_email_request_jobs(
+        self, request_id: int, page_size: int, status: Optional[str] = None
+    ) -> AsyncIterator[List[Dict]]:
+        return self._job_repository.iterate_email_request_job_statuses(
+            request_id, page_size, status
+        )
 
     async def update_jobs_statuses(self, statuses: Dict):
-        return await self._job_repository.update_job_statuses(statuses)
+        if self._status_buffer:
+            await self._status_buffer.add(statuses)
+        else:
+            await self._job_repository.update_job_statuses(statuses)
 
     async def list_email_templates(self) -> List[Dict]:
         return await self._job_repository.list_templates()
@@ -0,0 +1,17 @@
+from common.coalescing import CoalescingBuffer
+from web.repositories.jobs.abstract import AbstractJobRepository
+
+
+class JobStatusBuffer(CoalescingBuffer):
+    """Write-behind buffer of job statuses reported by email_client."""
+
+    def __init__(
+        self,
+        job_repository: AbstractJobRepository,
+        max_size: int = 5000,
+        flush_interval: float = 1.0,
+    ):
+        super().__init__(job_repository.update_job_statuses, max_size, flush_interval)
+
+    async def close(self, timeout: float = 10):
+        await super().close(timeout)
@@ -0,0 +1,39 @@
+from typing import Dict, List, Optional
+
+
+def get_keyset_limit(per_page: Optional[int]) -> Optional[int]:
+    # one more object tells if there is another page
+    return per_page + 1 if per_page is not None else None
+
+
+def create_keyset_page(
+    objects: List[Dict],
+    per_page: Optional[int],
+    after: Optional[int] = None,
+    before: Optional[int] = None,
+    key: str = "id",
+) -> Dict:
+    """Builds a page out of per_page + 1 objects read in the seek direction.
+
+    The extra object only tells whether there is another page to go to.
+    """
+    if per_page is None:
+        return {"objects": objects, "prev": None, "next": None}
+
+    has_more = len(objects) > per_page
+
+    if before is not None:
+        objects = objects[-per_page:]
+        has_prev, has_next = has_more, True
+    else:
+        objects = objects[:per_page]
+        has_prev, has_next = after is not None, has_more
+
+    if not objects:
+        return {"objects": objects, "prev": None, "next": None}
+
+    return {
+        "objects": objects,
+        "prev": objects[0][key] if has_prev else None,
+        "next": objects[-1][key] if has_next else None,
+    }
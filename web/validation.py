@@ -1,23 +1,17 @@
-from re import findall
 from typing import Dict
 
 from voluptuous import Invalid
 
-AVAILABLE_DATA = frozenset(
-    {"user_id", "name", "id", "first_name", "last_name", "email"}
-)
+from common.exceptions import TemplateError
+from common.templates import compile_template
 
 
 def validate_template(template: str):
     """Simple validator of templates and usage of variables."""
-    all_params = findall(r"{([ \w_]*)}", template)
-
-    used_params = set(param for param in all_params)
-
-    if not used_params.issubset(AVAILABLE_DATA):
-        raise Invalid(
-            f"Used unsupported params: {', '.join(sorted(used_params - AVAILABLE_DATA))}"
-        )
+    try:
+        compile_template(template)
+    except TemplateError as e:
+        raise Invalid(str(e))
 
 
 def validate_template_schema(data: Dict):